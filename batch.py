@@ -0,0 +1,164 @@
+import sys
+import time
+import random
+import argparse
+import multiprocessing
+from collections import Counter
+
+import game
+import headless
+
+# Muitas partidas independentes em paralelo (ajuste de fases, avaliação de bots).
+# Cada job é (fase, política, semente); cada processo do pool cria a sua
+# instância de game.Game e joga até chegar ao portal ou estourar o limite.
+MAX_TICKS = 60 * 60       # um minuto de jogo a 60 ticks/s
+DELTA_TIME = 1/60
+
+
+# ---------------- POLÍTICAS ----------------
+# Recebem o estado e devolvem a entrada do tick; são criadas dentro do
+# processo a partir de (nome, semente), então não precisam ser "pickláveis".
+class IdlePolicy:
+    def __call__(self, state):
+        return dict(game.NO_INPUT)
+
+
+class RunRightPolicy:
+    # corre para a direita e pula sempre que possível
+    def __call__(self, state):
+        inputs = dict(game.NO_INPUT)
+        inputs["right"] = True
+        inputs["jump"] = state["player"]["on_ground"]
+        return inputs
+
+
+class RandomPolicy:
+    # segura uma combinação aleatória de teclas por alguns ticks
+    def __init__(self, seed):
+        self.rng = random.Random(seed)
+        self.hold = 0
+        self.keys = dict(game.NO_INPUT)
+
+    def __call__(self, state):
+        if self.hold == 0:
+            self.hold = self.rng.randint(5, 40)
+            self.keys = dict(game.NO_INPUT)
+            self.keys["left"], self.keys["right"] = self.rng.choice(((False, True), (False, True), (True, False), (False, False)))
+            self.keys["jump"] = self.rng.random() < 0.5
+        self.hold -= 1
+        inputs = dict(self.keys)
+        inputs["jump"] = self.keys["jump"] and state["player"]["on_ground"]
+        return inputs
+
+
+class ScriptPolicy:
+    def __init__(self, script):
+        self.inputs = headless.script_inputs(headless.parse_script(script))
+
+    def __call__(self, state):
+        return next(self.inputs)
+
+
+def make_policy(name, seed):
+    if name == "idle":
+        return IdlePolicy()
+    if name == "right":
+        return RunRightPolicy()
+    if name == "random":
+        return RandomPolicy(seed)
+    if name.startswith("script:"):
+        return ScriptPolicy(name[len("script:"):])
+    raise ValueError(f"política desconhecida: {name}")
+
+
+# ---------------- EXECUÇÃO ----------------
+def run_one(job):
+    level, policy_name, seed, max_ticks, delta_time = job
+    instance = game.Game(level)
+    policy = make_policy(policy_name, seed)
+    causes = Counter()
+
+    outcome = "timeout"
+    state = instance.state
+    while instance.ticks < max_ticks:
+        state = instance.step(policy(state), delta_time)
+        if state["death_cause"] is not None:
+            causes[state["death_cause"]] += 1
+        if state["won"] or state["level"] != level:
+            outcome = "portal"
+            break
+
+    return {
+        "level": level,
+        "policy": policy_name,
+        "seed": seed,
+        "outcome": outcome,
+        "ticks": instance.ticks,
+        "ticks_to_portal": instance.ticks if outcome == "portal" else None,
+        "deaths": state["deaths"],
+        "death_causes": dict(causes),
+        # causa de morte mais frequente da partida (None se nunca morreu)
+        "death_cause": max(causes, key=causes.get) if causes else None,
+    }
+
+
+def run_batch(jobs, processes=None, chunksize=None):
+    # jobs: lista de (fase, política, semente[, max_ticks[, delta_time]])
+    jobs = [tuple(job) + (MAX_TICKS, DELTA_TIME)[len(job) - 3:] for job in jobs]
+    processes = processes or multiprocessing.cpu_count()
+    if processes == 1:
+        return [run_one(job) for job in jobs]
+
+    if chunksize is None:
+        # lotes grandes o bastante para diluir o custo de IPC, sem desbalancear
+        chunksize = max(1, len(jobs) // (processes * 8))
+    with multiprocessing.Pool(processes) as pool:
+        return pool.map(run_one, jobs, chunksize)
+
+
+def summarize(results):
+    outcomes = Counter(r["outcome"] for r in results)
+    causes = Counter()
+    for r in results:
+        causes.update(r["death_causes"])
+    reached = [r["ticks_to_portal"] for r in results if r["ticks_to_portal"] is not None]
+    return {
+        "runs": len(results),
+        "outcomes": dict(outcomes),
+        "death_causes": dict(causes),
+        "mean_ticks_to_portal": sum(reached) / len(reached) if reached else None,
+        "total_ticks": sum(r["ticks"] for r in results),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Roda muitas partidas sem janela em paralelo")
+    parser.add_argument("--level", type=int, action="append", help="fase (pode repetir; padrão: todas)")
+    parser.add_argument("--policy", default="random", help="idle, right, random ou script:<roteiro>")
+    parser.add_argument("--runs", type=int, default=200, help="partidas por fase")
+    parser.add_argument("--seed", type=int, default=0, help="semente da primeira partida")
+    parser.add_argument("--max-ticks", type=int, default=MAX_TICKS)
+    parser.add_argument("--processes", type=int, default=None, help="padrão: todos os núcleos")
+    args = parser.parse_args(argv)
+
+    levels = args.level or list(range(1, game.LAST_LEVEL + 1))
+    jobs = [(level, args.policy, args.seed + i, args.max_ticks, DELTA_TIME)
+            for level in levels for i in range(args.runs)]
+
+    start = time.perf_counter()
+    results = run_batch(jobs, args.processes)
+    elapsed = time.perf_counter() - start
+
+    summary = summarize(results)
+    print(f"{summary['runs']} partidas, {summary['total_ticks']} ticks em {elapsed:.2f}s "
+          f"({summary['total_ticks'] / elapsed:.0f} ticks/s, {args.processes or multiprocessing.cpu_count()} processos)")
+    for level in levels:
+        part = summarize([r for r in results if r["level"] == level])
+        mean = part["mean_ticks_to_portal"]
+        print(f"fase {level}: {part['outcomes']}, mortes {part['death_causes']}, "
+              f"ticks até o portal {'-' if mean is None else f'{mean:.0f}'}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,321 @@
+import os
+import sys
+import json
+import math
+import time
+import random
+import itertools
+import argparse
+import platform
+
+# sem janela: o SDL usa o driver "dummy" mesmo quando não há display
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import numpy as np
+import pygame
+
+import game
+import levels
+import shading
+import headless
+from startup import init_pygame, LazyFont
+from collision import polygon_hits
+from particles import ParticlePool, BURSTS
+from transform import mat_mul, mat_rotate, mat_scale, apply, build_player_matrix
+
+# Benchmarks dos caminhos quentes: primitivas de matriz, iluminação e
+# rasterização Gouraud em vários tamanhos, um quadro completo sem janela por
+# fase e fases sintéticas com centenas/milhares de elementos.
+#
+#   python bench.py --save baseline.json        # grava a linha de base
+#   python bench.py --compare baseline.json     # compara e aponta regressões
+#
+# Cada benchmark roda em `loops` chamadas por repetição (calibrado para durar
+# pelo menos TARGET segundos) e guarda a mediana e o mínimo por chamada.
+TARGET = 0.05
+REPEATS = 7
+THRESHOLD = 0.15          # regressão: mediana mais de 15% acima da linha de base
+
+GOURAUD_RADII = (10, 40, 120, 250)
+PYTHON_RADII = (10, 40)   # o caminho pixel a pixel é lento demais para os maiores
+BATCH_COUNTS = (10, 100)  # quadriláteros de raio 30 por quadro: um a um x lote (shading.GouraudBatch)
+LIGHTING_VERTICES = (4, 32, 256)
+STRESS_SIZES = (100, 1000)
+HAZARD_COUNTS = (10, 1000)  # espinhos testados contra o polígono do jogador
+PARTICLE_COUNTS = (1000, 20000)  # partículas vivas mantidas no pool
+LONG_SCREENS = (10, 100)  # fases compridas (em telas), com STRESS_PER_SCREEN de cada tipo por tela
+STRESS_PER_SCREEN = 10
+
+
+def regular_polygon(vertices, radius, center=(450, 300)):
+    cx, cy = center
+    return [(cx + radius * math.cos(2 * math.pi * i / vertices),
+             cy + radius * math.sin(2 * math.pi * i / vertices)) for i in range(vertices)]
+
+
+# ---------------- FASES SINTÉTICAS ----------------
+def stress_level(count, seed=0, width=game.WIDTH):
+    # `count` inimigos, espinhos e plataformas espalhados em `width` px, longe do
+    # ponto de partida; o portal fica fora do alcance para a fase não acabar.
+    # Devolve a tabela compilada (levels.compile_level).
+    rng = random.Random(seed)
+    data = {"portal": [width + 1000, 0, 60, 80], "spikes": [], "platforms": [],
+            "moving_platforms": [], "vertical_platforms": [], "enemies": []}
+    for _ in range(count):
+        data["spikes"].append([rng.randrange(250, width - 60), rng.randrange(60, game.GROUND_Y - 40), 60, 40])
+        data["platforms"].append([rng.randrange(0, width - 150), rng.randrange(60, game.GROUND_Y - 20), 150, 20])
+        x = rng.randrange(250, width - 140)
+        data["enemies"].append({"rect": [x, rng.randrange(60, game.GROUND_Y - 40), 40, 40],
+                                "dir": rng.choice((-1, 1)), "min": x - 50, "max": x + 100})
+    for _ in range(count // 10):
+        x = rng.randrange(250, width - 240)
+        data["moving_platforms"].append({"rect": [x, rng.randrange(100, game.GROUND_Y - 20), 120, 20],
+                                         "dir": rng.choice((-1, 1)), "min": x - 60, "max": x + 120, "speed": 80})
+    return levels.compile_level(data)
+
+
+def level_state(level):
+    # level: número da fase, ("stress", tamanho) ou ("long", telas)
+    if isinstance(level, tuple):
+        kind, size = level
+        if kind == "long":
+            table = stress_level(size * STRESS_PER_SCREEN, width=size * game.WIDTH)
+        else:
+            table = stress_level(size)
+        state = game.new_state(1)
+        game.load_level(state, 1, table)
+        return state
+    return game.new_state(level)
+
+
+# ---------------- BENCHMARKS ----------------
+# Cada entrada devolve a função medida (sem argumentos); a preparação fica
+# fora da medição.
+def bench_mat_mul():
+    A = mat_rotate(30)
+    B = mat_scale(1.3, 0.8)
+    return lambda: mat_mul(A, B)
+
+
+def bench_apply():
+    M = build_player_matrix(game.player_default)
+    shape = game.base_shape
+    return lambda: [apply(M, p) for p in shape]
+
+
+def bench_build_player_matrix():
+    p = dict(game.player_default, angle=35, scale=1.2, shx=0.3, direction=-1)
+    return lambda: build_player_matrix(p)
+
+
+def bench_lighting(vertices):
+    points = regular_polygon(vertices, 100)
+    return lambda: shading.compute_vertex_lighting(points)
+
+
+def bench_gouraud(radius, mode):
+    surface = pygame.Surface((game.WIDTH, game.HEIGHT))
+    points = regular_polygon(8, radius)
+    return lambda: shading.draw_polygon_gouraud(surface, points, (200, 150, 250), mode)
+
+
+def bench_gouraud_many(count, batched):
+    rng = random.Random(0)
+    surface = pygame.Surface((game.WIDTH, game.HEIGHT))
+    polys = np.array([regular_polygon(4, 30, (rng.randrange(30, game.WIDTH - 30), rng.randrange(30, game.HEIGHT - 30)))
+                      for _ in range(count)])
+    if not batched:
+        points = polys.tolist()
+        return lambda: [shading.draw_polygon_gouraud(surface, p, (200, 150, 250), "numpy") for p in points]
+    batch = shading.GouraudBatch()
+
+    def frame():
+        batch.add(polys, (200, 150, 250))
+        batch.draw(surface)
+    return frame
+
+
+def bench_polygon_hits(count):
+    # jogador girado no ar contra `count` espinhos espalhados pela tela (alguns perto)
+    rng = random.Random(0)
+    player = dict(game.player_default, x=450, y=300, angle=35, scale=1.3)
+    body = game.player_polygon(player)
+    rects = np.array([(rng.randrange(0, game.WIDTH - 60), rng.randrange(0, game.GROUND_Y - 40), 60, 40)
+                      for _ in range(count)], dtype=np.float64)
+    bounds = np.concatenate((rects[:, :2], rects[:, :2] + rects[:, 2:]), axis=1)
+    triangles = game.spike_polygons(rects)
+    return lambda: polygon_hits(body, bounds, triangles.__getitem__)
+
+
+def bench_particles(count):
+    # integra, descarta e desenha `count` partículas, repondo as que morrem
+    init_pygame()
+    screen = pygame.display.set_mode((game.WIDTH, game.HEIGHT))
+    pool = ParticlePool(screen)
+    _, speed, color, life, size = BURSTS["portal"]
+
+    def frame():
+        if len(pool) < count:
+            pool.emit(450, 300, count - len(pool), speed, color, life, size)
+        pool.update(1/60)
+        pool.draw(screen)
+    return frame
+
+
+def frame_runner(level, render):
+    # um passo de simulação (+ desenho com dirty rects) por chamada, com o
+    # roteiro padrão do headless.py em laço para o jogador não ficar parado
+    state = level_state(level)
+    script = headless.parse_script(headless.DEFAULT_SCRIPT)
+    inputs = headless.script_inputs(script)
+    inputs = itertools.cycle([next(inputs) for _ in range(sum(ticks for ticks, _ in script))])
+    renderer = None
+    if render:
+        init_pygame()
+        screen = pygame.display.set_mode((game.WIDTH, game.HEIGHT))
+        renderer = game.Renderer(screen, LazyFont(), dirty_rects=True)
+
+    def frame():
+        game.step(state, next(inputs), 1/60)
+        if renderer:
+            renderer.render(state)
+    return frame
+
+
+def benchmarks():
+    table = {
+        "mat_mul": bench_mat_mul,
+        "apply/player_shape": bench_apply,
+        "build_player_matrix": bench_build_player_matrix,
+    }
+    for vertices in LIGHTING_VERTICES:
+        table[f"lighting/{vertices}v"] = lambda v=vertices: bench_lighting(v)
+    for radius in GOURAUD_RADII:
+        table[f"gouraud/numpy/r{radius}"] = lambda r=radius: bench_gouraud(r, "numpy")
+    for radius in PYTHON_RADII:
+        table[f"gouraud/python/r{radius}"] = lambda r=radius: bench_gouraud(r, "python")
+    for count in BATCH_COUNTS:
+        table[f"gouraud/each/{count}"] = lambda c=count: bench_gouraud_many(c, batched=False)
+        table[f"gouraud/batch/{count}"] = lambda c=count: bench_gouraud_many(c, batched=True)
+    for count in HAZARD_COUNTS:
+        table[f"polygon_hits/{count}"] = lambda c=count: bench_polygon_hits(c)
+    for count in PARTICLE_COUNTS:
+        table[f"particles/{count}"] = lambda c=count: bench_particles(c)
+    for level in range(1, game.LAST_LEVEL + 1):
+        table[f"step/level{level}"] = lambda l=level: frame_runner(l, render=False)
+        table[f"frame/level{level}"] = lambda l=level: frame_runner(l, render=True)
+    for size in STRESS_SIZES:
+        table[f"step/stress{size}"] = lambda s=size: frame_runner(("stress", s), render=False)
+        table[f"frame/stress{size}"] = lambda s=size: frame_runner(("stress", s), render=True)
+    for screens in LONG_SCREENS:
+        table[f"step/long{screens}"] = lambda s=screens: frame_runner(("long", s), render=False)
+        table[f"frame/long{screens}"] = lambda s=screens: frame_runner(("long", s), render=True)
+    return table
+
+
+# ---------------- MEDIÇÃO ----------------
+def measure(func, target=TARGET, repeats=REPEATS):
+    # calibra o número de chamadas por repetição e devolve tempos por chamada (µs)
+    func()
+    loops = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(loops):
+            func()
+        elapsed = time.perf_counter() - start
+        if elapsed >= target or loops >= 1 << 20:
+            break
+        loops *= 2 if elapsed <= 0 else max(2, min(10, int(target / elapsed) + 1))
+
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        for _ in range(loops):
+            func()
+        times.append((time.perf_counter() - start) / loops * 1e6)
+    times.sort()
+    return {"median_us": times[len(times) // 2], "min_us": times[0], "loops": loops, "repeats": repeats}
+
+
+def run_all(pattern=None, target=TARGET, repeats=REPEATS):
+    results = {}
+    for name, setup in benchmarks().items():
+        if pattern and pattern not in name:
+            continue
+        results[name] = measure(setup(), target, repeats)
+        print(f"{name:<24}{results[name]['median_us']:12.2f} µs  (mín {results[name]['min_us']:.2f})", flush=True)
+    return results
+
+
+def environment():
+    return {
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "pygame": pygame.version.ver,
+        "machine": platform.machine(),
+        "system": platform.system(),
+        "date": time.strftime("%Y-%m-%d %H:%M:%S"),
+    }
+
+
+def compare(baseline, results, threshold=THRESHOLD):
+    # devolve [(nome, antes, depois, razão)] das regressões acima do limite
+    print(f"\n{'benchmark':<24}{'antes':>12}{'depois':>12}{'razão':>8}")
+    regressions = []
+    for name, new in results.items():
+        old = baseline["results"].get(name)
+        if old is None:
+            print(f"{name:<24}{'-':>12}{new['median_us']:12.2f}   (novo)")
+            continue
+        ratio = new["median_us"] / old["median_us"]
+        flag = ""
+        if ratio > 1 + threshold:
+            flag = "  REGRESSÃO"
+            regressions.append((name, old["median_us"], new["median_us"], ratio))
+        elif ratio < 1 / (1 + threshold):
+            flag = "  melhorou"
+        print(f"{name:<24}{old['median_us']:12.2f}{new['median_us']:12.2f}{ratio:8.2f}{flag}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks dos caminhos quentes do jogo")
+    parser.add_argument("--filter", metavar="TEXTO", help="roda só os benchmarks cujo nome contém TEXTO")
+    parser.add_argument("--save", metavar="ARQUIVO", help="grava os resultados como linha de base (JSON)")
+    parser.add_argument("--compare", metavar="ARQUIVO", help="compara com uma linha de base gravada")
+    parser.add_argument("--threshold", type=float, default=THRESHOLD,
+                        help="fração de piora tolerada antes de apontar regressão (padrão: 0.15)")
+    parser.add_argument("--quick", action="store_true", help="medição curta, para conferir que tudo roda")
+    parser.add_argument("--list", action="store_true", help="só lista os benchmarks")
+    args = parser.parse_args(argv)
+
+    if args.list:
+        print("\n".join(benchmarks()))
+        return 0
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+
+    if args.quick:
+        results = run_all(args.filter, target=0.005, repeats=3)
+    else:
+        results = run_all(args.filter)
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump({"environment": environment(), "results": results}, f, indent=2)
+        print(f"linha de base gravada em {args.save}")
+
+    if baseline:
+        regressions = compare(baseline, results, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} regressão(ões) acima de {args.threshold:.0%}")
+            return 1
+        print(f"\nnenhuma regressão acima de {args.threshold:.0%}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,96 @@
+import numpy as np
+
+# Pousos contínuos (swept): em vez de olhar só a posição final do sub-passo,
+# testa se o caminho cruzou o topo da plataforma de cima para baixo. Um
+# jogador rápido (ou um dt grande) não atravessa mais plataformas de 20 px.
+# Perigos (espinhos e inimigos) são testados pela hitbox transformada, mais
+# abaixo (SAT).
+
+
+def segment_crosses_top(x0, y0, x1, y1, left, top, width):
+    # partiu de cima do topo e chegou nele ou abaixo, cruzando dentro de [left, right)?
+    # (quem já estava no topo é tratado pelo teste do ponto final)
+    if not (y0 < top <= y1) or width <= 0:
+        return False
+    t = (top - y0) / (y1 - y0)
+    x = x0 + (x1 - x0) * t
+    return left <= x < left + width
+
+
+def segments_cross_tops(x0, y0, x1, y1, left, top, width):
+    # com y1 == y0, t sai inf/nan; essas linhas já caem fora pelo teste de y
+    with np.errstate(divide="ignore", invalid="ignore"):
+        t = (top - y0) / (y1 - y0)
+        x = x0 + (x1 - x0) * t
+    return (y0 < top) & (top <= y1) & (width > 0) & (left <= x) & (x < left + width)
+
+
+def swept_landing(rect, path):
+    # o ponto final pelo collidepoint (igual ao teste antigo) ou o topo cruzado no caminho
+    x0, y0, x1, y1 = path
+    return rect.collidepoint(x1, y1) or segment_crosses_top(x0, y0, x1, y1, rect.x, rect.y, rect.w)
+
+
+# ---------------- POLÍGONOS (SAT) ----------------
+# Contato do polígono transformado do jogador com retângulos e triângulos, em
+# três camadas do mais barato para o mais caro: caixas (AABB), círculos
+# envolventes e, só para quem passou pelas duas, o teorema do eixo separador.
+# Polígonos convexos; encostar na borda não conta como contato.
+ROTATE = np.array([[0.0, 1.0], [-1.0, 0.0]])     # (x, y) @ ROTATE = (-y, x)
+NEXT_VERTEX = {}                                 # V -> índices (1, 2, ..., V-1, 0)
+
+
+def edge_normals(polys):
+    # normais (não normalizadas) das arestas; polys (..., V, 2) -> (..., V, 2)
+    vertices = polys.shape[-2]
+    following = NEXT_VERTEX.get(vertices)
+    if following is None:
+        following = NEXT_VERTEX[vertices] = np.append(np.arange(1, vertices), 0)
+    return (polys[..., following, :] - polys) @ ROTATE
+
+
+def polygons_overlap(poly, polys):
+    # SAT entre um polígono (V, 2) e N polígonos (N, W, 2); máscara (N,).
+    # Eixos do polígono (comuns a todos) e de cada um dos outros separados.
+    own = edge_normals(poly).T                                            # (2, V)
+    a, b = poly @ own, polys @ own                                        # (V, V), (N, W, V)
+    separated = ((a.max(axis=0) <= b.min(axis=1)) | (b.max(axis=1) <= a.min(axis=0))).any(axis=1)
+    axes = edge_normals(polys).transpose(0, 2, 1)                         # (N, 2, W)
+    a, b = poly @ axes, polys @ axes                                      # (N, V, W), (N, W, W)
+    separated |= ((a.max(axis=1) <= b.min(axis=1)) | (b.max(axis=1) <= a.min(axis=1))).any(axis=1)
+    return ~separated
+
+
+def polygon_hits(poly, bounds, shapes):
+    # índices dos elementos que encostam em poly (V, 2).
+    # bounds: caixas (N, 4) como (x0, y0, x1, y1); shapes(índices) -> polígonos (M, W, 2)
+    # contidos nas caixas. O círculo de cada elemento é o da sua caixa, então
+    # os polígonos só são montados para quem passa pelos dois primeiros testes.
+    lo = poly.min(axis=0)
+    hi = poly.max(axis=0)
+    index = np.flatnonzero((bounds[:, 0] < hi[0]) & (lo[0] < bounds[:, 2]) &
+                           (bounds[:, 1] < hi[1]) & (lo[1] < bounds[:, 3]))
+    if not len(index):
+        return index
+    center = (lo + hi) / 2
+    radius = np.sqrt(((poly - center) ** 2).sum(axis=1).max())
+    box = bounds[index]
+    centers = (box[:, :2] + box[:, 2:]) / 2
+    radii = np.hypot(box[:, 2] - box[:, 0], box[:, 3] - box[:, 1]) / 2
+    index = index[((centers - center) ** 2).sum(axis=1) < (radii + radius) ** 2]
+    if not len(index):
+        return index
+    return index[polygons_overlap(poly, np.asarray(shapes(index), dtype=np.float64))]
+
+
+def rect_polygons(x, y, w, h, out=None):
+    # retângulos (arrays) -> quadriláteros (N, 4, 2); out: buffer (N, 4, 2) reaproveitado
+    if out is None:
+        out = np.empty((len(x), 4, 2))
+    out[:, 0, 0] = out[:, 3, 0] = out[:, 1, 0] = x
+    out[:, 1, 0] += w
+    out[:, 2, 0] = out[:, 1, 0]
+    out[:, 0, 1] = out[:, 1, 1] = out[:, 2, 1] = y
+    out[:, 2, 1] += h
+    out[:, 3, 1] = out[:, 2, 1]
+    return out
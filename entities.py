@@ -0,0 +1,124 @@
+import numpy as np
+
+from collision import segments_cross_tops, rect_polygons
+
+# Entidades que patrulham um eixo (inimigos e plataformas móveis) guardadas
+# como struct of arrays: cada campo é um array contíguo e o movimento, o
+# rebote nos limites e o teste de contato rodam para todas de uma vez.
+#
+# As posições continuam inteiras, como num pygame.Rect: cada atualização
+# arredonda metade para longe do zero, igual à atribuição Rect.x = float.
+
+
+def round_rect(values):
+    return np.copysign(np.floor(np.abs(values) + 0.5), values)
+
+
+class PatrolStore:
+    def __init__(self, x=(), y=(), w=(), h=(), dir=(), min=(), max=(), speed=()):
+        self.x = np.array(x, dtype=np.float64)
+        self.y = np.array(y, dtype=np.float64)
+        self.w = np.array(w, dtype=np.float64)
+        self.h = np.array(h, dtype=np.float64)
+        self.dir = np.array(dir, dtype=np.int64)
+        self.min = np.array(min, dtype=np.float64)
+        self.max = np.array(max, dtype=np.float64)
+        self.speed = np.array(speed, dtype=np.float64)
+
+    @classmethod
+    def from_rows(cls, rows):
+        # linhas (x, y, w, h, dir, min, max, speed) — o layout do cache de levels.py
+        rows = np.asarray(rows, dtype=np.float64).reshape(-1, 8)
+        return cls(*rows.T)
+
+    def __len__(self):
+        return len(self.x)
+
+    def copy(self):
+        return PatrolStore(self.x, self.y, self.w, self.h, self.dir, self.min, self.max, self.speed)
+
+    def centers(self, out=None):
+        # mesmo arredondamento de Rect.center; out: buffer (N, 2) reaproveitado
+        if out is None:
+            return np.stack((self.x + self.w // 2, self.y + self.h // 2), axis=1)
+        np.floor_divide(self.w, 2, out=out[:, 0])
+        out[:, 0] += self.x
+        np.floor_divide(self.h, 2, out=out[:, 1])
+        out[:, 1] += self.y
+        return out
+
+    def bounds(self):
+        # caixas (N, 4) como (x0, y0, x1, y1), para collision.polygon_hits
+        return np.stack((self.x, self.y, self.x + self.w, self.y + self.h), axis=1)
+
+    def polygons(self, index):
+        # retângulos de `index` como quadriláteros (M, 4, 2)
+        return rect_polygons(self.x[index], self.y[index], self.w[index], self.h[index])
+
+    def contains(self, px, py):
+        # Rect.collidepoint para todas as entidades (o ponto é truncado para inteiro)
+        px = int(px); py = int(py)
+        return ((self.x <= px) & (px < self.x + self.w) &
+                (self.y <= py) & (py < self.y + self.h) &
+                (self.w > 0) & (self.h > 0))
+
+    def landed(self, prev_x, prev_y, x0, y0, x1, y1):
+        # O segmento (x0, y0) -> (x1, y1) visto no referencial de cada entidade,
+        # que andou de (prev_x, prev_y) até a posição atual neste sub-passo:
+        # só conta cruzar o topo descendo (pouso)
+        relative = segments_cross_tops(x0 - prev_x, y0 - prev_y, x1 - self.x, y1 - self.y,
+                                       0.0, 0.0, self.w)
+        return self.contains(x1, y1) | relative
+
+    def hits(self, path, prev_x, prev_y):
+        # Plataformas em que o caminho (x0, y0, x1, y1) pousa, em ordem crescente,
+        # relendo o caminho após cada índice: a resposta a uma colisão pode mover
+        # o jogador. (prev_x, prev_y) são as posições no início do sub-passo.
+        if not len(self.x):
+            return
+        last = -1
+        while True:
+            mask = self.landed(prev_x, prev_y, *path())
+            following = np.flatnonzero(mask[last + 1:])
+            if not len(following):
+                return
+            last += 1 + int(following[0])
+            yield last
+
+
+def patrol_enemies(store, speed, delta_time):
+    # anda e inverte a direção ao sair de [min, max] (sem prender no limite)
+    if not len(store.x):
+        return
+    store.x[:] = round_rect(store.x + store.dir * speed * delta_time)
+    out = (store.x < store.min) | (store.x > store.max)
+    store.dir[out] *= -1
+
+
+def patrol_horizontal(store, delta_time):
+    # devolve o deslocamento de cada plataforma (usado para a "carona")
+    if not len(store.x):
+        return store.speed  # vazio: nada a mover
+    delta_x = store.speed * delta_time * store.dir
+    store.x[:] = round_rect(store.x + delta_x)
+
+    low = store.x < store.min
+    high = ~low & (store.x + store.w > store.max)
+    store.x[low] = round_rect(store.min[low])
+    store.x[high] = round_rect(store.max[high] - store.w[high])
+    store.dir[low | high] *= -1
+    return delta_x
+
+
+def patrol_vertical(store, delta_time):
+    if not len(store.x):
+        return store.speed  # vazio: nada a mover
+    delta_y = store.speed * delta_time * store.dir
+    store.y[:] = round_rect(store.y + delta_y)
+
+    low = store.y < store.min
+    high = ~low & (store.y > store.max)
+    store.y[low] = round_rect(store.min[low])
+    store.y[high] = round_rect(store.max[high])
+    store.dir[low | high] *= -1
+    return delta_y
@@ -1,18 +1,34 @@
+import time
+IMPORT_START = time.perf_counter()   # início dos imports (relatório de partida)
 import pygame
+import gc
 import math
 import sys
+import argparse
+import numpy as np
+from collections import deque
+from transform import frame_polygons, player_affine, transform_batch, FrameBuffers
+from spatial import build_level_grid
+from collision import swept_landing, polygon_hits, rect_polygons
+from entities import PatrolStore, patrol_enemies, patrol_horizontal, patrol_vertical
+from world import ChunkedWorld, follow_camera
+from scene import Scene
+import levels
+from profiler import FrameProfiler
+import shading
+from quality import draw_polygon, FlatShading, GouraudShading, SceneShading, QualityGovernor, MODES
+from startup import init_pygame, LazyFont, StartupTimer
+from simthread import SimThread, SnapshotBuffer, interpolate, SIM_HZ
+from scheduler import FrameScheduler, BUSY_WAIT
+from particles import ParticlePool
+from rewind import RewindBuffer
 
-pygame.init()
 WIDTH, HEIGHT = 900, 600
-screen = pygame.display.set_mode((WIDTH, HEIGHT))
-pygame.display.set_caption("Go to the Portal!")
-clock = pygame.time.Clock()
-FONT = pygame.font.SysFont("consolas", 18)
-
 GROUND_Y = HEIGHT - 100
 
 # Personagem
 base_shape = [(-30,-40),(30,-40),(40,40),(-20,40)]
+enemy_shape = [(-20,-20),(20,-20),(20,20),(-20,20)]
 
 player_default = {
     "x": 100,
@@ -26,263 +42,282 @@ player_default = {
     "scale": 1.0,
     "shx": 0.0,
 }
-player = player_default.copy()
-
-# Elementos variáveis por fase
-portal_rect = None
-spikes = []
-platforms = []
-enemies = []
-
-# Plataformas móveis (usadas apenas na fase 4)
-moving_platforms = []      # listas de dicts: {"rect", "dir", "min", "max", "speed"}
-vertical_platforms = []    # listas de dicts: {"rect", "dir", "min", "max", "speed"}
-
-# ---------------- MATRIZES ----------------
-def mat_mul(A,B):
-    C = [[0]*3 for _ in range(3)]
-    for i in range(3):
-        for j in range(3):
-            for k in range(3):
-                C[i][j] += A[i][k] * B[k][j]
-    return C
-
-def mat_translate(tx,ty): return [[1,0,tx],[0,1,ty],[0,0,1]]
-def mat_scale(sx,sy): return [[sx,0,0],[0,sy,0],[0,0,1]]
-def mat_rotate(a):
-    radianos=math.radians(a); cosseno=math.cos(radianos); seno=math.sin(radianos)
-    return [[cosseno,-seno,0],[seno,cosseno,0],[0,0,1]]
-def mat_shear(shx): return [[1,shx,0],[0,1,0],[0,0,1]]
-def mat_reflect(dir): return [[dir,0,0],[0,1,0],[0,0,1]]
-
-def apply(matriz, pontos):
-    x, y = pontos
-    nx=matriz[0][0]*x + matriz[0][1]*y + matriz[0][2]
-    ny=matriz[1][0]*x + matriz[1][1]*y + matriz[1][2]
-    return (nx,ny)
-
-
-def build_player_matrix(p):
-    scale = mat_scale(p["scale"], p["scale"])
-    shear = mat_shear(p["shx"])
-    rotacao = mat_rotate(p["angle"])
-    reflexao = mat_reflect(p["direction"])
-    translacao = mat_translate(p["x"], p["y"])
-    return mat_mul(translacao, mat_mul(reflexao, mat_mul(rotacao, mat_mul(shear, scale))))
-
-
-def reset_player():
-    global player
-    player = player_default.copy()
+
+JUMP_VY = -580
+GRAVITY = 900
+RUN_SPEED = 230
+JUMP_SPIN = 300          # graus/s girando no ar
+JUMP_SCALE = 1.3         # escala aplicada ao pular
+ENEMY_SPEED = 120
+LAST_LEVEL = levels.level_count()
+
+# Broadphase por grade espacial; False volta à varredura linear de todos os elementos
+BROADPHASE = True
+
+# Sub-passos da física: dt maiores que MAX_SUBSTEP são divididos, até MAX_SUBSTEPS por quadro
+MAX_SUBSTEP = 1/50
+MAX_SUBSTEPS = 8
+
+# profiler.FrameProfiler ativo (F3 / --profile-trace); None = medição desligada
+PROFILER = None
+
+# Camada estática em cache e display.update(rects); F2 alterna com o redesenho completo
+DIRTY_RECTS = True
+HUD_REFRESH = 15        # o texto do HUD é refeito a cada N quadros (entre eles, vem do cache da fonte)
+
+# Entrada de um passo de simulação: teclas seguradas + pulo pressionado neste passo
+NO_INPUT = {"left": False, "right": False, "jump": False, "quit": False,
+            "toggle_render": False, "toggle_profiler": False, "toggle_shading": False,
+            "toggle_sprite_cache": False, "toggle_raster": False, "rewind": False}
+
+# Hitbox do jogador contra inimigos e espinhos: o base_shape reduzido em volta
+# da âncora (1.0 = exatamente o polígono desenhado). Com o polígono inteiro,
+# girando e a 1.3x no ar, as fases 3 e 4 ficam sem rota (python validate.py)
+HITBOX_SCALE = 0.6
+HITBOX_SHAPE = [(x * HITBOX_SCALE, y * HITBOX_SCALE) for x, y in base_shape]
+
+# Morte: renasce no último lugar seguro do histórico (rewind.py); False volta
+# sempre ao início da fase
+RESPAWN_AT_SAFE = True
+
+# Plataformas que carregam o jogador parado sobre elas (ver scene.py)
+RIDE_KINDS = ("moving_platforms", "vertical_platforms")
+
+# Sombreamento do jogador: "auto" deixa o quality.QualityGovernor escolher
+# entre Gouraud e chapado pelo tempo de quadro; F4 alterna auto/gouraud/flat
+SHADING_CHOICES = ("auto",) + MODES
+PLAYER_COLOR = (200,150,250)
+
+# Efeitos de partículas pedidos pela simulação e ainda não desenhados: o
+# Renderer tira de state["effects"] e cria as rajadas (particles.py)
+MAX_EFFECTS = 64
+
+def reset_player(state):
+    state["player"] = player_default.copy()
+    state["scene"].ride(None)
+
+
+def kill_player(state, cause):
+    # morte neste tick: volta ao início e guarda a primeira causa ("enemy", "spike", "fall")
+    if state["death_cause"] is None:
+        state["death_cause"] = cause
+    state["effects"].append(("death", state["player"]["x"], state["player"]["y"]))
+    if not (RESPAWN_AT_SAFE and state["rewind"].respawn(state)):
+        reset_player(state)
+
+
+def new_state(level=1):
+    # Estado completo do jogo; os elementos variáveis por fase são preenchidos em load_level
+    state = {
+        "level": level,
+        "player": player_default.copy(),
+        "time": 0.0,
+        "running": True,
+        "won": False,
+        "deaths": 0,
+        "death_cause": None,     # causa da morte no último tick (None se não morreu)
+        "portal_rect": None,
+        "spikes": [],
+        "spike_shapes": None,    # (caixas (N, 4), triângulos (N, 3, 2)) dos espinhos
+        "platforms": [],
+        # Inimigos e plataformas móveis (estas usadas apenas na fase 4):
+        # entities.PatrolStore com arrays x, y, w, h, dir, min, max, speed
+        "enemies": PatrolStore(),
+        "moving_platforms": PatrolStore(),
+        "vertical_platforms": PatrolStore(),
+        "grid": None,
+        # chunks carregados (world.ChunkedWorld) e posição horizontal da câmera
+        "world": None,
+        "camera_x": 0,
+        "generation": 0,         # world.generation dos chunks montados no estado
+        # hierarquia de transformações (scene.Scene): plataformas que se movem e o jogador
+        "scene": None,
+        # (efeito, x, y) para o desenho; deque porque a simulação pode estar em outra thread
+        "effects": deque(maxlen=MAX_EFFECTS),
+        # últimos segundos do estado em registros compactos (voltar no tempo e renascer)
+        "rewind": RewindBuffer(),
+    }
+    load_level(state, level)
+    return state
 
 
 # ---------------- CARREGAR FASES ----------------
-def load_level(level):
-    global portal_rect, spikes, platforms, enemies, moving_platforms, vertical_platforms
-    # reset containers
-    platforms = []
-    spikes = []
-    enemies = []
-    moving_platforms = []
-    vertical_platforms = []
-
-    # -----------------------------------------
-    # ================ FASE 1 =================
-    # -----------------------------------------
-    if level == 1:
-        portal_rect = pygame.Rect(780, GROUND_Y - 80, 60, 80)
-
-        spikes = [
-            pygame.Rect(500, GROUND_Y - 40, 60, 40),
-            pygame.Rect(550, GROUND_Y - 40, 60, 40),
-            pygame.Rect(250, GROUND_Y - 40, 60, 40),
-            pygame.Rect(200, GROUND_Y - 40, 60, 40)
-        ]
-
-        platforms = [
-            pygame.Rect(300, GROUND_Y - 160, 150, 20),
-            pygame.Rect(550, GROUND_Y - 240, 150, 20)
-        ]
-
-        enemies = [
-            {"rect": pygame.Rect(350, GROUND_Y - 40, 40, 40), "dir": 1, "min": 330, "max": 470},
-            {"rect": pygame.Rect(600, GROUND_Y - 280, 40, 40), "dir": -1, "min": 550, "max": 650},
-            {"rect": pygame.Rect(320, GROUND_Y - 200, 40, 40), "dir": 1, "min": 300, "max": 420}
-        ]
-
-
-    # -----------------------------------------
-    # =============== FASE 2 ==================
-    # -----------------------------------------
-    elif level == 2:
-        portal_rect = pygame.Rect(740, GROUND_Y - 440, 60, 80)
-
-        spikes = [
-            pygame.Rect(150, GROUND_Y - 40, 60, 40),
-            pygame.Rect(210, GROUND_Y - 40, 60, 40),
-            pygame.Rect(270, GROUND_Y - 40, 60, 40),
-            pygame.Rect(330, GROUND_Y - 40, 60, 40),
-            pygame.Rect(390, GROUND_Y - 40, 60, 40),
-            pygame.Rect(450, GROUND_Y - 40, 60, 40),
-            pygame.Rect(510, GROUND_Y - 40, 60, 40),
-            pygame.Rect(570, GROUND_Y - 40, 60, 40),
-            pygame.Rect(630, GROUND_Y - 40, 60, 40),
-            pygame.Rect(690, GROUND_Y - 40, 60, 40),
-            pygame.Rect(750, GROUND_Y - 40, 60, 40),
-            pygame.Rect(810, GROUND_Y - 40, 60, 40),
-
-            pygame.Rect(290, GROUND_Y - 190, 60, 40),
-            pygame.Rect(500, GROUND_Y - 290, 60, 40)
-        ]
-
-        platforms = [
-            pygame.Rect(200, GROUND_Y - 150, 150, 20),
-            pygame.Rect(420, GROUND_Y - 250, 150, 20),
-            pygame.Rect(650, GROUND_Y - 350, 150, 20),
-        ]
-
-        enemies = [
-            {"rect": pygame.Rect(220, GROUND_Y - 190, 40, 40), "dir": 1, "min": 200, "max": 330},
-            {"rect": pygame.Rect(450, GROUND_Y - 290, 40, 40), "dir": -1, "min": 420, "max": 540},
-            {"rect": pygame.Rect(680, GROUND_Y - 390, 40, 40), "dir": 1, "min": 650, "max": 780}
-        ]
-
-
-    # -----------------------------------------
-    # ================ FASE 3 =================
-    # -----------------------------------------
-    elif level == 3:
-        portal_rect = pygame.Rect(200, GROUND_Y - 420, 60, 80)
-
-        spikes = [
-            pygame.Rect(350, GROUND_Y - 40, 60, 40),
-            pygame.Rect(410, GROUND_Y - 40, 60, 40),
-            pygame.Rect(470, GROUND_Y - 40, 60, 40),
-
-            pygame.Rect(600, GROUND_Y - 260, 60, 40),
-            pygame.Rect(260, GROUND_Y - 190, 60, 40)
-        ]
-
-        platforms = [
-            pygame.Rect(250, GROUND_Y - 150, 150, 20),
-            pygame.Rect(500, GROUND_Y - 220, 150, 20),
-            pygame.Rect(700, GROUND_Y - 300, 150, 20),
-            pygame.Rect(400, GROUND_Y - 380, 150, 20),
-        ]
-
-        enemies = [
-            {"rect": pygame.Rect(520, GROUND_Y - 260, 40, 40), "dir": 1, "min": 500, "max": 620},
-            {"rect": pygame.Rect(720, GROUND_Y - 340, 40, 40), "dir": -1, "min": 700, "max": 820},
-            {"rect": pygame.Rect(300, GROUND_Y - 190, 40, 40), "dir": 1, "min": 250, "max": 380},
-            {"rect": pygame.Rect(420, GROUND_Y - 420, 40, 40), "dir": 1, "min": 400, "max": 520},
-        ]
-
-
-    # -----------------------------------------
-    # ================ FASE 4 =================
-    # -----------------------------------------
-    elif level == 4:
-        portal_rect = pygame.Rect(70, GROUND_Y - 400, 60, 80)
-
-        spikes = [
-            pygame.Rect(150, GROUND_Y - 40, 60, 40),
-            pygame.Rect(210, GROUND_Y - 40, 60, 40),
-            pygame.Rect(270, GROUND_Y - 40, 60, 40),
-            pygame.Rect(330, GROUND_Y - 40, 60, 40),
-            pygame.Rect(390, GROUND_Y - 40, 60, 40),
-            pygame.Rect(450, GROUND_Y - 40, 60, 40),
-            pygame.Rect(510, GROUND_Y - 40, 60, 40),
-            pygame.Rect(570, GROUND_Y - 40, 60, 40),
-            pygame.Rect(630, GROUND_Y - 40, 60, 40),
-            pygame.Rect(690, GROUND_Y - 40, 60, 40),
-            pygame.Rect(750, GROUND_Y - 40, 60, 40),
-            pygame.Rect(810, GROUND_Y - 40, 60, 40),
-            
-            pygame.Rect(150, GROUND_Y - 390, 60, 40),
-            pygame.Rect(210, GROUND_Y - 390, 60, 40),
-            pygame.Rect(270, GROUND_Y - 390, 60, 40),
-            pygame.Rect(330, GROUND_Y - 390, 60, 40),
-            pygame.Rect(390, GROUND_Y - 390, 60, 40),
-            pygame.Rect(450, GROUND_Y - 390, 60, 40),
-            pygame.Rect(510, GROUND_Y - 390, 60, 40),
-            pygame.Rect(570, GROUND_Y - 390, 60, 40),
-            pygame.Rect(630, GROUND_Y - 390, 60, 40),
-            
-            pygame.Rect(0, GROUND_Y - 290, 60, 40),
-            pygame.Rect(60, GROUND_Y - 290, 60, 40),
-            pygame.Rect(120, GROUND_Y - 290, 60, 40),
-        ]
-
-        # Plataformas horizontais móveis (speed em pixels/segundo)
-        moving_platforms = [
-            {"rect": pygame.Rect(150, GROUND_Y - 100, 120, 20), "dir": 1, "min": 150, "max": 800, "speed": 300},
-            {"rect": pygame.Rect(320, GROUND_Y - 410, 120, 20), "dir": 1, "min": 300, "max": 520, "speed": 70},
-        ]
-
-        # Plataformas verticais
-        vertical_platforms = [
-            {"rect": pygame.Rect(700, GROUND_Y - 240, 120, 20), "dir": 1, "min": GROUND_Y - 460, "max": GROUND_Y - 100, "speed": 100},
-        ]
-
-        # Inimigos posicionados em pontos críticos
-        enemies = [
-            {"rect": pygame.Rect(800, GROUND_Y - 170, 40, 40), "dir": 1, "min": 220, "max": 800},
-            {"rect": pygame.Rect(220, GROUND_Y - 300, 40, 40), "dir": -1, "min": 220, "max": 800},
-        ]
-
-    globals()["platforms"] = platforms
-    globals()["spikes"] = spikes
-    globals()["enemies"] = enemies
-    globals()["moving_platforms"] = moving_platforms
-    globals()["vertical_platforms"] = vertical_platforms
-
-
-# -----------------------------------------------------------------------
-
-def draw_polygon(points, color):
-    pygame.draw.polygon(screen, color, points)
-    pygame.draw.polygon(screen, (20,20,20), points, 2)
+def load_level(state, level, table=None):
+    # fases vêm de levels/levelN.json (ver levels.py) e entram em chunks conforme
+    # a câmera anda (ver world.py); table permite passar uma fase já compilada
+    # por levels.compile_level (ex.: as fases sintéticas do bench.py)
+    if table is None:
+        table = levels.cached_table(levels.level_path(level))
+    state["level"] = level
+    state["world"] = ChunkedWorld(table, WIDTH, ENEMY_SPEED)
+    state["scene"] = Scene()
+    state["camera_x"] = follow_camera(state["world"].width, WIDTH, player_default["x"])
+    set_entities(state, state["world"].update(state, state["camera_x"], state["time"]))
+    state["rewind"].layout(state)
+
+
+def set_entities(state, data):
+    # entidades dos chunks carregados (dicionário de levels.build_entities)
+    state["portal_rect"] = data["portal"]
+    state["platforms"] = data["platforms"]
+    state["spikes"] = data["spikes"]
+    rects = np.array([tuple(r) for r in data["spikes"]], dtype=np.float64).reshape(-1, 4)
+    state["spike_shapes"] = (np.concatenate((rects[:, :2], rects[:, :2] + rects[:, 2:]), axis=1),
+                             spike_polygons(rects))
+    state["enemies"] = data["enemies"]
+    state["moving_platforms"] = data["moving_platforms"]
+    state["vertical_platforms"] = data["vertical_platforms"]
+    state["generation"] = state["world"].generation
+    state["scene"].load_platforms({kind: data[kind] for kind in RIDE_KINDS},
+                                  {kind: state["world"].loaded_of(kind) for kind in RIDE_KINDS})
+    # grade só da geometria estática dos chunks carregados, refeita a cada carga;
+    # inimigos e plataformas móveis ficam fora (testados em lote pelo PatrolStore)
+    state["grid"] = build_level_grid(state)
 
 
 # -----------------------------------------
-# -------------- LOOP PRINCIPAL ------------
+# ---------------- SIMULAÇÃO --------------
 # -----------------------------------------
-level = 1
-load_level(level)
-
-running=True
-while running:
-    delta_time = clock.tick(60)/1000  # trava o jogo a 60 FPS
+def read_inputs():
+    # Lê eventos e teclado do pygame e converte para o formato de step()
+    inputs = dict(NO_INPUT)
+    for event in pygame.event.get():
+        if event.type == pygame.QUIT:
+            inputs["quit"] = True
+
+        if event.type == pygame.KEYDOWN:
+            if event.key == pygame.K_SPACE or event.key == pygame.K_UP:
+                inputs["jump"] = True
+            if event.key == pygame.K_F2:
+                inputs["toggle_render"] = True
+            if event.key == pygame.K_F3:
+                inputs["toggle_profiler"] = True
+            if event.key == pygame.K_F4:
+                inputs["toggle_shading"] = True
+            if event.key == pygame.K_c:
+                inputs["toggle_sprite_cache"] = True
+            if event.key == pygame.K_g:
+                inputs["toggle_raster"] = True
+
+    keys = pygame.key.get_pressed()
+    inputs["left"] = keys[pygame.K_LEFT]
+    inputs["right"] = keys[pygame.K_RIGHT]
+    inputs["rewind"] = keys[pygame.K_r]
+    return inputs
+
+
+def player_polygon(player):
+    # hitbox com a transformação completa do jogador, como no desenho (V, 2)
+    return transform_batch(player_affine(player)[None], HITBOX_SHAPE)[0]
+
+
+def spike_polygons(rects):
+    # retângulos (N, 4) dos espinhos -> triângulos desenhados (N, 3, 2)
+    x, y, w, h = rects.T
+    out = np.empty((len(rects), 3, 2))
+    out[:, 0, 0] = x
+    out[:, 1, 0] = x + w / 2
+    out[:, 2, 0] = x + w
+    out[:, 0, 1] = out[:, 2, 1] = y + h
+    out[:, 1, 1] = y
+    return out
+
+
+def candidates(state, kind, area):
+    # índices de `kind` a testar contra `area` (x0, y0, x1, y1), na ordem da varredura linear
+    if BROADPHASE:
+        return state["grid"].scan(kind, area)
+    return range(1 if kind == "portal" else len(state[kind]))
+
+
+def step(state, inputs, delta_time):
+    # Divide dt grandes em sub-passos de no máximo MAX_SUBSTEP. Acima de
+    # MAX_SUBSTEPS o tempo excedente é descartado (o jogo fica mais lento em vez
+    # de gastar cada vez mais sub-passos por quadro).
+    substeps = max(1, math.ceil(delta_time / MAX_SUBSTEP))
+    if substeps > MAX_SUBSTEPS:
+        substeps = MAX_SUBSTEPS
+        delta_time = MAX_SUBSTEP * MAX_SUBSTEPS
+    sub_dt = delta_time / substeps
+
+    state["death_cause"] = None
+    # R segurado: um tick do histórico para trás por step, no lugar da simulação;
+    # no registro mais antigo fica parado nele até soltar o R
+    if inputs["rewind"] and not inputs["quit"]:
+        rewind(state)
+        return
+    # o pulo é um evento: vale só no primeiro sub-passo
+    held = dict(inputs, jump=False)
+    for i in range(substeps):
+        substep(state, inputs if i == 0 else held, sub_dt)
+        if not state["running"]:
+            break
+
+    if state["death_cause"] is not None:
+        state["deaths"] += 1
+    stream(state)
+    state["rewind"].push(state)
+
+
+def rewind(state):
+    # volta ao registro anterior do histórico; False se não há para onde voltar
+    history = state["rewind"]
+    row = history.back()
+    if row is None:
+        return False
+    state["time"], state["camera_x"] = history.clock(row)
+    # chunks da câmera do registro, para as entidades estarem na mesma ordem
+    data = state["world"].update(state, state["camera_x"], state["time"])
+    if data is not None:
+        set_entities(state, data)
+    history.restore(state, row)
+    for kind in RIDE_KINDS:
+        state["scene"].move_platforms(kind, state[kind])
+    return True
+
+
+def stream(state):
+    # a câmera segue o jogador; chunks entram e saem conforme ela anda
+    world = state["world"]
+    state["camera_x"] = follow_camera(world.width, WIDTH, state["player"]["x"])
+    data = world.update(state, state["camera_x"], state["time"])
+    if data is not None:
+        set_entities(state, data)
+
+
+def substep(state, inputs, delta_time):
+    prof = PROFILER
+    player = state["player"]
+    state["time"] += delta_time
+
+    if inputs["quit"]:
+        state["running"] = False
+
+    if inputs["jump"] and player["on_ground"]:
+        player["vy"] = JUMP_VY
+        player["on_ground"] = False
+        player["scale"] *= JUMP_SCALE
+        state["effects"].append(("jump", player["x"], player["y"] + 40))
 
-    for enemy in pygame.event.get():
-        if enemy.type == pygame.QUIT:
-            running = False
-
-        if enemy.type == pygame.KEYDOWN:
-            if (enemy.key == pygame.K_SPACE or enemy.key == pygame.K_UP) and player["on_ground"]:
-                player["vy"] = -580
-                player["on_ground"] = False
-                player["scale"] *= 1.3
-
-    keys=pygame.key.get_pressed()
     player["vx"] = 0
 
-    if keys[pygame.K_LEFT]:
-        player["vx"] = -230
+    if inputs["left"]:
+        player["vx"] = -RUN_SPEED
         player["direction"] = -1
-    if keys[pygame.K_RIGHT]:
-        player["vx"] = 230
+    if inputs["right"]:
+        player["vx"] = RUN_SPEED
         player["direction"] = 1
 
     # Rotação ao pular
     if not player["on_ground"]:
-        player["angle"] += 300 * delta_time
+        player["angle"] += JUMP_SPIN * delta_time
     else:
         player["angle"] = 0
 
     # Física
+    start = [player["x"], player["y"]]      # de onde o jogador partiu neste sub-passo
     player["x"] += player["vx"] * delta_time
-    player["vy"] += 900 * delta_time
+    player["vy"] += GRAVITY * delta_time
     player["y"] += player["vy"] * delta_time
 
     # Chão
@@ -292,117 +327,505 @@ while running:
         player["on_ground"] = True
         player["scale"] = 1.0
 
+    # Caminho percorrido pelos pés e ponto da âncora do jogador (relidos a cada uso:
+    # a resposta a uma colisão pode mover ou reiniciar o jogador no meio da varredura)
+    feet = lambda: (start[0], start[1] + 40, state["player"]["x"], state["player"]["y"] + 40)
+
+    def anchor_point():
+        x, y = state["player"]["x"], state["player"]["y"]
+        return (x, y, x, y)
+
     # Plataformas fixas
-    for plat in platforms:
-        if plat.collidepoint(player["x"], player["y"] + 40) and player["vy"] >= 0:
+    platforms = state["platforms"]
+    for i in candidates(state, "platforms", feet):
+        plat = platforms[i]
+        if player["vy"] >= 0 and swept_landing(plat, feet()):
             player["y"] = plat.y - 40
             player["vy"] = 0
             player["on_ground"] = True
             player["scale"] = 1.0
 
-    # Plataformas horizontais móveis
-    for moving_platform in moving_platforms:
-        # movimento baseado em velocidade (pixels/segundo)
-        delta_x = moving_platform["speed"] * delta_time * moving_platform["dir"]
-        moving_platform["rect"].x += delta_x
-        if moving_platform["rect"].x < moving_platform["min"]:
-            moving_platform["rect"].x = moving_platform["min"]
-            moving_platform["dir"] *= -1
-        elif moving_platform["rect"].x + moving_platform["rect"].width > moving_platform["max"]:
-            moving_platform["rect"].x = moving_platform["max"] - moving_platform["rect"].width
-            moving_platform["dir"] *= -1
-
-        # colisão: se cair sobre a plataforma
-        if moving_platform["rect"].collidepoint(player["x"], player["y"] + 40) and player["vy"] >= 0:
-            player["y"] = moving_platform["rect"].y - 40
-            player["vy"] = 0
-            player["on_ground"] = True
-            player["scale"] = 1.0
-            # jogador "pega carona" horizontal
-            player["x"] += delta_x
-
-    # Plataformas verticais
-    for vertical_platform in vertical_platforms:
-        delta_y = vertical_platform["speed"] * delta_time * vertical_platform["dir"]
-        vertical_platform["rect"].y += delta_y
-        if vertical_platform["rect"].y < vertical_platform["min"]:
-            vertical_platform["rect"].y = vertical_platform["min"]
-            vertical_platform["dir"] *= -1
-        elif vertical_platform["rect"].y > vertical_platform["max"]:
-            vertical_platform["rect"].y = vertical_platform["max"]
-            vertical_platform["dir"] *= -1
-
-        if vertical_platform["rect"].collidepoint(player["x"], player["y"] + 40) and player["vy"] >= 0:
-            player["y"] = vertical_platform["rect"].y - 40
-            player["vy"] = 0
-            player["on_ground"] = True
-            player["scale"] = 1.0
-            # se a plataforma vertical se mover enquanto o jogador está sobre ela,
-            # o dy já foi aplicado à plataforma; não aplicamos automaticamente ao jogador
-            # porque o jogador y foi ajustado para ficar "em cima" da plataforma.
+    # Plataformas móveis (horizontais e verticais): movimento baseado em velocidade
+    # (pixels/segundo). O jogador parado numa delas é filho do nó dela na cena e
+    # anda junto nos dois eixos.
+    scene = state["scene"]
+    riding = scene.riding()
+    if riding:
+        scene.place_player(player["x"], player["y"])
+    moving_platforms = state["moving_platforms"]
+    vertical_platforms = state["vertical_platforms"]
+    prev = {"moving_platforms": (moving_platforms.x.copy(), moving_platforms.y.copy()),
+            "vertical_platforms": (vertical_platforms.x.copy(), vertical_platforms.y.copy())}
+    patrol_horizontal(moving_platforms, delta_time)
+    patrol_vertical(vertical_platforms, delta_time)
+    for kind in RIDE_KINDS:
+        scene.move_platforms(kind, state[kind])
+    if riding:
+        player["x"], player["y"] = scene.player_position()
+
+    # colisão: se cair sobre a plataforma, passa a andar com ela
+    ride = (None, None)
+    for kind in RIDE_KINDS:
+        store = state[kind]
+        for i in store.hits(feet, *prev[kind]):
+            if player["vy"] >= 0:
+                player["y"] = int(store.y[i]) - 40
+                player["vy"] = 0
+                player["on_ground"] = True
+                player["scale"] = 1.0
+                ride = (kind, i)
+    scene.ride(*ride)
+    if prof: prof.mark("physics")
+
+    # Perigos: o polígono do jogador como é desenhado (rotação, escala, cisalhamento)
+    # contra os retângulos dos inimigos e os triângulos dos espinhos, testado no
+    # fim do sub-passo (ver collision.polygon_hits). Com sub-passos de no máximo
+    # MAX_SUBSTEP nada anda mais que uma fração do tamanho do jogador entre testes.
+    # Reiniciar duas vezes dá no mesmo, então basta saber se algum encostou.
+    body = player_polygon(player)
 
     # Inimigos
-    for enemy in enemies:
-        enemy["rect"].x += enemy["dir"] * 120 * delta_time
-        if enemy["rect"].x < enemy["min"] or enemy["rect"].x > enemy["max"]:
-            enemy["dir"] *= -1
-
-        if enemy["rect"].collidepoint(player["x"], player["y"]):
-            reset_player()
-
-    # Espinhos
-    for spike in spikes:
-        if spike.collidepoint(player["x"], player["y"]):
-            reset_player()
+    enemies = state["enemies"]
+    patrol_enemies(enemies, ENEMY_SPEED, delta_time)
+    if len(enemies) and len(polygon_hits(body, enemies.bounds(), enemies.polygons)):
+        kill_player(state, "enemy")
+        player = state["player"]
+        body = player_polygon(player)
+    if prof: prof.mark("enemies")
+
+    # Espinhos (caixas e triângulos montados uma vez por carga de chunks)
+    bounds, triangles = state["spike_shapes"]
+    if len(bounds) and len(polygon_hits(body, bounds, triangles.__getitem__)):
+        kill_player(state, "spike")
+        player = state["player"]
 
     # Cair
     if player["y"] > HEIGHT:
-        reset_player()
-
-    # Vitória da fase
-    if portal_rect.collidepoint(player["x"], player["y"]):
-        level += 1
-        if level > 4:
-            print("🏆 VOCÊ ZEROU O JOGO!")
-            running = False
-        else:
-            print(f"➡ Indo para a fase {level}...")
-            load_level(level)
-            reset_player()
+        kill_player(state, "fall")
+        player = state["player"]
+
+    # Vitória da fase. Há um portal só: o primeiro candidato basta (a grade só diz
+    # que ele está na célula do jogador; quem decide é o collidepoint)
+    for _ in candidates(state, "portal", anchor_point):
+        if state["portal_rect"].collidepoint(player["x"], player["y"]):
+            if state["level"] >= LAST_LEVEL:
+                state["won"] = True
+                state["running"] = False
+            else:
+                load_level(state, state["level"] + 1)
+                reset_player(state)
+                state["effects"].append(("portal", state["player"]["x"], state["player"]["y"]))
+        break
+    if prof: prof.mark("hazards")
+
+
+class Game:
+    # Uma instância independente do jogo (sem janela), para rodar várias em paralelo
+    def __init__(self, level=1):
+        self.state = new_state(level)
+        self.ticks = 0
+
+    def step(self, inputs, delta_time):
+        step(self.state, inputs, delta_time)
+        self.ticks += 1
+        return self.state
 
-    # ================== DESENHO ======================
-    screen.fill((35,35,60))
-    pygame.draw.rect(screen, (90,90,120), (0,GROUND_Y, WIDTH, 300))
 
-    for plat in platforms:
-        pygame.draw.rect(screen,(200,200,200),plat)
+# -----------------------------------------
+# ----------------- DESENHO ---------------
+# -----------------------------------------
+def draw_static(screen, font, state, camera_x=0, batch=None):
+    # Tudo que não muda durante a fase: fundo, chão, plataformas fixas, portal e
+    # espinhos, vistos com a câmera em camera_x; só o que cai na superfície é desenhado.
+    # batch: shading.GouraudBatch que recebe plataformas e espinhos (quem chama desenha o lote)
+    left, right = camera_x, camera_x + screen.get_width()
+    portal_rect = state["portal_rect"].move(-camera_x, 0)
 
-    for moving_platform in moving_platforms:
-        pygame.draw.rect(screen,(180,220,255),moving_platform["rect"])
+    screen.fill((35,35,60))
+    pygame.draw.rect(screen, (90,90,120), (0,GROUND_Y, screen.get_width(), 300))
 
-    for vertical_platform in vertical_platforms:
-        pygame.draw.rect(screen,(255,210,160),vertical_platform["rect"])
+    if batch is not None:
+        rects = np.array([(plat.x - camera_x, plat.y, plat.w, plat.h) for plat in state["platforms"]
+                          if plat.right > left and plat.x < right], dtype=np.float64).reshape(-1, 4)
+        batch.add(rect_polygons(*rects.T), (200,200,200))
+    else:
+        for plat in state["platforms"]:
+            if plat.right > left and plat.x < right:
+                pygame.draw.rect(screen,(200,200,200),plat.move(-camera_x, 0))
 
     pygame.draw.rect(screen,(80,255,160),portal_rect)
-    screen.blit(FONT.render("PORTAL",True,(255,255,255)),(portal_rect.x, portal_rect.y-20))
-
-    for sp in spikes:
-        pygame.draw.polygon(screen,(255,80,80),[(sp.x,sp.y+40),(sp.x+30,sp.y),(sp.x+60,sp.y+40)])
-
-    # inimigos
-    for enemy in enemies:
-        shx = math.sin(pygame.time.get_ticks() * 0.005) * 0.6
-        enemy_shape = [(-20,-20),(20,-20),(20,20),(-20,20)]
-        M_e = mat_mul(mat_translate(enemy["rect"].centerx, enemy["rect"].centery), mat_shear(shx))
-        pts_e = [apply(M_e, p) for p in enemy_shape]
-        draw_polygon(pts_e,(255,120,120))
+    screen.blit(font.render("PORTAL",True,(255,255,255)),(portal_rect.x, portal_rect.y-20))
+
+    if batch is not None:
+        bounds, triangles = state["spike_shapes"]
+        visible = (bounds[:, 2] > left) & (bounds[:, 0] < right)
+        batch.add(triangles[visible] - (camera_x, 0), (255,80,80))
+        return
+    for sp in state["spikes"]:
+        if sp.right > left and sp.x < right:
+            x = sp.x - camera_x
+            pygame.draw.polygon(screen,(255,80,80),[(x,sp.y+40),(x+30,sp.y),(x+60,sp.y+40)])
+
+
+def draw_label(screen, font, state):
+    screen.blit(font.render(f"FASE {state['level']}", True,(255,255,255)), (20,20))
+
+
+def draw_dynamic(screen, state, backend=None, buffers=None):
+    # Plataformas móveis, inimigos e jogador visíveis pela câmera; devolve as áreas desenhadas.
+    # backend: sombreamento (quality.FlatShading por padrão); com backend.batch, tudo
+    # vai para o lote, desenhado de uma vez no fim junto com o que já estava nele
+    # buffers: transform.FrameBuffers reaproveitados entre quadros (o Renderer guarda um;
+    # sem ele, um novo só para este quadro). Os polígonos do lote são vistas deles,
+    # válidas até o batch.draw() no fim
+    prof = PROFILER
+    if prof: prof.mark("draw")
+    if buffers is None:
+        buffers = FrameBuffers(base_shape, enemy_shape)
+    camera_x = state["camera_x"]
+    left, right = camera_x - VIEW_MARGIN, camera_x + WIDTH + VIEW_MARGIN
+
+    # inimigos (o cisalhamento segue o tempo de simulação, não o relógio)
+    shx = math.sin(state["time"] * 1000 * 0.005) * 0.6
+    enemies = state["enemies"]
+    visible = buffers.visible("enemies", enemies.x, enemies.w, left, right)
+    centers = enemies.centers(buffers.scratch("centers", len(enemies), (2,)))
+    centers = buffers.compact("enemies", visible, centers)
+    # instantâneos da simulação em thread (simthread.py) não levam a cena: a
+    # matriz do jogador sai do dicionário, em forma fechada
+    scene = state["scene"]
+    pts, pts_enemies = frame_polygons(state["player"], base_shape, centers, enemy_shape, shx,
+                                      scene.player_matrix(state["player"]) if scene else None, buffers)
+    if camera_x:
+        buffers.polys[:len(centers) + 1, :, 0] -= camera_x
+    if prof: prof.mark("transforms")
+
+    backend = backend or FLAT
+    batch = backend.batch
+    dirty = []
+    for kind, color in (("moving_platforms", (180,220,255)), ("vertical_platforms", (255,210,160))):
+        store = state[kind]
+        visible = buffers.visible(kind, store.x, store.w, left, right)
+        rects = buffers.scratch((kind, "rects"), len(store), (4,))
+        for i, column in enumerate((store.x, store.y, store.w, store.h)):
+            rects[:, i] = column
+        rects = buffers.compact(kind, visible, rects)
+        if batch is not None:
+            polys = rect_polygons(*rects.T, out=buffers.scratch((kind, "polys"), len(rects), (4, 2)))
+            polys[:, :, 0] -= camera_x
+            batch.add(polys, color)
+            continue
+        for x, y, w, h in rects.tolist():
+            dirty.append(pygame.draw.rect(screen,color,(x - camera_x, y, w, h)))
+
+    if batch is not None:
+        batch.add(pts_enemies, (255,120,120))
+        batch.add(pts[None], PLAYER_COLOR)
+        return batch.draw(screen)
+
+    # o pygame aceita o array (V, 2) direto: sem listas novas por inimigo
+    for pts_e in pts_enemies:
+        dirty.append(draw_polygon(screen, pts_e,(255,120,120)))
+
+    player = state["player"]
+    if camera_x:
+        player = dict(player, x=player["x"] - camera_x)
+    dirty.append(backend.draw_player(screen, player, pts.tolist(), PLAYER_COLOR))
+    return dirty
+
+
+def draw(screen, font, state, backend=None, buffers=None):
+    # com backend.batch, a cena inteira (estática e móvel) sai num lote só
+    draw_static(screen, font, state, state["camera_x"], (backend or FLAT).batch)
+    draw_label(screen, font, state)
+    draw_dynamic(screen, state, backend, buffers)
+
+
+FLAT = FlatShading()
+# folga da região desenhada além da tela (o cisalhamento dos inimigos sai do retângulo)
+VIEW_MARGIN = 20
+# cada tile é desenhado com essa sobra dos dois lados, para nenhum espinho que
+# aparece nele ser cortado na borda (o recorte muda os pixels da aresta)
+TILE_PAD = 64
+
+
+# Camada estática em cache + atualização só dos retângulos alterados.
+# Com dirty_rects=False volta ao redesenho completo com display.flip().
+#
+# A camada estática é montada a partir de tiles com a largura de um chunk
+# (world.CHUNK_WIDTH), desenhados uma vez por fase e guardados só enquanto
+# estão perto da tela; com a câmera andando, o quadro é refeito inteiro.
+class Renderer:
+    def __init__(self, screen, font, dirty_rects=True, backend=None):
+        self.screen = screen
+        self.font = font
+        self.dirty_rects = dirty_rects
+        self.backend = backend or FLAT
+        self.buffers = FrameBuffers(base_shape, enemy_shape)
+        self.particles = ParticlePool(screen)
+        self.particles_source = None     # (fase, tempo) do último quadro com partículas
+        self.layer = None
+        self.layer_source = None
+        self.tiles = {}
+        self.tiles_source = None
+        self.previous = None
+
+    def tile(self, state, index):
+        world = state["world"]
+        batch = self.backend.batch
+        if self.tiles_source != (world, batch):
+            self.tiles = {}
+            self.tiles_source = (world, batch)
+        tile = self.tiles.get(index)
+        if tile is None:
+            tile = pygame.Surface((world.chunk_width + 2 * TILE_PAD, self.screen.get_height()), 0, self.screen)
+            draw_static(tile, self.font, state, index * world.chunk_width - TILE_PAD, batch)
+            if batch is not None:
+                batch.draw(tile)
+            self.tiles[index] = tile
+        return tile
+
+    def static_layer(self, state):
+        # refeita quando a câmera anda ou quando os chunks carregados mudam
+        world = state["world"]
+        camera_x = state["camera_x"]
+        source = (state["level"], world, state["generation"], camera_x, self.backend.batch)
+        if self.layer_source is None or source[0] != self.layer_source[0] or \
+                any(a is not b and a != b for a, b in zip(source[1:], self.layer_source[1:])):
+            if self.layer is None:
+                self.layer = self.screen.copy()
+            cw = world.chunk_width
+            first, last = camera_x // cw, (camera_x + self.screen.get_width() - 1) // cw
+            for index in range(first, last + 1):
+                self.layer.blit(self.tile(state, index), (index * cw - camera_x, 0),
+                                (TILE_PAD, 0, cw, self.screen.get_height()))
+            # só os tiles perto da tela ficam na memória
+            for index in [i for i in self.tiles if i < first - 1 or i > last + 1]:
+                del self.tiles[index]
+            draw_label(self.layer, self.font, state)
+            self.layer_source = source
+            self.previous = None
+        return self.layer
+
+    def update_particles(self, state):
+        # integra pelo tempo simulado desde o último quadro e cria as rajadas pedidas
+        particles = self.particles
+        level, now = state["level"], state["time"]
+        if self.particles_source is not None:
+            if self.particles_source[0] != level:
+                particles.clear()
+            else:
+                particles.update(min(max(now - self.particles_source[1], 0.0), 0.1))
+        self.particles_source = (level, now)
+        effects = state["effects"]
+        while effects:
+            particles.burst(*effects.popleft())
+
+    def render(self, state, hud=()):
+        prof = PROFILER
+        self.update_particles(state)
+        if not self.dirty_rects:
+            draw(self.screen, self.font, state, self.backend, self.buffers)
+            self.particles.draw(self.screen, state["camera_x"])
+            self.draw_hud(hud)
+            if prof: prof.mark("draw")
+            pygame.display.flip()
+            if prof: prof.mark("flip")
+            self.previous = None
+            return
+
+        layer = self.static_layer(state)
+        if self.previous is None:
+            self.screen.blit(layer, (0,0))
+        else:
+            # apaga o quadro anterior restaurando o fundo só onde houve desenho
+            for rect in self.previous:
+                self.screen.blit(layer, rect, rect)
+
+        dirty = draw_dynamic(self.screen, state, self.backend, self.buffers)
+        area = self.particles.draw(self.screen, state["camera_x"])
+        if area is not None:
+            dirty.append(area)
+        dirty += self.draw_hud(hud)
+        if prof: prof.mark("draw")
+        if self.previous is None:
+            pygame.display.flip()
+        else:
+            pygame.display.update(self.previous + dirty)
+        if prof: prof.mark("flip")
+        self.previous = dirty
 
-    matrix = build_player_matrix(player)
-    pts = [apply(matrix, points) for points in base_shape]
-    draw_polygon(pts,(200,150,250))
+    def draw_hud(self, lines):
+        dirty = []
+        for i, line in enumerate(lines):
+            dirty.append(self.screen.blit(self.font.render(line, True,(255,255,255)), (20, 44 + 22*i)))
+        return dirty
 
-    screen.blit(FONT.render(f"FASE {level}", True,(255,255,255)), (20,20))
-    pygame.display.flip()
 
-pygame.quit()
-sys.exit()
+# -----------------------------------------
+# -------------- LOOP PRINCIPAL ------------
+# -----------------------------------------
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Go to the Portal!")
+    parser.add_argument("--record", metavar="ARQUIVO", help="grava entrada, dt e hash do estado por tick (ver replay.py)")
+    parser.add_argument("--profile-trace", metavar="ARQUIVO",
+                        help="mede cada fase do quadro e grava o traço (.csv ou .json) ao sair")
+    parser.add_argument("--shading", choices=SHADING_CHOICES, default="auto",
+                        help="sombreamento do jogador (auto: troca sozinho pelo tempo de quadro)")
+    parser.add_argument("--startup-report", nargs="?", const="-", metavar="ARQUIVO",
+                        help="mostra o tempo de cada fase da partida até o primeiro quadro (ou grava em JSON)")
+    parser.add_argument("--exit-after-first-frame", action="store_true",
+                        help="sai logo após o primeiro quadro (para medir a partida a frio)")
+    parser.add_argument("--threads", action="store_true",
+                        help=f"simulação em thread própria a {SIM_HZ} Hz, desenho interpolado (ver simthread.py)")
+    parser.add_argument("--fps", type=int, default=60, help="limite de quadros por segundo do desenho (padrão: 60)")
+    parser.add_argument("--busy-wait", type=float, default=BUSY_WAIT * 1000, metavar="MS",
+                        help="fim da espera de cada quadro em laço ativo, para acertar o prazo "
+                             f"(padrão: {BUSY_WAIT * 1000:g} ms; 0 desliga)")
+    args = parser.parse_args(argv)
+    timer = StartupTimer(IMPORT_START)
+    timer.mark("imports")
+
+    global PROFILER
+    show_profiler = False
+    if args.profile_trace:
+        PROFILER = FrameProfiler(keep_trace=True)
+
+    recorder = None
+    if args.record:
+        from replay import Recorder
+        recorder = Recorder(args.record, level=1)
+
+    init_pygame()
+    timer.mark("pygame")
+    screen = pygame.display.set_mode((WIDTH, HEIGHT))
+    pygame.display.set_caption("Go to the Portal!")
+    scheduler = FrameScheduler(args.fps, busy_wait=args.busy_wait / 1000)
+    timer.mark("janela")
+    font = LazyFont(timer=timer)
+
+    backends = {"scene": SceneShading(), "gouraud": GouraudShading(base_shape, PLAYER_COLOR), "flat": FLAT}
+    choice = args.shading
+    governor = QualityGovernor()
+    renderer = Renderer(screen, font, DIRTY_RECTS)
+    # média móvel do tempo de desenho + apresentação, por modo
+    frame_ms = {True: 0.0, False: 0.0}
+
+    state = new_state(1)
+    timer.mark("fase")
+    first_frame = True
+    frames = 0
+    hud, hud_source = [], None
+    shown_level = state["level"]
+    sim = None
+    if args.threads:
+        sim = SimThread(state, step, NO_INPUT, SnapshotBuffer(), recorder=recorder)
+        sim.start()
+    while state["running"]:
+        # dorme até pouco antes do prazo do quadro e só então lê a entrada (ver
+        # scheduler.py); trava o desenho (e, sem --threads, o jogo) a --fps
+        delta_time = scheduler.wait()
+        frame_start = time.perf_counter()
+        if first_frame:
+            timer.skip()           # a espera do agendador não conta como partida
+        prof = PROFILER
+        if prof: prof.begin_frame()
+
+        inputs = read_inputs()
+        if inputs["toggle_render"]:
+            renderer.dirty_rects = not renderer.dirty_rects
+        if inputs["toggle_profiler"]:
+            show_profiler = not show_profiler
+            if show_profiler and PROFILER is None:
+                PROFILER = FrameProfiler()
+            elif not show_profiler and not args.profile_trace:
+                PROFILER.close()
+                PROFILER = None
+        if inputs["toggle_shading"]:
+            choice = SHADING_CHOICES[(SHADING_CHOICES.index(choice) + 1) % len(SHADING_CHOICES)]
+        if inputs["toggle_sprite_cache"]:
+            backends["gouraud"].use_sprite_cache = not backends["gouraud"].use_sprite_cache
+        if inputs["toggle_raster"]:
+            # alterna entre o raster vetorizado e o original
+            modes = shading.RASTER_MODES
+            shading.RASTER_MODE = modes[(modes.index(shading.RASTER_MODE)+1) % len(modes)]
+        renderer.backend = backends[governor.mode if choice == "auto" else choice]
+        if prof: prof.mark("input")
+        if sim:
+            # desenha entre os dois últimos ticks publicados, um tick atrás do relógio
+            sim.push_input(inputs)
+            previous, latest = sim.buffer.read()
+            view = interpolate(previous, latest, (time.perf_counter() - latest["published"]) * sim.rate)
+        else:
+            step(state, inputs, delta_time)
+            if recorder:
+                recorder.record(inputs, delta_time, state)
+            view = state
+        if view["level"] != shown_level:
+            shown_level = view["level"]
+            print(f"➡ Indo para a fase {shown_level}...")
+
+        mode = renderer.dirty_rects
+        # o texto do HUD só muda a cada HUD_REFRESH quadros (ou quando uma tecla
+        # muda o que ele mostra): nos outros, as superfícies vêm do cache da fonte
+        hud_key = (mode, choice, renderer.backend, show_profiler and prof is not None, shading.RASTER_MODE,
+                   backends["gouraud"].use_sprite_cache)
+        if frames % HUD_REFRESH == 0 or hud_key != hud_source:
+            hud_source = hud_key
+            hud = [f"{'dirty rects' if mode else 'redesenho completo'} (F2): "
+                   f"{frame_ms[mode]:.2f} ms | outro: {frame_ms[not mode]:.2f} ms"]
+            hud.append(f"sombreamento (F4): {choice}: {governor.hud_line()}" if choice == "auto"
+                       else f"sombreamento (F4): {choice}")
+            hud += renderer.backend.hud_lines()
+            hud.append(scheduler.hud_line())
+            hud.append(renderer.particles.hud_line())
+            hud.append(state["rewind"].hud_line())
+            if sim:
+                hud.append(sim.hud_line())
+            if show_profiler and prof:
+                hud += prof.hud_lines()
+        frames += 1
+        if prof: prof.skip()
+        start = time.perf_counter()
+        renderer.render(view, hud)
+        now = time.perf_counter()
+        latency = scheduler.presented(now)
+        if prof and latency is not None:
+            prof.sample("latência", int(latency * 1e9))
+        frame_ms[mode] += ((now - start) * 1000 - frame_ms[mode]) * 0.05
+        if choice == "auto" and governor.update((now - frame_start) * 1000, now):
+            print(f"sombreamento: {governor.reason}")
+        if prof: prof.end_frame()
+        if first_frame:
+            first_frame = False
+            timer.mark("primeiro quadro")
+            if args.startup_report == "-":
+                print("\n".join(["partida:"] + timer.report()))
+            elif args.startup_report:
+                timer.write(args.startup_report)
+            if args.exit_after_first_frame:
+                state["running"] = False
+            # o que existe depois da partida (módulos, fase, fontes) sai das
+            # gerações do GC: as coletas completas não o percorrem mais
+            gc.freeze()
+
+    if sim:
+        sim.stop()
+        print(sim.hud_line())
+    print(scheduler.hud_line())
+    if state["won"]:
+        print("🏆 VOCÊ ZEROU O JOGO!")
+    print(f"desenho: dirty rects {frame_ms[True]:.2f} ms, redesenho completo {frame_ms[False]:.2f} ms")
+    if recorder:
+        recorder.close()
+        print(f"gravação: {recorder.ticks} ticks em {args.record}")
+    if args.profile_trace:
+        PROFILER.write_trace(args.profile_trace)
+        print(f"traço do profiler: {PROFILER.frames} quadros em {args.profile_trace}")
+
+    pygame.quit()
+    sys.exit()
+
+
+if __name__ == "__main__":
+    main()
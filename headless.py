@@ -0,0 +1,211 @@
+import os
+import sys
+import time
+import itertools
+import argparse
+import tracemalloc
+
+# sem janela: o SDL usa o driver "dummy" mesmo quando não há display
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import pygame
+import game
+from replay import Recorder, state_hash
+from profiler import FrameProfiler, GCMonitor
+from startup import init_pygame, LazyFont
+
+# Roteiro de entrada: segmentos "ticks:teclas" separados por vírgula, ex.
+#   "60:right,1:right+jump,90:right,30:rewind"
+# teclas: left, right, jump (jump vale só no primeiro tick do segmento), rewind
+DEFAULT_SCRIPT = "40:right,1:right+jump,60:right,1:jump,120:right"
+
+# Verificação de alocação (--alloc-check): depois de WARMUP quadros, o
+# tracemalloc mede quantos bytes ficam retidos por quadro em regime e o pico
+# passageiro dentro de um quadro; a verificação falha se o retido passar de
+# ALLOC_BUDGET bytes por quadro ou se o pico passar de ALLOC_PEAK_BUDGET (os
+# arrays de trabalho do desenho e das partículas ficam em buffers reaproveitados;
+# sobra o passo da simulação, uns 7 KB). Só conta o heap do Python e o do NumPy
+# (os pixels das superfícies do SDL ficam de fora).
+WARMUP = 300
+ALLOC_BUDGET = 16
+ALLOC_PEAK_BUDGET = 16 * 1024
+
+
+def parse_script(text):
+    script = []
+    for segment in text.split(","):
+        segment = segment.strip()
+        if not segment:
+            continue
+        ticks, _, keys = segment.partition(":")
+        names = set(k for k in keys.split("+") if k)
+        unknown = names - {"left", "right", "jump", "rewind"}
+        if unknown:
+            raise ValueError(f"tecla desconhecida no roteiro: {', '.join(sorted(unknown))}")
+        script.append((int(ticks), names))
+    return script
+
+
+def script_inputs(script):
+    # gera a entrada de cada tick; depois do fim do roteiro, nenhuma tecla
+    for ticks, names in script:
+        for i in range(ticks):
+            inputs = dict(game.NO_INPUT)
+            inputs["left"] = "left" in names
+            inputs["right"] = "right" in names
+            inputs["jump"] = "jump" in names and i == 0
+            inputs["rewind"] = "rewind" in names
+            yield inputs
+    while True:
+        yield dict(game.NO_INPUT)
+
+
+def run(script, steps=None, delta_time=1/60, level=1, render=None, record=None, profile=False):
+    if isinstance(script, str):
+        script = parse_script(script)
+    if steps is None:
+        steps = sum(ticks for ticks, _ in script)
+
+    # render: None (só simulação), "full" (redesenho completo + flip)
+    # ou "dirty" (camada estática em cache + display.update(rects))
+    renderer = None
+    if render:
+        init_pygame()
+        screen = pygame.display.set_mode((game.WIDTH, game.HEIGHT))
+        renderer = game.Renderer(screen, LazyFont(), dirty_rects=(render == "dirty"))
+
+    state = game.new_state(level)
+    inputs = script_inputs(script)
+    recorder = Recorder(record, level) if record else None
+    prof = game.PROFILER = FrameProfiler(keep_trace=True) if profile else None
+
+    done = 0
+    render_time = 0.0
+    start = time.perf_counter()
+    while done < steps and state["running"]:
+        if prof: prof.begin_frame()
+        tick_inputs = next(inputs)
+        if prof: prof.mark("input")
+        game.step(state, tick_inputs, delta_time)
+        if recorder:
+            recorder.record(tick_inputs, delta_time, state)
+        if renderer:
+            render_start = time.perf_counter()
+            renderer.render(state)
+            render_time += time.perf_counter() - render_start
+        if prof: prof.end_frame()
+        done += 1
+    elapsed = time.perf_counter() - start
+    if recorder:
+        recorder.close()
+    if prof:
+        prof.close()
+    game.PROFILER = None
+
+    return {
+        "steps": done,
+        "elapsed": elapsed,
+        "steps_per_sec": done / elapsed if elapsed > 0 else float("inf"),
+        "render_ms": render_time * 1000 / done if done else 0.0,
+        "sim_time": state["time"],
+        "level": state["level"],
+        "won": state["won"],
+        "player": (state["player"]["x"], state["player"]["y"]),
+        "hash": state_hash(state).hex(),     # estado final, como no replay.py
+        "profiler": prof,
+    }
+
+
+def alloc_check(script, frames, delta_time=1/60, level=1, render="dirty", warmup=WARMUP):
+    # quadros em regime: o roteiro em laço (como no bench.py) e o HUD fixo
+    if isinstance(script, str):
+        script = parse_script(script)
+    renderer = None
+    if render:
+        init_pygame()
+        screen = pygame.display.set_mode((game.WIDTH, game.HEIGHT))
+        renderer = game.Renderer(screen, LazyFont(), dirty_rects=(render == "dirty"))
+    state = game.new_state(level)
+    inputs = script_inputs(script)
+    inputs = itertools.cycle([next(inputs) for _ in range(sum(ticks for ticks, _ in script))])
+    hud = ["dirty rects (F2): 0.00 ms | outro: 0.00 ms", "sombreamento (F4): flat"]
+
+    def frame():
+        game.step(state, next(inputs), delta_time)
+        if renderer:
+            renderer.render(state, hud)
+
+    for _ in range(warmup):
+        frame()
+    monitor = GCMonitor().start()
+    tracemalloc.start()
+    base = tracemalloc.get_traced_memory()[0]
+    peak = 0
+    for _ in range(frames):
+        before = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        frame()
+        peak = max(peak, tracemalloc.get_traced_memory()[1] - before)
+    retained = tracemalloc.get_traced_memory()[0] - base
+    tracemalloc.stop()
+    monitor.stop()
+    return {
+        "frames": frames,
+        "level": state["level"],
+        "retained_per_frame": retained / frames,
+        "peak_per_frame": peak,
+        "gc": monitor.summary(),
+        "ok": retained <= ALLOC_BUDGET * frames and peak <= ALLOC_PEAK_BUDGET,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Simulação sem janela, sem limite de FPS")
+    parser.add_argument("--script", default=DEFAULT_SCRIPT, help="roteiro de entrada (ticks:teclas,...)")
+    parser.add_argument("--steps", type=int, default=None, help="número de passos (padrão: duração do roteiro)")
+    parser.add_argument("--dt", type=float, default=1/60, help="delta_time fixo por passo, em segundos")
+    parser.add_argument("--level", type=int, default=1)
+    parser.add_argument("--record", metavar="ARQUIVO", help="grava a execução para replay.py")
+    parser.add_argument("--profile", action="store_true", help="mede cada fase e mostra os percentis")
+    parser.add_argument("--profile-trace", metavar="ARQUIVO", help="grava o traço por quadro (.csv ou .json)")
+    parser.add_argument("--render", nargs="?", const="full", choices=("full", "dirty"),
+                        help="desenha cada passo no display dummy (full: redesenho completo, dirty: dirty rects)")
+    parser.add_argument("--alloc-check", nargs="?", type=int, const=600, metavar="QUADROS",
+                        help="mede a alocação em regime (tracemalloc) e as pausas do GC; "
+                             f"falha se passar de {ALLOC_BUDGET} bytes retidos por quadro "
+                             f"ou de {ALLOC_PEAK_BUDGET} bytes de pico num quadro")
+    args = parser.parse_args(argv)
+
+    if args.alloc_check:
+        report = alloc_check(args.script, args.alloc_check, args.dt, args.level, args.render or "dirty")
+        gc_report = report["gc"]
+        print(f"{report['frames']} quadros em regime (fase {report['level']}): "
+              f"{report['retained_per_frame']:.1f} bytes retidos/quadro, pico {report['peak_per_frame']} bytes")
+        print(f"gc: {sum(gc_report['collections'])} pausas "
+              f"(ger. {'/'.join(map(str, gc_report['collections']))}), "
+              f"total {gc_report['total_ms']:.2f} ms, máx {gc_report['max_ms']:.2f} ms")
+        if report["ok"]:
+            print("ok")
+        elif report["peak_per_frame"] > ALLOC_PEAK_BUDGET:
+            print(f"FALHOU: pico de {report['peak_per_frame']} bytes num quadro (limite {ALLOC_PEAK_BUDGET})")
+        else:
+            print(f"FALHOU: mais de {ALLOC_BUDGET} bytes retidos por quadro")
+        return 0 if report["ok"] else 1
+
+    report = run(args.script, args.steps, args.dt, args.level, args.render, args.record,
+                 profile=args.profile or bool(args.profile_trace))
+    print(f"{report['steps']} passos em {report['elapsed']:.3f}s "
+          f"({report['steps_per_sec']:.0f} passos/s, {report['sim_time']:.1f}s simulados)")
+    if args.render:
+        print(f"desenho ({args.render}): {report['render_ms']:.3f} ms/quadro")
+    print(f"fase {report['level']}, venceu: {report['won']}, jogador em "
+          f"({report['player'][0]:.1f}, {report['player'][1]:.1f}), estado {report['hash']}")
+    prof = report["profiler"]
+    if prof:
+        print("\n".join(prof.hud_lines()))
+        if args.profile_trace:
+            prof.write_trace(args.profile_trace)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,89 @@
+import os
+import json
+import hashlib
+import numpy as np
+import pygame
+from entities import PatrolStore
+
+# Fases descritas em levels/levelN.json. Na primeira carga cada arquivo é
+# compilado para um cache binário (.npy) identificado pelo hash do JSON; as
+# cargas seguintes mapeiam o cache em memória e montam as entidades direto
+# das linhas, sem reler o JSON (as colunas dos que patrulham viram os arrays
+# de entities.PatrolStore sem passar por dicts).
+LEVELS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "levels")
+CACHE_DIR = os.path.join(LEVELS_DIR, ".cache")
+
+# Uma linha por entidade: (tipo, x, y, w, h, dir, min, max, speed)
+KINDS = ("portal", "spikes", "platforms", "moving_platforms", "vertical_platforms", "enemies")
+ROW_SIZE = 9
+
+
+def level_path(level):
+    return os.path.join(LEVELS_DIR, f"level{level}.json")
+
+
+def level_count():
+    level = 0
+    while os.path.exists(level_path(level + 1)):
+        level += 1
+    return level
+
+
+def compile_level(data):
+    # dicionário do JSON -> matriz (N, ROW_SIZE)
+    rows = [(0, *data["portal"], 0, 0, 0, 0)]
+    for kind in ("spikes", "platforms"):
+        code = KINDS.index(kind)
+        rows += [(code, *rect, 0, 0, 0, 0) for rect in data.get(kind, [])]
+    for kind in ("moving_platforms", "vertical_platforms", "enemies"):
+        code = KINDS.index(kind)
+        rows += [(code, *item["rect"], item["dir"], item["min"], item["max"], item.get("speed", 0))
+                 for item in data.get(kind, [])]
+
+    table = np.array(rows, dtype=np.float64)
+    if table.shape[1] != ROW_SIZE:
+        raise ValueError("retângulos da fase devem ter 4 valores (x, y, w, h)")
+    return table
+
+
+def cached_table(path):
+    with open(path, "rb") as f:
+        raw = f.read()
+    digest = hashlib.sha1(raw).hexdigest()[:16]
+    name = os.path.splitext(os.path.basename(path))[0]
+    cache_path = os.path.join(CACHE_DIR, f"{name}-{digest}.npy")
+
+    if not os.path.exists(cache_path):
+        table = compile_level(json.loads(raw))
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        # grava num temporário e renomeia: nunca deixa um cache pela metade
+        tmp_path = os.path.join(CACHE_DIR, f"{name}-{digest}.{os.getpid()}.tmp.npy")
+        np.save(tmp_path, table, allow_pickle=False)
+        os.replace(tmp_path, cache_path)
+        # descarta caches de versões anteriores do mesmo arquivo
+        for old in os.listdir(CACHE_DIR):
+            if old.startswith(f"{name}-") and old.endswith(".npy") and old != os.path.basename(cache_path) \
+                    and ".tmp" not in old:
+                os.remove(os.path.join(CACHE_DIR, old))
+
+    return np.load(cache_path, mmap_mode="r", allow_pickle=False)
+
+
+def build_entities(table):
+    # matriz (N, ROW_SIZE) -> containers no formato usado por game.step():
+    # Rects para a geometria estática e PatrolStore para o que patrulha
+    table = np.asarray(table)
+    codes = table[:, 0]
+    level = {}
+    for code, kind in enumerate(KINDS):
+        rows = table[codes == code, 1:]
+        if kind in ("portal", "spikes", "platforms"):
+            level[kind] = [pygame.Rect(*map(int, row)) for row in rows[:, :4].tolist()]
+        else:
+            level[kind] = PatrolStore.from_rows(rows)
+    level["portal"] = level["portal"][0] if level["portal"] else None
+    return level
+
+
+def load(level):
+    return build_entities(cached_table(level_path(level)))
@@ -0,0 +1,188 @@
+import numpy as np
+import pygame
+
+from transform import shear_affines, transform_shared, marked_index
+
+# Partículas de efeito (morte, pulo, portal) num pool de capacidade fixa, em
+# arrays NumPy: posição, velocidade, vida, vida inicial, tamanho e cor. As
+# vivas ficam compactadas no começo dos arrays; integrar, descartar as mortas
+# e desenhar são operações sobre os arrays inteiros, com saída (out=) em
+# buffers alocados uma vez, então dezenas de milhares de partículas não criam
+# nada proporcional ao número delas por quadro. Nada de ufunc misturando bool
+# e inteiro nem np.compress: a conversão e o nonzero internos alocam um
+# buffer temporário (até 64 KB) a cada chamada (transform.marked_index).
+#
+# Desenho: cada partícula é a forma FOOTPRINT (quatro pontos) passada pela
+# afim T(posição) · Sh(cisalhamento pela velocidade) · S(tamanho pela vida),
+# as mesmas de transform.py, e os pontos que caem na superfície são escritos
+# direto nos pixels (pygame.surfarray.pixels2d, cores já no formato dela).
+#
+# A simulação só avisa: game.py põe (efeito, x, y) em state["effects"] e o
+# Renderer cria as rajadas. Partículas não entram no hash do replay.
+CAPACITY = 32768
+GRAVITY = 600
+STREAK = 1 / 300               # cisalhamento por px/s de velocidade horizontal
+FOOTPRINT = np.array([(-0.5, -0.5), (0.5, -0.5), (-0.5, 0.5), (0.5, 0.5)])
+
+# efeito -> (partículas, velocidade máx. (px/s), cor, vida (s), tamanho (px))
+BURSTS = {
+    "death": (600, 320, (255, 90, 90), 0.9, 3.0),
+    "jump": (80, 140, (200, 150, 250), 0.35, 2.0),
+    "portal": (2000, 420, (80, 255, 160), 1.2, 3.0),
+}
+
+
+class ParticlePool:
+    # surface: onde as partículas são desenhadas (define o formato das cores)
+    def __init__(self, surface, capacity=CAPACITY, seed=0):
+        self.surface = surface
+        self.capacity = capacity
+        self.count = 0
+        self.dropped = 0               # partículas pedidas com o pool cheio
+        self.rng = np.random.default_rng(seed)
+        # dois conjuntos de arrays: o descarte copia as vivas de um para o outro
+        self.sets = [self.allocate(capacity), self.allocate(capacity)]
+        self.pos, self.vel, self.life, self.lifetime, self.size, self.color = self.sets[0]
+        self.alive = np.empty(capacity, dtype=bool)
+        self.kept = np.empty(capacity + 1, dtype=np.intp)
+        self.count_scratch = np.empty(capacity, dtype=np.intp)
+        self.indices = np.arange(capacity)
+        self.scratch = np.empty((capacity, 2))
+        self.random = np.empty((2, capacity))
+        # desenho: afins, pontos, pixels e cores por ponto
+        points = capacity * len(FOOTPRINT)
+        self.affines = np.empty((capacity, 2, 3))
+        self.shx = np.empty(capacity)
+        self.scale = np.empty(capacity)
+        self.points = np.empty((capacity, len(FOOTPRINT), 2))
+        self.pixels = np.empty((2, points), dtype=np.intp)
+        self.visible = np.empty(points, dtype=bool)
+        self.test = np.empty(points, dtype=bool)
+        self.colors = np.empty((capacity, len(FOOTPRINT)), dtype=np.uint32)
+        self.index = np.empty(points, dtype=np.intp)
+
+    @staticmethod
+    def allocate(capacity):
+        return (np.empty((capacity, 2)), np.empty((capacity, 2)), np.empty(capacity),
+                np.empty(capacity), np.empty(capacity), np.empty(capacity, dtype=np.uint32))
+
+    def __len__(self):
+        return self.count
+
+    def emit(self, x, y, count, speed, color, life, size=1.0):
+        # rajada em todas as direções a partir de (x, y), com velocidade e vida sorteadas
+        start = self.count
+        self.dropped += max(0, count - (self.capacity - start))
+        count = min(count, self.capacity - start)
+        if count <= 0:
+            return
+        end = start + count
+        angle, radius = self.random[0, :count], self.random[1, :count]
+        self.rng.random(out=angle)
+        self.rng.random(out=radius)
+        angle *= 2 * np.pi
+        radius *= speed
+        np.multiply(np.cos(angle, out=self.scratch[:count, 0]), radius, out=self.vel[start:end, 0])
+        np.multiply(np.sin(angle, out=self.scratch[:count, 1]), radius, out=self.vel[start:end, 1])
+        self.pos[start:end] = (x, y)
+        self.color[start:end] = self.surface.map_rgb(color)
+        self.size[start:end] = size
+        # vida entre metade e o total pedido
+        life_left = self.life[start:end]
+        self.rng.random(out=life_left)
+        life_left += 1
+        life_left *= life / 2
+        self.lifetime[start:end] = life_left
+        self.count = end
+
+    def burst(self, effect, x, y):
+        count, speed, color, life, size = BURSTS[effect]
+        self.emit(x, y, count, speed, color, life, size)
+
+    def update(self, delta_time):
+        n = self.count
+        if not n:
+            return
+        vel, step = self.vel[:n], self.scratch[:n]
+        vel[:, 1] += GRAVITY * delta_time
+        np.multiply(vel, delta_time, out=step)
+        self.pos[:n] += step
+        self.life[:n] -= delta_time
+        alive = np.greater(self.life[:n], 0, out=self.alive[:n])
+        if alive.all():
+            return
+        # compacta as vivas no outro conjunto de arrays e troca
+        index = marked_index(alive, self.kept[:n + 1], self.count_scratch[:n], self.indices)
+        kept = len(index)
+        source, target = self.sets
+        for src, dst in zip(source, target):
+            np.take(src[:n], index, axis=0, out=dst[:kept], mode="clip")
+        self.sets.reverse()
+        self.pos, self.vel, self.life, self.lifetime, self.size, self.color = self.sets[0]
+        self.count = kept
+
+    def clear(self):
+        self.count = 0
+
+    def draw(self, surface, camera_x=0):
+        # desenha as vivas; devolve a área alterada (ou None)
+        n = self.count
+        if not n:
+            return None
+        np.multiply(self.vel[:n, 0], STREAK, out=self.shx[:n])
+        np.divide(self.life[:n], self.lifetime[:n], out=self.scale[:n])
+        self.scale[:n] *= self.size[:n]
+        affines = shear_affines(self.pos[:n], self.shx[:n], self.affines[:n], self.scale[:n])
+        affines[:, 0, 2] -= camera_x
+        points = transform_shared(affines, FOOTPRINT, self.points[:n]).reshape(-1, 2)
+
+        # índice de cada ponto nos pixels da superfície (linha a linha); os que
+        # caem fora vão para o pixel 0, que é restaurado depois da escrita
+        m = len(points)
+        xs, ys, index = self.pixels[0, :m], self.pixels[1, :m], self.index[:m]
+        np.floor(points, out=points)
+        np.copyto(xs, points[:, 0], casting="unsafe")
+        np.copyto(ys, points[:, 1], casting="unsafe")
+        width, height = surface.get_size()
+        visible, test = self.visible[:m], self.test[:m]
+        np.greater_equal(xs, 0, out=visible)
+        visible &= np.less(xs, width, out=test)
+        visible &= np.greater_equal(ys, 0, out=test)
+        visible &= np.less(ys, height, out=test)
+        if not visible.any():
+            return None
+        np.multiply(ys, width, out=index)
+        index += xs
+        np.putmask(index, np.logical_not(visible, out=test), 0)
+        np.copyto(self.colors[:n], self.color[:n, None])
+        colors = self.colors[:n].reshape(-1)
+
+        # 4 bytes por pixel: pixels2d é a transposta de um buffer contíguo
+        # (atribuir .shape falha em vez de copiar, se um dia não for)
+        pixels = pygame.surfarray.pixels2d(surface)
+        flat = pixels.T.view()
+        flat.shape = (-1,)
+        corner = flat[0]
+        flat[index] = colors
+        np.equal(index, 0, out=test)
+        test &= visible
+        if test.any():
+            corner = colors[m - 1 - int(np.argmax(test[::-1]))]     # último ponto visível no pixel 0
+        flat[0] = corner
+        del pixels, flat               # destrava a superfície
+
+        # área alterada: extremos dos pontos visíveis (os de fora viram a borda oposta)
+        np.copyto(test, visible)
+        np.invert(test, out=test)
+        np.putmask(xs, test, width)
+        left = int(xs.min())
+        np.putmask(xs, test, -1)
+        right = int(xs.max())
+        np.putmask(ys, test, height)
+        top = int(ys.min())
+        np.putmask(ys, test, -1)
+        bottom = int(ys.max())
+        return pygame.Rect(left, top, right - left + 1, bottom - top + 1)
+
+    def hud_line(self):
+        return f"partículas: {self.count}/{self.capacity} (perdidas {self.dropped})"
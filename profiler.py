@@ -0,0 +1,173 @@
+import gc
+import csv
+import json
+import time
+import threading
+from collections import deque
+
+# Tempo por fase de cada quadro (input, física, inimigos, espinhos,
+# transformações, desenho, flip...) com perf_counter_ns.
+#
+# Uso: o jogo guarda o profiler numa global que fica None quando desligado;
+# cada ponto de medição é só `if prof: prof.mark("fase")`, então desligado o
+# custo é um teste de verdade por fase.
+#
+# Só contam as marcas da thread que abriu o quadro (begin_frame): com a
+# simulação em thread própria (simthread.py), o profiler mede o desenho.
+#
+# Além das fases, sample(nome, ns) guarda medidas avulsas do quadro que não
+# entram no total (ex.: a latência entrada -> tela do scheduler.py).
+WINDOW = 300          # quadros na janela dos percentis
+HUD_REFRESH = 15      # recalcula os percentis do HUD a cada N quadros
+
+
+def percentile(sorted_values, q):
+    if not sorted_values:
+        return 0
+    index = min(len(sorted_values) - 1, int(round(q / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+# ---------------- PAUSAS DO GC ----------------
+class GCMonitor:
+    # Conta as coletas do coletor cíclico (por geração) e o tempo de cada uma,
+    # via gc.callbacks. O tempo da pausa já está dentro da fase em que ela
+    # caiu; aqui ela aparece separada, para achar os engasgos causados por
+    # alocação.
+    def __init__(self):
+        self.counts = [0, 0, 0]
+        self.total_ns = 0
+        self.max_ns = 0
+        self.started = None
+        self.active = False
+
+    def callback(self, phase, info):
+        now = time.perf_counter_ns()
+        if phase == "start":
+            self.started = now
+        elif self.started is not None:
+            pause = now - self.started
+            self.counts[info["generation"]] += 1
+            self.total_ns += pause
+            self.max_ns = max(self.max_ns, pause)
+            self.started = None
+
+    def start(self):
+        if not self.active:
+            gc.callbacks.append(self.callback)
+            self.active = True
+        return self
+
+    def stop(self):
+        if self.active:
+            gc.callbacks.remove(self.callback)
+            self.active = False
+
+    def pauses(self):
+        return sum(self.counts)
+
+    def summary(self):
+        return {"collections": list(self.counts), "total_ms": self.total_ns / 1e6, "max_ms": self.max_ns / 1e6}
+
+    def hud_line(self):
+        return (f"gc: {self.pauses()} pausas (ger. {'/'.join(map(str, self.counts))}), "
+                f"total {self.total_ns / 1e6:.2f} ms, máx {self.max_ns / 1e6:.2f} ms")
+
+
+class FrameProfiler:
+    # Mede também as pausas do GC (GCMonitor) enquanto existe; chame close()
+    # ao desligar o profiler.
+    def __init__(self, window=WINDOW, keep_trace=False):
+        self.window = window
+        self.keep_trace = keep_trace
+        self.phases = []              # na ordem em que aparecem
+        self.metrics = []             # medidas avulsas (sample), na ordem em que aparecem
+        self.samples = {}             # fase -> deque dos últimos `window` quadros (ns)
+        self.current = {}
+        self.extra = {}
+        self.trace = []
+        self.frames = 0
+        self.last = self.frame_start = 0
+        self.hud_cache = []
+        self.gc = GCMonitor().start()
+        self.gc_seen = 0
+        self.thread = None
+
+    def close(self):
+        self.gc.stop()
+
+    def begin_frame(self):
+        self.current = {}
+        self.extra = {}
+        self.thread = threading.get_ident()
+        self.last = self.frame_start = time.perf_counter_ns()
+
+    def mark(self, phase):
+        # atribui a `phase` o tempo desde a última marca (acumula entre sub-passos)
+        if threading.get_ident() != self.thread:
+            return
+        now = time.perf_counter_ns()
+        self.current[phase] = self.current.get(phase, 0) + now - self.last
+        self.last = now
+
+    def sample(self, name, ns):
+        self.extra[name] = ns
+
+    def skip(self):
+        # descarta o tempo desde a última marca (ex.: espera do clock.tick)
+        self.last = time.perf_counter_ns()
+
+    def end_frame(self):
+        self.current["total"] = sum(self.current.values())
+        for phase, ns in self.current.items():
+            if phase not in self.samples:
+                self.phases.append(phase)
+                self.samples[phase] = deque(maxlen=self.window)
+            self.samples[phase].append(ns)
+        for name, ns in self.extra.items():
+            if name not in self.samples:
+                self.metrics.append(name)
+                self.samples[name] = deque(maxlen=self.window)
+            self.samples[name].append(ns)
+        if self.keep_trace:
+            pauses = self.gc.pauses()
+            self.trace.append(dict(self.current, **self.extra, frame=self.frames, gc_pauses=pauses - self.gc_seen))
+            self.gc_seen = pauses
+        self.frames += 1
+
+    def percentiles(self, phase):
+        values = sorted(self.samples.get(phase, ()))
+        return tuple(percentile(values, q) / 1e6 for q in (50, 95, 99))
+
+    def summary(self):
+        summary = {phase: dict(zip(("p50_ms", "p95_ms", "p99_ms"), self.percentiles(phase)))
+                   for phase in self.ordered_phases() + self.metrics}
+        summary["gc"] = self.gc.summary()
+        return summary
+
+    def ordered_phases(self):
+        return [p for p in self.phases if p != "total"] + (["total"] if "total" in self.samples else [])
+
+    def hud_lines(self):
+        if self.frames % HUD_REFRESH == 0 or not self.hud_cache:
+            self.hud_cache = ["fase          p50    p95    p99 (ms)"]
+            for phase in self.ordered_phases() + self.metrics:
+                p50, p95, p99 = self.percentiles(phase)
+                self.hud_cache.append(f"{phase:<12}{p50:6.2f} {p95:6.2f} {p99:6.2f}")
+            self.hud_cache.append(self.gc.hud_line())
+        return self.hud_cache
+
+    def write_trace(self, path):
+        # .json -> lista de quadros + resumo; qualquer outra extensão -> CSV (ns por
+        # fase e o número de pausas do GC no quadro)
+        columns = ["frame"] + self.ordered_phases() + self.metrics + ["gc_pauses"]
+        if path.endswith(".json"):
+            with open(path, "w") as f:
+                json.dump({"phases": self.ordered_phases(), "metrics": self.metrics,
+                           "frames": self.trace, "summary": self.summary()}, f)
+        else:
+            with open(path, "w", newline="") as f:
+                writer = csv.DictWriter(f, fieldnames=columns, restval=0)
+                writer.writeheader()
+                # medida avulsa ausente no quadro fica vazia (não é zero)
+                writer.writerows(dict(dict.fromkeys(self.metrics, ""), **row) for row in self.trace)
@@ -0,0 +1,149 @@
+import pygame
+
+import shading
+from sprites import PoseCache
+
+# Qualidade de desenho: um backend de sombreamento trocável (Gouraud em toda
+# a cena, Gouraud só no jogador ou polígonos chapados) e um governador que
+# troca de backend sozinho olhando o tempo de trabalho de cada quadro.
+#
+# Todo backend tem `batch` e hud_lines(). `batch` é um shading.GouraudBatch
+# quando o backend sombreia a cena inteira (game.py junta nele plataformas,
+# espinhos, inimigos e jogador) ou None; os backends sem lote têm
+# draw_player(screen, player, points, color), que devolve a área alterada
+# (para os dirty rects).
+MODES = ("scene", "gouraud", "flat")     # do melhor para o mais barato
+
+BUDGET_MS = 1000 / 60            # orçamento de um quadro a 60 FPS
+DOWNGRADE_RATIO = 0.9            # média acima de 90% do orçamento -> rebaixa
+UPGRADE_RATIO = 0.5              # média abaixo de 50% do orçamento -> pode promover
+WINDOW = 30                      # quadros na média
+HOLD = 2.0                       # segundos mínimos num modo antes de promover
+MAX_HOLD = 32.0
+FLAP_TIME = 5.0                  # rebaixar até FLAP_TIME s depois de promover dobra o HOLD
+
+
+def draw_polygon(screen, points, color):
+    # devolve a área alterada (preenchimento + contorno)
+    filled = pygame.draw.polygon(screen, color, points)
+    return filled.union(pygame.draw.polygon(screen, (20,20,20), points, 2))
+
+
+# ---------------- BACKENDS ----------------
+class FlatShading:
+    name = "flat"
+    batch = None
+
+    def draw_player(self, screen, player, points, color):
+        return draw_polygon(screen, points, color)
+
+    def hud_lines(self):
+        return []
+
+
+class GouraudShading:
+    name = "gouraud"
+    batch = None
+
+    def __init__(self, shape, color):
+        # sprites do jogador por pose (C alterna com o raster direto a cada quadro)
+        self.sprites = PoseCache(shape, color)
+        self.use_sprite_cache = True
+
+    def draw_player(self, screen, player, points, color):
+        if self.use_sprite_cache:
+            return self.sprites.draw(screen, player)
+        shading.draw_polygon_gouraud(screen, points, color)
+        xs = [x for x, _ in points]
+        ys = [y for _, y in points]
+        left, top = int(min(xs)), int(min(ys))
+        return pygame.Rect(left, top, int(max(xs)) - left + 1, int(max(ys)) - top + 1).clip(screen.get_rect())
+
+    def hud_lines(self):
+        lines = [f"raster: {shading.RASTER_MODE} (G)"]
+        if self.use_sprite_cache:
+            st = self.sprites.stats()
+            lines.append(f"cache (C): {st['entries']} poses, {st['bytes']//1024} KB, "
+                         f"acertos {st['hit_rate']:.0%}, descartes {st['evictions']}")
+        else:
+            lines.append("cache (C): desligado")
+        return lines
+
+
+class SceneShading:
+    name = "scene"
+
+    def __init__(self):
+        self.batch = shading.GouraudBatch()
+
+    def hud_lines(self):
+        batch = self.batch
+        return [f"cena: {batch.polygons} polígonos, {batch.pixels} px por lote"]
+
+
+# ---------------- GOVERNADOR ----------------
+class QualityGovernor:
+    # Rebaixa assim que a média da janela passa de DOWNGRADE_RATIO do orçamento
+    # e só promove depois de `hold` segundos abaixo de UPGRADE_RATIO. Os dois
+    # limites e o tempo mínimo formam a histerese; se um rebaixamento vem logo
+    # depois de uma promoção, o tempo mínimo dobra (até MAX_HOLD).
+    def __init__(self, modes=MODES, budget_ms=BUDGET_MS, window=WINDOW, hold=HOLD):
+        self.modes = modes
+        self.budget_ms = budget_ms
+        self.window = window
+        self.hold = hold
+        self.level = 0                 # índice em modes
+        self.samples = []
+        self.changed_at = None
+        self.below_since = None
+        self.promoted_at = None
+        self.reason = "início"
+        self.switches = 0
+
+    @property
+    def mode(self):
+        return self.modes[self.level]
+
+    def average(self):
+        return sum(self.samples) / len(self.samples) if self.samples else 0.0
+
+    def switch(self, level, now, reason):
+        self.level = level
+        self.samples = []
+        self.changed_at = now
+        self.below_since = None
+        self.reason = reason
+        self.switches += 1
+
+    def update(self, frame_ms, now):
+        # frame_ms: trabalho do quadro (sem a espera do clock); devolve True se trocou de modo
+        if self.changed_at is None:
+            self.changed_at = now
+        self.samples.append(frame_ms)
+        if len(self.samples) > self.window:
+            del self.samples[0]
+        if len(self.samples) < self.window:
+            return False
+
+        average = self.average()
+        if average > self.budget_ms * DOWNGRADE_RATIO and self.level + 1 < len(self.modes):
+            if self.promoted_at is not None and now - self.promoted_at < FLAP_TIME:
+                self.hold = min(MAX_HOLD, self.hold * 2)
+            self.switch(self.level + 1, now, f"rebaixado: média {average:.1f} ms > "
+                                             f"{self.budget_ms * DOWNGRADE_RATIO:.1f} ms")
+            return True
+
+        if average < self.budget_ms * UPGRADE_RATIO and self.level > 0:
+            if self.below_since is None:
+                self.below_since = now
+            if now - self.below_since >= self.hold and now - self.changed_at >= self.hold:
+                self.switch(self.level - 1, now, f"promovido: média {average:.1f} ms < "
+                                                 f"{self.budget_ms * UPGRADE_RATIO:.1f} ms por {self.hold:.0f} s")
+                self.promoted_at = now
+                return True
+        else:
+            self.below_since = None
+        return False
+
+    def hud_line(self):
+        return f"{self.mode} ({self.average():.1f} ms/quadro) - {self.reason}"
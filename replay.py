@@ -0,0 +1,125 @@
+import sys
+import time
+import struct
+import hashlib
+import argparse
+
+import game
+
+# Gravação compacta de uma partida: por tick, as teclas, o dt usado e um hash
+# do estado depois do step(). O replay roda o mesmo step() sem janela e sem
+# limite de FPS e compara o hash tick a tick, apontando a primeira divergência.
+#
+# Formato (little-endian):
+#   cabeçalho  "GTRP" | versão u16 | fase inicial u16
+#   cada tick  teclas u8 | dt f64 | hash 8 bytes
+MAGIC = b"GTRP"
+VERSION = 2                    # 2: bit de rewind e renascimento no último lugar seguro
+HEADER = struct.Struct("<4sHH")
+TICK = struct.Struct("<Bd8s")
+
+KEY_BITS = {"left": 1, "right": 2, "jump": 4, "quit": 8, "rewind": 16}
+
+PLAYER_FIELDS = struct.Struct("<7d2b")
+
+
+def pack_inputs(inputs):
+    flags = 0
+    for key, bit in KEY_BITS.items():
+        if inputs[key]:
+            flags |= bit
+    return flags
+
+
+def unpack_inputs(flags):
+    inputs = dict(game.NO_INPUT)
+    for key, bit in KEY_BITS.items():
+        inputs[key] = bool(flags & bit)
+    return inputs
+
+
+def state_hash(state):
+    # jogador + posição/direção de tudo que se move + fase/tempo
+    p = state["player"]
+    h = hashlib.blake2b(digest_size=8)
+    h.update(struct.pack("<Hd", state["level"], state["time"]))
+    h.update(PLAYER_FIELDS.pack(p["x"], p["y"], p["vx"], p["vy"], p["angle"], p["scale"], p["shx"],
+                                p["on_ground"], p["direction"]))
+    for kind in ("enemies", "moving_platforms", "vertical_platforms"):
+        store = state[kind]
+        h.update(store.x.tobytes())
+        h.update(store.y.tobytes())
+        h.update(store.dir.tobytes())
+    return h.digest()
+
+
+class Recorder:
+    def __init__(self, path, level=1):
+        self.file = open(path, "wb")
+        self.file.write(HEADER.pack(MAGIC, VERSION, level))
+        self.ticks = 0
+
+    def record(self, inputs, delta_time, state):
+        self.file.write(TICK.pack(pack_inputs(inputs), delta_time, state_hash(state)))
+        self.ticks += 1
+
+    def close(self):
+        self.file.close()
+
+
+def load_recording(path):
+    with open(path, "rb") as f:
+        data = f.read()
+    magic, version, level = HEADER.unpack_from(data)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError(f"{path}: não é uma gravação versão {VERSION}")
+    body = memoryview(data)[HEADER.size:]
+    if len(body) % TICK.size:
+        raise ValueError(f"{path}: gravação truncada")
+    return level, list(TICK.iter_unpack(body))
+
+
+def replay(path, verify=True):
+    level, ticks = load_recording(path)
+    state = game.new_state(level)
+
+    diverged = None
+    start = time.perf_counter()
+    for tick, (flags, delta_time, expected) in enumerate(ticks):
+        game.step(state, unpack_inputs(flags), delta_time)
+        if verify and state_hash(state) != expected:
+            diverged = tick
+            break
+    elapsed = time.perf_counter() - start
+
+    done = len(ticks) if diverged is None else diverged + 1
+    return {
+        "ticks": len(ticks),
+        "replayed": done,
+        "diverged_at": diverged,
+        "elapsed": elapsed,
+        "sim_time": state["time"],
+        "speedup": state["time"] / elapsed if elapsed > 0 else float("inf"),
+        "level": state["level"],
+        "won": state["won"],
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Reproduz e verifica uma gravação de partida")
+    parser.add_argument("recording")
+    parser.add_argument("--no-verify", action="store_true", help="não compara o hash de cada tick")
+    args = parser.parse_args(argv)
+
+    report = replay(args.recording, verify=not args.no_verify)
+    print(f"{report['replayed']}/{report['ticks']} ticks em {report['elapsed']:.3f}s "
+          f"({report['sim_time']:.1f}s de jogo, {report['speedup']:.0f}x tempo real)")
+    if report["diverged_at"] is not None:
+        print(f"DIVERGIU no tick {report['diverged_at']}")
+        return 1
+    print(f"ok: fase {report['level']}, venceu: {report['won']}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
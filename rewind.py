@@ -0,0 +1,159 @@
+import numpy as np
+
+import levels
+from world import PATROL_KINDS
+
+# Histórico compacto do estado para voltar no tempo (R segurado) e para
+# renascer no último lugar seguro depois de uma morte.
+#
+# Cada step vira um registro de tamanho fixo, uma linha de um array
+# (capacidade, tamanho) usado como anel: cabeçalho, campos do jogador e
+# x, y, dir de cada entidade que patrulha nos chunks carregados. Gravar e
+# restaurar são cópias de fatias (np.copyto), O(tamanho do registro), sem
+# objetos por entidade: baratas o bastante para gravar todo tick.
+#
+# O tamanho é fixo por fase: espaço para todas as entidades que patrulham na
+# tabela da fase (o máximo que pode estar carregado ao mesmo tempo). Ao voltar
+# no tempo, game.rewind carrega os chunks da câmera do registro antes de
+# copiar as entidades, então a ordem delas é a mesma da gravação.
+#
+# Registros "seguros" (jogador no chão firme, fora de plataforma móvel, sem
+# morrer no tick) são os pontos de controle: ao morrer, o jogador volta ao
+# mais novo deles com pelo menos RESPAWN_DELAY s, e esse registro e os
+# seguintes saem do histórico (morrer de novo logo depois recua mais um).
+REWIND_SECONDS = 5.0
+RATE = 60                      # registros por segundo de jogo (um por step a 60 Hz)
+RESPAWN_DELAY = 1.0
+
+# campos do jogador, na ordem do registro, e os que não são float
+PLAYER_FIELDS = ("x", "y", "vx", "vy", "on_ground", "direction", "transformed", "angle", "scale", "shx")
+PLAYER_TYPES = {"on_ground": bool, "direction": int, "transformed": bool}
+
+# cabeçalho: tempo, câmera, seguro, plataforma que leva o jogador (tipo, índice; -1 = nenhuma)
+# e quantas entidades de cada tipo
+TIME, CAMERA, SAFE, RIDE_KIND, RIDE_INDEX = range(5)
+COUNTS = 5
+PLAYER = COUNTS + len(PATROL_KINDS)
+ENTITIES = PLAYER + len(PLAYER_FIELDS)
+PLAYER_COLUMNS = tuple(zip(range(PLAYER, ENTITIES), PLAYER_FIELDS))   # (coluna, campo)
+
+
+class RewindBuffer:
+    def __init__(self, seconds=REWIND_SECONDS, rate=RATE):
+        self.capacity = int(seconds * rate)
+        self.rate = rate
+        self.records = np.zeros((self.capacity, ENTITIES))
+        self.blocks = []               # (tipo, coluna da contagem, início, vagas): x, y e dir em seguida
+        self.size = ENTITIES           # floats usados por registro na fase atual
+        self.head = 0                  # próxima linha a gravar
+        self.count = 0
+        self.rewound = 0               # ticks voltados com R
+        self.respawns = 0
+
+    def layout(self, state):
+        # registro da fase carregada em state["world"]; o histórico recomeça
+        codes = state["world"].codes
+        self.blocks = []
+        size = ENTITIES
+        for i, kind in enumerate(PATROL_KINDS):
+            slots = int(np.count_nonzero(codes == levels.KINDS.index(kind)))
+            if slots:
+                self.blocks.append((kind, COUNTS + i, size, slots))
+                size += 3 * slots
+        self.size = size
+        if size > self.records.shape[1]:
+            self.records = np.zeros((self.capacity, size))
+        self.clear()
+
+    def clear(self):
+        self.head = 0
+        self.count = 0
+
+    def row(self, age):
+        # registro `age` ticks antes do mais novo
+        return self.records[(self.head - 1 - age) % self.capacity]
+
+    def push(self, state):
+        row = self.records[self.head]
+        player = state["player"]
+        kind, index = state["scene"].ridden()
+        row[TIME] = state["time"]
+        row[CAMERA] = state["camera_x"]
+        row[SAFE] = player["on_ground"] and kind is None and state["death_cause"] is None
+        row[RIDE_KIND] = -1 if kind is None else PATROL_KINDS.index(kind)
+        row[RIDE_INDEX] = -1 if index is None else index
+        for column, field in PLAYER_COLUMNS:
+            row[column] = player[field]
+        for kind, count, start, slots in self.blocks:
+            store = state[kind]
+            n = len(store)
+            row[count] = n
+            np.copyto(row[start:start + n], store.x)
+            np.copyto(row[start + slots:start + slots + n], store.y)
+            np.copyto(row[start + 2 * slots:start + 2 * slots + n], store.dir)
+        self.head = (self.head + 1) % self.capacity
+        self.count = min(self.count + 1, self.capacity)
+
+    def back(self):
+        # descarta o registro mais novo (o estado atual) e devolve o anterior, ou None
+        if self.count < 2:
+            return None
+        self.head = (self.head - 1) % self.capacity
+        self.count -= 1
+        self.rewound += 1
+        return self.row(0)
+
+    @staticmethod
+    def clock(row):
+        return float(row[TIME]), int(row[CAMERA])
+
+    @staticmethod
+    def player(row):
+        player = dict(zip(PLAYER_FIELDS, row[PLAYER:ENTITIES].tolist()))
+        for field, kind in PLAYER_TYPES.items():
+            player[field] = kind(player[field])
+        return player
+
+    def restore(self, state, row):
+        # jogador, entidades e plataforma que leva o jogador; os chunks
+        # carregados já têm de ser os da câmera do registro
+        state["player"] = self.player(row)
+        for kind, count, start, slots in self.blocks:
+            store = state[kind]
+            n = len(store)
+            if n != int(row[count]):
+                continue
+            np.copyto(store.x, row[start:start + n])
+            np.copyto(store.y, row[start + slots:start + slots + n])
+            np.copyto(store.dir, row[start + 2 * slots:start + 2 * slots + n], casting="unsafe")
+        kind = int(row[RIDE_KIND])
+        state["scene"].ride(*((None, None) if kind < 0 else (PATROL_KINDS[kind], int(row[RIDE_INDEX]))))
+
+    def respawn(self, state):
+        # jogador no mais novo registro seguro com pelo menos RESPAWN_DELAY s;
+        # False se não há nenhum. Só o jogador volta: é um ponto de controle, não
+        # uma volta no tempo, então o relógio, a câmera (segue o jogador no
+        # stream) e os inimigos continuam de onde estão; voltá-los deixaria morrer
+        # de propósito para rever um trecho. Registro seguro nunca está numa
+        # plataforma móvel, daí o ride(None).
+        if not self.count:
+            return False
+        order = (self.head - self.count + np.arange(self.count)) % self.capacity
+        usable = (self.records[order, SAFE] > 0) & (self.records[order, TIME] <= state["time"] - RESPAWN_DELAY)
+        if not usable.any():
+            return False
+        age = self.count - 1 - int(np.flatnonzero(usable)[-1])
+        row = self.row(age)
+        state["player"] = self.player(row)
+        state["scene"].ride(None)
+        self.head = (self.head - 1 - age) % self.capacity
+        self.count -= age + 1
+        self.respawns += 1
+        return True
+
+    def seconds(self):
+        return self.count / self.rate
+
+    def hud_line(self):
+        return (f"rewind (R): {self.seconds():.1f}/{self.capacity / self.rate:.0f} s, "
+                f"{self.size * 8} B/registro, renascimentos {self.respawns}")
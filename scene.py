@@ -0,0 +1,149 @@
+from transform import mat_mul, mat_translate, mat_rotate, mat_shear, mat_reflect, mat_scale, mat_inverse
+
+# Hierarquia de transformações (grafo de cena) sobre as primitivas 3x3 do
+# transform.py. Cada nó tem uma matriz local, relativa ao pai, e a matriz de
+# mundo = mundo do pai · local. Mudar a local marca o nó e a subárvore como
+# sujos; a matriz de mundo só é recomposta quando alguém a pede e o nó está
+# sujo, então o que não se mexe não custa nada por quadro.
+#
+# Invariante: se um nó está sujo, todos os descendentes também estão.
+
+
+class SceneNode:
+    def __init__(self, scene, name, parent=None, local=None):
+        self.scene = scene
+        self.name = name
+        self.parent = None
+        self.children = []
+        self.local = local if local is not None else mat_translate(0, 0)
+        self.world = None
+        self.dirty = True
+        if parent is not None:
+            self.parent = parent
+            parent.children.append(self)
+
+    def mark_dirty(self):
+        if self.dirty:
+            return
+        self.dirty = True
+        for child in self.children:
+            child.mark_dirty()
+
+    def set_local(self, matrix):
+        self.local = matrix
+        self.mark_dirty()
+
+    def set_translation(self, tx, ty):
+        # nós de posição (local = translação pura): só suja se a posição mudou
+        if self.local[0][2] != tx or self.local[1][2] != ty:
+            self.set_local(mat_translate(tx, ty))
+
+    def world_matrix(self):
+        if self.dirty:
+            if self.parent is None:
+                self.world = self.local
+            else:
+                self.world = mat_mul(self.parent.world_matrix(), self.local)
+            self.dirty = False
+            self.scene.recomposed += 1
+        return self.world
+
+    def position(self):
+        world = self.world_matrix()
+        return world[0][2], world[1][2]
+
+    def set_position(self, x, y):
+        # põe a origem do nó em (x, y) no mundo, mantendo o pai
+        if self.parent is None:
+            self.set_translation(x, y)
+        elif self.dirty or self.position() != (x, y):
+            self.set_local(mat_mul(mat_inverse(self.parent.world_matrix()), mat_translate(x, y)))
+
+    def attach(self, parent):
+        # troca de pai mantendo a matriz de mundo
+        if parent is self.parent:
+            return
+        world = self.world_matrix()
+        if self.parent is not None:
+            self.parent.children.remove(self)
+        self.parent = parent
+        if parent is None:
+            self.set_local(world)
+        else:
+            parent.children.append(self)
+            self.set_local(mat_mul(mat_inverse(parent.world_matrix()), world))
+
+
+# ---------------- CENA DO JOGO ----------------
+class Scene:
+    # mundo -> plataformas móveis e verticais (um nó por linha da tabela da fase)
+    # mundo ou plataforma -> jogador -> pose (reflexão · rotação · cisalhamento · escala)
+    #
+    # O jogador parado numa plataforma vira filho dela e é carregado nos dois
+    # eixos. Espinhos, plataformas fixas e portal ficam fora da cena: nunca
+    # mudam. Os inimigos também: o cisalhamento muda todo quadro para todos,
+    # então eles seguem no caminho em lote (transform.frame_polygons).
+    def __init__(self):
+        self.recomposed = 0            # recomposições de matriz de mundo (para medir)
+        self.root = SceneNode(self, "mundo")
+        self.player = SceneNode(self, "jogador", self.root)
+        self.pose = SceneNode(self, "pose", self.player)
+        self.pose_key = None
+        self.platforms = {}            # tipo -> nós na ordem do PatrolStore
+        self.by_row = {}               # linha da tabela -> nó
+
+    def load_platforms(self, stores, rows):
+        # stores/rows: tipo -> PatrolStore e linhas da tabela carregadas (mesma ordem).
+        # Nós de linhas que continuam carregadas são reaproveitados.
+        by_row = {}
+        for kind, store in stores.items():
+            nodes = []
+            for row in rows[kind].tolist():
+                node = self.by_row.get(row) or SceneNode(self, f"{kind}[{row}]", self.root)
+                by_row[row] = node
+                nodes.append(node)
+            self.platforms[kind] = nodes
+        for row, node in self.by_row.items():
+            if row not in by_row:
+                if self.player.parent is node:
+                    self.player.attach(self.root)
+                self.root.children.remove(node)
+        self.by_row = by_row
+        for kind, store in stores.items():
+            self.move_platforms(kind, store)
+
+    def move_platforms(self, kind, store):
+        for node, x, y in zip(self.platforms[kind], store.x.tolist(), store.y.tolist()):
+            node.set_translation(x, y)
+
+    def ride(self, kind=None, index=None):
+        # jogador passa a ser filho da plataforma (ou volta para o mundo)
+        self.player.attach(self.root if kind is None else self.platforms[kind][index])
+
+    def riding(self):
+        return self.player.parent is not self.root
+
+    def ridden(self):
+        # (tipo, índice no PatrolStore) da plataforma que leva o jogador, ou (None, None)
+        parent = self.player.parent
+        if parent is not self.root:
+            for kind, nodes in self.platforms.items():
+                if parent in nodes:
+                    return kind, nodes.index(parent)
+        return None, None
+
+    def place_player(self, x, y):
+        self.player.set_position(x, y)
+
+    def player_position(self):
+        return self.player.position()
+
+    def player_matrix(self, p):
+        # matriz completa do jogador (T · Rf · R · Sh · S); a pose só é refeita quando muda
+        key = (p["direction"], p["angle"], p["shx"], p["scale"])
+        if key != self.pose_key:
+            self.pose_key = key
+            self.pose.set_local(mat_mul(mat_reflect(p["direction"]), mat_mul(mat_rotate(p["angle"]),
+                                mat_mul(mat_shear(p["shx"]), mat_scale(p["scale"], p["scale"])))))
+        self.place_player(p["x"], p["y"])
+        return self.pose.world_matrix()
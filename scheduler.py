@@ -0,0 +1,93 @@
+import time
+import pygame
+
+# Agendador de quadros com entrada lida o mais tarde possível. Em vez de
+# dormir no clock.tick() no começo do quadro e só então ler a entrada (que
+# pode ter chegado logo depois da leitura anterior), o agendador dorme até
+# pouco antes do prazo do quadro: prazo - estimativa do trabalho (entrada +
+# simulação + desenho + apresentação) - MARGIN. Aí a entrada é lida, o quadro
+# roda e a apresentação cai perto do prazo.
+#
+# A estimativa sobe na hora com um quadro mais lento e desce devagar. Os
+# últimos `busy_wait` segundos da espera são em laço ativo: o sleep do sistema
+# pode acordar um ou dois ms depois do pedido.
+#
+# Latência entrada -> tela: o pygame não expõe o instante dos eventos do SDL,
+# então enquanto espera o agendador olha a fila (pygame.event.peek) a cada
+# POLL s e marca quando chegou a primeira tecla desde a última leitura. A
+# latência é desse instante até o fim da apresentação do quadro que a leu;
+# eventos que chegam durante o quadro são marcados no começo da espera
+# seguinte (a medida sai menor que a real em até um quadro de trabalho).
+BUSY_WAIT = 0.001
+MARGIN = 0.001
+POLL = 0.002
+ESTIMATE_DECAY = 0.02          # quanto a estimativa desce por quadro em direção ao trabalho medido
+INPUT_EVENTS = (pygame.KEYDOWN, pygame.KEYUP, pygame.QUIT)
+
+
+class FrameScheduler:
+    def __init__(self, fps=60, busy_wait=BUSY_WAIT, margin=MARGIN):
+        self.period = 1 / fps
+        self.busy_wait = busy_wait
+        self.margin = margin
+        self.estimate = 0.0            # trabalho de um quadro (s)
+        self.deadline = None
+        self.latched_at = None
+        self.pending_since = None      # chegada da primeira tecla ainda não lida
+        self.input_at = None           # chegada da tecla lida neste quadro
+        self.latency = None            # da última medida (s)
+        self.missed = 0                # quadros apresentados depois do prazo
+        self.frames = 0
+
+    def watch_input(self, now):
+        if self.pending_since is None and pygame.event.peek(INPUT_EVENTS):
+            self.pending_since = now
+
+    def wait(self):
+        # dorme até a hora de ler a entrada; devolve o tempo desde a leitura anterior
+        now = time.perf_counter()
+        if self.deadline is None:
+            self.deadline = now + self.period
+        else:
+            wake = self.deadline - self.estimate - self.margin
+            while True:
+                self.watch_input(now)
+                remaining = wake - now
+                if remaining <= 0:
+                    break
+                if remaining > self.busy_wait:
+                    time.sleep(min(remaining - self.busy_wait, POLL))
+                now = time.perf_counter()
+        self.watch_input(now)
+        self.input_at, self.pending_since = self.pending_since, None
+        delta_time = now - self.latched_at if self.latched_at is not None else self.period
+        self.latched_at = now
+        return delta_time
+
+    def presented(self, now):
+        # chamado logo depois do flip/update; devolve a latência do quadro (s) ou None
+        work = now - self.latched_at
+        self.frames += 1
+        # o primeiro quadro carrega fonte e camadas: fica fora da estimativa
+        if self.frames > 1:
+            if work > self.estimate:
+                self.estimate = min(work, self.period)
+            else:
+                self.estimate += (work - self.estimate) * ESTIMATE_DECAY
+        if now > self.deadline:
+            self.missed += 1
+        # próximo prazo; atrasado, pula para o próximo da mesma grade
+        self.deadline += self.period
+        if self.deadline < now:
+            self.deadline += ((now - self.deadline) // self.period + 1) * self.period
+
+        latency = None
+        if self.input_at is not None:
+            latency = self.latency = now - self.input_at
+            self.input_at = None
+        return latency
+
+    def hud_line(self):
+        latency = f"{self.latency * 1000:.1f} ms" if self.latency is not None else "-"
+        return (f"quadro: trabalho {self.estimate * 1000:.2f} ms, atrasados {self.missed}, "
+                f"entrada -> tela {latency}")
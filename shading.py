@@ -0,0 +1,283 @@
+import math
+import numpy as np
+import pygame
+
+# ---------- GOURAUD SHADING 2D ----------
+light_dir = (0.6, -0.8)
+ld_len = math.hypot(*light_dir)
+light_dir = (light_dir[0]/ld_len, light_dir[1]/ld_len)
+
+# "numpy" -> rasterização vetorizada (padrão)
+# "python" -> caminho original pixel a pixel, mantido para comparação
+RASTER_MODE = "numpy"
+RASTER_MODES = ("numpy", "python")
+
+def vertex_normal(p1, p2, p3):
+    # normal do triângulo em 2D (perpendicular à aresta)
+    x1,y1 = p1
+    x2,y2 = p2
+    dx = x2 - x1
+    dy = y2 - y1
+    return (-dy, dx)
+
+def dot(a,b): return a[0]*b[0] + a[1]*b[1]
+
+def compute_vertex_lighting(points):
+    lights = []
+    n = len(points)
+    for i in range(n):
+        p_prev = points[(i-1)%n]
+        p = points[i]
+        p_next = points[(i+1)%n]
+
+        nx, ny = vertex_normal(p_prev, p, p_next)
+        ln = math.hypot(nx,ny)
+        if ln == 0: ln = 1
+        nx /= ln
+        ny /= ln
+
+        intensity = max(0.1, dot((nx,ny), light_dir))
+        lights.append(intensity)
+    return lights
+
+def edge(a,b,c):
+    return (c[0]-a[0])*(b[1]-a[1]) - (c[1]-a[1])*(b[0]-a[0])
+
+def fan_triangles(points, intens):
+    # divide o polígono em leque a partir do vértice 0
+    for i in range(1, len(points)-1):
+        yield (points[0], points[i], points[i+1]), (intens[0], intens[i], intens[i+1])
+
+def draw_polygon_gouraud_python(surface, points, base_color):
+    intens = compute_vertex_lighting(points)
+
+    for (p1,p2,p3), (i1,i2,i3) in fan_triangles(points, intens):
+        max_x = int(max(p1[0], p2[0], p3[0]))
+        min_x = int(min(p1[0], p2[0], p3[0]))
+        max_y = int(max(p1[1], p2[1], p3[1]))
+        min_y = int(min(p1[1], p2[1], p3[1]))
+
+        area = edge(p1,p2,p3)
+        if area == 0:
+            continue
+
+        for y in range(min_y, max_y):
+            for x in range(min_x, max_x):
+                p = (x+0.5, y+0.5)
+                w1 = edge(p2,p3,p) / area
+                w2 = edge(p3,p1,p) / area
+                w3 = edge(p1,p2,p) / area
+
+                if w1 >= 0 and w2 >= 0 and w3 >= 0:
+                    intensity = w1*i1 + w2*i2 + w3*i3
+                    r = min(255, int(base_color[0] * intensity))
+                    g = min(255, int(base_color[1] * intensity))
+                    b = min(255, int(base_color[2] * intensity))
+                    surface.set_at((x,y), (r,g,b))
+
+def draw_polygon_gouraud_numpy(surface, points, base_color):
+    intens = compute_vertex_lighting(points)
+    clip = surface.get_clip()
+    color = np.array(base_color, dtype=np.float64)
+
+    # em superfícies com alfa por pixel, o pixel coberto fica opaco (como no set_at)
+    has_alpha = bool(surface.get_flags() & pygame.SRCALPHA)
+
+    pixels = alpha = None
+    for (p1,p2,p3), (i1,i2,i3) in fan_triangles(points, intens):
+        area = edge(p1,p2,p3)
+        if area == 0:
+            continue
+
+        # mesma caixa envolvente do caminho original, recortada à superfície
+        min_x = max(int(min(p1[0], p2[0], p3[0])), clip.left)
+        max_x = min(int(max(p1[0], p2[0], p3[0])), clip.right)
+        min_y = max(int(min(p1[1], p2[1], p3[1])), clip.top)
+        max_y = min(int(max(p1[1], p2[1], p3[1])), clip.bottom)
+        if min_x >= max_x or min_y >= max_y:
+            continue
+
+        # centros dos pixels, no layout [x, y] do surfarray
+        px = (np.arange(min_x, max_x) + 0.5)[:, None]
+        py = (np.arange(min_y, max_y) + 0.5)[None, :]
+
+        # mesmas operações, na mesma ordem, de edge() -> resultado idêntico
+        w1 = ((px-p2[0])*(p3[1]-p2[1]) - (py-p2[1])*(p3[0]-p2[0])) / area
+        w2 = ((px-p3[0])*(p1[1]-p3[1]) - (py-p3[1])*(p1[0]-p3[0])) / area
+        w3 = ((px-p1[0])*(p2[1]-p1[1]) - (py-p1[1])*(p2[0]-p1[0])) / area
+
+        mask = (w1 >= 0) & (w2 >= 0) & (w3 >= 0)
+        if not mask.any():
+            continue
+
+        intensity = w1[mask]*i1 + w2[mask]*i2 + w3[mask]*i3
+        rgb = np.minimum(255, (color[None, :] * intensity[:, None]).astype(np.int64))
+
+        if pixels is None:
+            pixels = pygame.surfarray.pixels3d(surface)
+            if has_alpha:
+                alpha = pygame.surfarray.pixels_alpha(surface)
+        pixels[min_x:max_x, min_y:max_y][mask] = rgb
+        if has_alpha:
+            alpha[min_x:max_x, min_y:max_y][mask] = 255
+
+    # libera o lock da superfície
+    del pixels, alpha
+
+def draw_polygon_gouraud(surface, points, base_color, mode=None):
+    if (mode or RASTER_MODE) == "python":
+        draw_polygon_gouraud_python(surface, points, base_color)
+    else:
+        draw_polygon_gouraud_numpy(surface, points, base_color)
+
+
+# ---------- GOURAUD EM LOTE ----------
+# Todos os polígonos de um quadro de uma vez: uma passada de iluminação para
+# todos os vértices (mesma conta de compute_vertex_lighting) e uma
+# rasterização para todos os triângulos do leque, com os pixels candidatos
+# de todas as caixas envolventes num só array. O custo cresce com a área
+# coberta, não com o número de polígonos. Comparado a chamar
+# draw_polygon_gouraud_numpy polígono a polígono, na ordem em que foram
+# adicionados: cobre os mesmos pixels, mas a intensidade sai da equação do
+# plano e não dos pesos baricêntricos, então a cor pode diferir de 1 por canal
+# (arredondamento do int()).
+def polygon_lighting(deltas):
+    # deltas: (M, 2) vetores de cada vértice a partir do anterior -> intensidade (M,)
+    length = np.hypot(deltas[:, 0], deltas[:, 1])
+    length[length == 0] = 1
+    intensity = (-deltas[:, 1] / length) * light_dir[0] + (deltas[:, 0] / length) * light_dir[1]
+    return np.maximum(0.1, intensity)
+
+
+def fan_indices(vertices):
+    # triângulos (0, i, i+1) do leque de fan_triangles, como índices (V-2, 3)
+    return np.array([(0, i, i + 1) for i in range(1, vertices - 1)])
+
+
+def rasterize_triangles(surface, tris, intens, colors):
+    # tris (T, 3, 2), intens (T, 3), colors (T, 3); superfícies de 32 bits.
+    # Devolve o número de pixels escritos.
+    clip = surface.get_clip()
+    p1, p2, p3 = tris[:, 0], tris[:, 1], tris[:, 2]
+    area = (p3[:, 0]-p1[:, 0])*(p2[:, 1]-p1[:, 1]) - (p3[:, 1]-p1[:, 1])*(p2[:, 0]-p1[:, 0])
+
+    # mesmas caixas do caminho por polígono (int() trunca), recortadas
+    lo = tris.min(axis=1).astype(np.int64)
+    hi = tris.max(axis=1).astype(np.int64)
+    min_x = np.maximum(lo[:, 0], clip.left)
+    max_x = np.minimum(hi[:, 0], clip.right)
+    min_y = np.maximum(lo[:, 1], clip.top)
+    max_y = np.minimum(hi[:, 1], clip.bottom)
+    keep = (area != 0) & (max_x > min_x) & (max_y > min_y)
+    if not keep.any():
+        return 0
+    tris, intens, colors, area = tris[keep], intens[keep], colors[keep], area[keep]
+    min_x, max_x, min_y, max_y = min_x[keep], max_x[keep], min_y[keep], max_y[keep]
+
+    # arestas dos pesos w1, w2, w3 (início e vetor): w_k = ((px-s0)*e1 - (py-s1)*e0) / area
+    start = tris[:, (1, 2, 0)]
+    edge_vec = tris[:, (2, 0, 1)] - start
+    sign = np.sign(area)[:, None]
+
+    # intensidade interpolada = i1 + ax * (px - x1) + ay * (py - y1) em cada
+    # triângulo (a partir do 1º vértice: mover a câmera não muda o arredondamento)
+    ax = (intens * edge_vec[:, :, 1]).sum(axis=1) / area
+    ay = -(intens * edge_vec[:, :, 0]).sum(axis=1) / area
+
+    # uma entrada por linha de cada caixa: o trecho [x0, x1) dentro das três arestas
+    height = max_y - min_y
+    owner = np.repeat(np.arange(len(tris)), height)
+    py = (min_y[owner] + np.arange(len(owner)) - np.repeat(np.cumsum(height) - height, height)) + 0.5
+    slope = edge_vec[owner, :, 1] * sign[owner]
+    need = (py[:, None] - start[owner, :, 1]) * edge_vec[owner, :, 0] * sign[owner]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        bound = start[owner, :, 0] + need / slope
+    left = np.where(slope > 0, bound, -np.inf).max(axis=1)
+    right = np.where(slope < 0, bound, np.inf).min(axis=1)
+    x0 = np.maximum(np.ceil(left - 0.5), min_x[owner]).astype(np.int64)
+    x1 = np.minimum(np.floor(right - 0.5) + 1, max_x[owner]).astype(np.int64)
+    count = np.maximum(x1 - x0, 0)
+    count[((slope == 0) & (need > 0)).any(axis=1)] = 0
+    total = int(count.sum())
+    if not total:
+        return 0
+
+    # um pixel por posição coberta: o custo cresce com a área desenhada (o que
+    # é constante na linha vai para os pixels com np.repeat)
+    xs = np.arange(total) + np.repeat(x0 - (np.cumsum(count) - count), count)
+    ys = np.repeat((py - 0.5).astype(np.int64), count)
+    intensity = xs + 0.5
+    intensity -= np.repeat(tris[owner, 0, 0], count)
+    intensity *= np.repeat(ax[owner], count)
+    intensity += np.repeat(intens[owner, 0] + ay[owner] * (py - tris[owner, 0, 1]), count)
+
+    # cor no formato da superfície (coberto fica opaco, como no set_at)
+    value = np.full(total, surface.get_masks()[3], dtype=np.uint32)
+    for channel, shift in enumerate(surface.get_shifts()[:3]):
+        level = np.repeat(colors[owner, channel], count)
+        level *= intensity
+        np.minimum(level, 255, out=level)
+        value |= level.astype(np.uint32) << np.uint32(shift)
+
+    # uma escrita para o lote todo; com pixels repetidos vale o último, como
+    # no desenho triângulo a triângulo
+    pixels = pygame.surfarray.pixels2d(surface)
+    pixels[xs, ys] = value
+    del pixels
+    return total
+
+
+class GouraudBatch:
+    # add() junta os polígonos do quadro (arrays (N, V, 2) de uma cor);
+    # draw() desenha tudo e devolve a área de cada polígono
+    def __init__(self):
+        self.groups = []
+        self.polygons = 0              # no último draw()
+        self.pixels = 0
+
+    def __len__(self):
+        return sum(len(polys) for polys, _ in self.groups)
+
+    def add(self, polys, color):
+        polys = np.asarray(polys, dtype=np.float64)
+        if len(polys):
+            self.groups.append((polys, color))
+
+    def draw(self, surface):
+        groups, self.groups = self.groups, []
+        self.polygons = sum(len(polys) for polys, _ in groups)
+        self.pixels = 0
+        if not groups:
+            return []
+        if surface.get_bytesize() != 4:
+            # o lote escreve pixels de 32 bits; nos outros formatos, polígono a polígono
+            for polys, color in groups:
+                for points in polys.tolist():
+                    draw_polygon_gouraud_numpy(surface, points, color)
+            return self.areas(surface, groups)
+
+        # iluminação de todos os vértices numa passada
+        vertices = [polys.shape[1] for polys, _ in groups]
+        deltas = np.concatenate([(polys - polys[:, np.arange(-1, v - 1)]).reshape(-1, 2)
+                                 for (polys, _), v in zip(groups, vertices)])
+        lights = polygon_lighting(deltas)
+
+        tris, intens, colors = [], [], []
+        start = 0
+        for (polys, color), v in zip(groups, vertices):
+            end = start + len(polys) * v
+            fan = fan_indices(v)
+            tris.append(polys[:, fan].reshape(-1, 3, 2))
+            intens.append(lights[start:end].reshape(-1, v)[:, fan].reshape(-1, 3))
+            colors.append(np.broadcast_to(np.array(color, dtype=np.float64), (len(polys) * len(fan), 3)))
+            start = end
+        self.pixels = rasterize_triangles(surface, np.concatenate(tris), np.concatenate(intens), np.concatenate(colors))
+        return self.areas(surface, groups)
+
+    @staticmethod
+    def areas(surface, groups):
+        bounds = surface.get_rect()
+        boxes = np.concatenate([np.concatenate((polys.min(axis=1), polys.max(axis=1)), axis=1)
+                                for polys, _ in groups]).astype(np.int64)
+        return [pygame.Rect(left, top, right - left + 1, bottom - top + 1).clip(bounds)
+                for left, top, right, bottom in boxes.tolist()]
@@ -0,0 +1,185 @@
+import sys
+import time
+import threading
+
+# Simulação numa thread própria, em passo fixo, separada do desenho. A cada
+# tick a thread publica um instantâneo do que o desenho lê (snapshot); o laço
+# de desenho pega os dois últimos publicados e desenha uma interpolação entre
+# eles, um tick atrás do tempo real. Assim um quadro lento (o Gouraud em
+# software, por exemplo) atrasa só o desenho: a física e a entrada seguem no
+# ritmo da simulação.
+#
+# Instantâneos são dicionários novos, nunca alterados depois de publicados:
+# jogador e entidades que patrulham são copiados; listas de plataformas e
+# espinhos, portal e mundo vão por referência, porque set_entities troca os
+# objetos inteiros a cada carga de chunks em vez de alterá-los. A fila de
+# efeitos (state["effects"]) é a mesma: a simulação põe, o desenho tira.
+#
+# Contadores: ticks simulados, quadros desenhados, instantâneos descartados
+# (publicados mas nunca o mais novo num quadro) e repetidos (quadro sem
+# instantâneo novo).
+SIM_HZ = 60
+MAX_LAG = 5                    # ticks de atraso antes de desistir de alcançar o relógio
+SWITCH_INTERVAL = 0.001        # troca de thread mais frequente (padrão do Python: 5 ms)
+
+# campos do jogador que andam suavemente entre dois ticks (o ângulo só no ar:
+# ao pousar ele volta a zero de uma vez)
+LERP_FIELDS = ("x", "y")
+
+
+def snapshot(state, tick, now):
+    return {
+        "tick": tick,
+        "published": now,
+        "level": state["level"],
+        "time": state["time"],
+        "running": state["running"],
+        "won": state["won"],
+        "deaths": state["deaths"],
+        "player": dict(state["player"]),
+        "enemies": state["enemies"].copy(),
+        "moving_platforms": state["moving_platforms"].copy(),
+        "vertical_platforms": state["vertical_platforms"].copy(),
+        "camera_x": state["camera_x"],
+        "generation": state["generation"],
+        "world": state["world"],
+        "platforms": state["platforms"],
+        "spikes": state["spikes"],
+        "spike_shapes": state["spike_shapes"],
+        "portal_rect": state["portal_rect"],
+        "scene": None,
+        "effects": state["effects"],
+    }
+
+
+def lerp(a, b, alpha):
+    return a + (b - a) * alpha
+
+
+def interpolate(previous, latest, alpha):
+    # estado para o desenho entre os dois instantâneos (alpha 0 = previous, 1 = latest);
+    # troca de fase, morte ou de chunks carregados não é interpolada
+    if previous is None or alpha >= 1 or previous["level"] != latest["level"] or \
+            previous["deaths"] != latest["deaths"] or previous["generation"] != latest["generation"]:
+        return latest
+    alpha = max(alpha, 0.0)
+    view = dict(latest)
+    player = view["player"] = dict(latest["player"])
+    before = previous["player"]
+    for field in LERP_FIELDS:
+        player[field] = lerp(before[field], player[field], alpha)
+    if not before["on_ground"] and not player["on_ground"]:
+        player["angle"] = lerp(before["angle"], player["angle"], alpha)
+    for kind in ("enemies", "moving_platforms", "vertical_platforms"):
+        store = view[kind] = latest[kind].copy()
+        store.x = lerp(previous[kind].x, store.x, alpha)
+        store.y = lerp(previous[kind].y, store.y, alpha)
+    view["time"] = lerp(previous["time"], latest["time"], alpha)
+    view["camera_x"] = round(lerp(previous["camera_x"], latest["camera_x"], alpha))
+    return view
+
+
+class SnapshotBuffer:
+    # Buffer duplo de instantâneos: o anterior e o mais novo, trocados juntos
+    # sob uma trava (a trava só protege a troca de referências).
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.previous = None
+        self.latest = None
+        self.published = 0
+        self.consumed = 0              # número do último instantâneo lido
+        self.frames = 0
+        self.dropped = 0
+        self.duplicated = 0
+
+    def publish(self, snap):
+        with self.lock:
+            self.previous, self.latest = self.latest, snap
+            self.published += 1
+
+    def read(self):
+        # (anterior, mais novo), contando descartados e repetidos desde a última leitura
+        with self.lock:
+            previous, latest, published = self.previous, self.latest, self.published
+        if published == self.consumed:
+            self.duplicated += 1
+        else:
+            self.dropped += published - self.consumed - 1
+        self.consumed = published
+        self.frames += 1
+        return previous, latest
+
+
+class SimThread(threading.Thread):
+    # step: game.step; no_input: game.NO_INPUT (passados para não importar game aqui)
+    def __init__(self, state, step, no_input, buffer, rate=SIM_HZ, recorder=None):
+        super().__init__(name="simulação", daemon=True)
+        self.state = state
+        self.step = step
+        self.buffer = buffer
+        self.rate = rate
+        self.dt = 1 / rate
+        self.recorder = recorder
+        self.input_lock = threading.Lock()
+        self.held = dict(no_input)
+        self.pressed = dict.fromkeys(("jump", "quit"), False)
+        self.stopping = threading.Event()
+        self.ticks = 0
+        self.lagged = 0                # ticks pulados por atraso (além de MAX_LAG)
+        self.step_time = 0.0           # média móvel do tempo de um tick (s)
+        buffer.publish(snapshot(state, 0, time.perf_counter()))
+
+    def push_input(self, inputs):
+        # teclas seguradas valem até a próxima leitura; pulo e saída ficam
+        # guardados até um tick consumir, para nenhum evento se perder entre ticks
+        with self.input_lock:
+            self.held.update(inputs)
+            for key in self.pressed:
+                self.pressed[key] = self.pressed[key] or inputs[key]
+
+    def take_input(self):
+        with self.input_lock:
+            inputs = dict(self.held, **self.pressed)
+            for key in self.pressed:
+                self.pressed[key] = False
+        return inputs
+
+    def start(self):
+        # com a troca padrão de 5 ms, o tick pode esperar um quadro inteiro pela GIL
+        self.saved_interval = sys.getswitchinterval()
+        sys.setswitchinterval(SWITCH_INTERVAL)
+        super().start()
+
+    def run(self):
+        next_tick = time.perf_counter() + self.dt
+        state = self.state
+        while state["running"] and not self.stopping.is_set():
+            now = time.perf_counter()
+            if now < next_tick:
+                self.stopping.wait(next_tick - now)
+                continue
+            inputs = self.take_input()
+            self.step(state, inputs, self.dt)
+            if self.recorder:
+                self.recorder.record(inputs, self.dt, state)
+            self.ticks += 1
+            done = time.perf_counter()
+            self.step_time += (done - now - self.step_time) * 0.05
+            self.buffer.publish(snapshot(state, self.ticks, done))
+            next_tick += self.dt
+            if done - next_tick > MAX_LAG * self.dt:
+                # muito atrasado: descarta o atraso em vez de simular em rajada
+                skipped = int((done - next_tick) / self.dt)
+                self.lagged += skipped
+                next_tick += skipped * self.dt
+
+    def stop(self):
+        self.stopping.set()
+        self.join()
+        sys.setswitchinterval(self.saved_interval)
+
+    def hud_line(self):
+        buffer = self.buffer
+        return (f"threads: sim {self.ticks} ticks ({self.step_time * 1000:.2f} ms/tick, "
+                f"atraso {self.lagged}), quadros {buffer.frames}, "
+                f"descartados {buffer.dropped}, repetidos {buffer.duplicated}")
@@ -0,0 +1,72 @@
+# Grade uniforme para a broadphase de colisão.
+# Cada entidade é identificada por (tipo, índice) — ex.: ("platforms", 3) — e fica
+# registrada em todas as células que o seu retângulo cobre.
+CELL_SIZE = 100
+
+
+class SpatialGrid:
+    def __init__(self, cell_size=CELL_SIZE):
+        self.cell_size = cell_size
+        self.cells = {}      # (cx, cy) -> set de (tipo, índice)
+        self.spans = {}      # (tipo, índice) -> (cx0, cy0, cx1, cy1)
+
+    def _span(self, rect):
+        # células cobertas por [left, right) x [top, bottom), igual ao collidepoint
+        cs = self.cell_size
+        if rect.width <= 0 or rect.height <= 0:
+            return None
+        return (rect.left // cs, rect.top // cs, (rect.right - 1) // cs, (rect.bottom - 1) // cs)
+
+    def _add(self, key, span):
+        self.spans[key] = span
+        if span is None:
+            return
+        cx0, cy0, cx1, cy1 = span
+        for cx in range(cx0, cx1 + 1):
+            for cy in range(cy0, cy1 + 1):
+                self.cells.setdefault((cx, cy), set()).add(key)
+
+    def insert(self, kind, index, rect):
+        self._add((kind, index), self._span(rect))
+
+    def insert_all(self, kind, rects):
+        for index, rect in enumerate(rects):
+            self.insert(kind, index, rect)
+
+    def cell_of(self, x, y):
+        # o pygame trunca o ponto para inteiro (em direção a zero) no collidepoint
+        return (int(x) // self.cell_size, int(y) // self.cell_size)
+
+    def scan(self, kind, area):
+        # Percorre os candidatos na mesma ordem da varredura linear.
+        # `area` devolve (x0, y0, x1, y1) — um ponto ou o segmento percorrido no
+        # sub-passo — e é chamada a cada passo porque a resposta a uma colisão
+        # pode mover o jogador (e portanto mudar as células consultadas).
+        # Os candidatos só são relidos da grade quando as células mudam.
+        last = -1
+        span = pending = None
+        while True:
+            x0, y0, x1, y1 = area()
+            cx0, cy0 = self.cell_of(min(x0, x1), min(y0, y1))
+            cx1, cy1 = self.cell_of(max(x0, x1), max(y0, y1))
+            if (cx0, cy0, cx1, cy1) != span:
+                span = (cx0, cy0, cx1, cy1)
+                pending = iter(sorted({index
+                                       for cx in range(cx0, cx1 + 1)
+                                       for cy in range(cy0, cy1 + 1)
+                                       for k, index in self.cells.get((cx, cy), ())
+                                       if k == kind and index > last}))
+            last = next(pending, None)
+            if last is None:
+                return
+            yield last
+
+
+def build_level_grid(state, cell_size=CELL_SIZE):
+    # Só a geometria estática: inimigos e plataformas móveis ficam em
+    # entities.PatrolStore e são testados todos de uma vez com arrays.
+    grid = SpatialGrid(cell_size)
+    grid.insert_all("platforms", state["platforms"])
+    if state["portal_rect"] is not None:
+        grid.insert("portal", 0, state["portal_rect"])
+    return grid
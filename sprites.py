@@ -0,0 +1,94 @@
+import math
+from collections import OrderedDict
+import numpy as np
+import pygame
+
+from shading import draw_polygon_gouraud
+from transform import player_affine, transform_batch
+
+# Cache LRU de sprites do jogador já rasterizados com Gouraud.
+# A aparência depende só de (angle, scale, shx, direction): esses valores são
+# quantizados e cada pose vira uma superfície com alfa, desenhada com um blit
+# na posição transladada. Passos maiores = menos poses distintas (menos
+# memória) e mais diferença visual em relação ao raster direto.
+ANGLE_STEP = 4.0        # graus
+SCALE_STEP = 0.02
+SHEAR_STEP = 0.02
+MAX_BYTES = 8 * 1024 * 1024
+
+
+def quantize(value, step):
+    return round(value / step) if step else value
+
+
+class PoseCache:
+    def __init__(self, shape, color, angle_step=ANGLE_STEP, scale_step=SCALE_STEP,
+                 shear_step=SHEAR_STEP, max_bytes=MAX_BYTES):
+        self.shape = np.asarray(shape, dtype=np.float64)
+        self.color = color
+        self.angle_step = angle_step
+        self.scale_step = scale_step
+        self.shear_step = shear_step
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()     # chave -> (superfície, deslocamento x, deslocamento y)
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def key(self, p):
+        return (quantize(p["angle"] % 360, self.angle_step),
+                quantize(p["scale"], self.scale_step),
+                quantize(p["shx"], self.shear_step),
+                p["direction"])
+
+    def pose(self, key):
+        # pose representante da chave (o centro do intervalo quantizado)
+        qa, qs, qsh, direction = key
+        return {"x": 0, "y": 0, "angle": qa * self.angle_step if self.angle_step else qa,
+                "scale": qs * self.scale_step if self.scale_step else qs,
+                "shx": qsh * self.shear_step if self.shear_step else qsh,
+                "direction": direction}
+
+    def rasterize(self, key):
+        pts = transform_batch(player_affine(self.pose(key))[None], self.shape)[0]
+        # origem inteira: com o jogador em coordenadas inteiras o resultado é o
+        # mesmo do raster direto
+        left = math.floor(pts[:, 0].min()) - 1
+        top = math.floor(pts[:, 1].min()) - 1
+        width = math.ceil(pts[:, 0].max()) - left + 1
+        height = math.ceil(pts[:, 1].max()) - top + 1
+
+        sprite = pygame.Surface((width, height), pygame.SRCALPHA)
+        draw_polygon_gouraud(sprite, (pts - (left, top)).tolist(), self.color)
+        return sprite, left, top
+
+    def get(self, p):
+        key = self.key(p)
+        entry = self.entries.get(key)
+        if entry is not None:
+            self.hits += 1
+            self.entries.move_to_end(key)
+            return entry
+
+        self.misses += 1
+        entry = self.rasterize(key)
+        size = entry[0].get_width() * entry[0].get_height() * 4
+        self.entries[key] = entry
+        self.bytes += size
+        # descarta as poses usadas há mais tempo até caber no orçamento
+        while self.bytes > self.max_bytes and len(self.entries) > 1:
+            _, (old, _, _) = self.entries.popitem(last=False)
+            self.bytes -= old.get_width() * old.get_height() * 4
+            self.evictions += 1
+        return entry
+
+    def draw(self, surface, p):
+        sprite, left, top = self.get(p)
+        return surface.blit(sprite, (round(p["x"]) + left, round(p["y"]) + top))
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {"entries": len(self.entries), "bytes": self.bytes, "hits": self.hits,
+                "misses": self.misses, "evictions": self.evictions,
+                "hit_rate": self.hits / total if total else 0.0}
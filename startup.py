@@ -0,0 +1,122 @@
+import os
+import json
+import time
+import pygame
+
+# Partida rápida: em vez de pygame.init() (que sobe todos os subsistemas,
+# inclusive áudio e joystick) só inicializa vídeo e fonte; a fila de eventos
+# do SDL vem junto com o vídeo. A fonte do HUD é resolvida só quando o
+# primeiro texto é desenhado, e o caminho encontrado fica em .cache/fonts.json:
+# pygame.font.SysFont varre a lista de fontes do sistema (fc-list no Linux)
+# a cada execução, mesmo quando a fonte pedida nem está instalada.
+#
+# Se a fonte for instalada depois de gravado o cache, apague .cache/fonts.json.
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache")
+FONT_CACHE = os.path.join(CACHE_DIR, "fonts.json")
+HUD_FONT = ("consolas", 18)
+TEXT_CACHE_SIZE = 64      # superfícies de texto guardadas por fonte
+
+
+def init_pygame():
+    pygame.display.init()
+    pygame.font.init()
+
+
+# ---------------- FONTE ----------------
+def load_font_cache(path=FONT_CACHE):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def resolve_font(name, path=FONT_CACHE):
+    # caminho do arquivo da fonte, ou None para a fonte padrão do pygame
+    # (o mesmo que SysFont usa quando não acha a fonte)
+    cache = load_font_cache(path)
+    if name in cache and (cache[name] is None or os.path.exists(cache[name])):
+        return cache[name]
+    cache[name] = pygame.font.match_font(name)
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # grava num temporário e renomeia, como o cache das fases
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(cache, f)
+        os.replace(tmp_path, path)
+    except OSError:
+        pass          # sem cache (ex.: diretório só de leitura): resolve de novo na próxima vez
+    return cache[name]
+
+
+class LazyFont:
+    # Fica no lugar de um pygame.font.Font; carrega no primeiro render. Cada
+    # texto desenhado vira uma superfície guardada (até TEXT_CACHE_SIZE, a mais
+    # antiga sai primeiro): o HUD repete as mesmas linhas por vários quadros e
+    # o render do SDL aloca uma superfície nova a cada chamada.
+    # Quem recebe a superfície não deve desenhar nela.
+    def __init__(self, name=HUD_FONT[0], size=HUD_FONT[1], timer=None, cache_size=TEXT_CACHE_SIZE):
+        self.name = name
+        self.size = size
+        self.timer = timer
+        self.font = None
+        self.cache_size = cache_size
+        self.texts = {}
+
+    def load(self):
+        if self.font is None:
+            start = time.perf_counter()
+            self.font = pygame.font.Font(resolve_font(self.name), self.size)
+            if self.timer:
+                self.timer.add("fonte", time.perf_counter() - start)
+        return self.font
+
+    def render(self, text, antialias, color, background=None):
+        key = (text, antialias, tuple(color), background and tuple(background))
+        surface = self.texts.get(key)
+        if surface is None:
+            if len(self.texts) >= self.cache_size:
+                del self.texts[next(iter(self.texts))]
+            surface = self.texts[key] = self.load().render(text, antialias, color, background)
+        return surface
+
+
+# ---------------- TEMPO DE PARTIDA ----------------
+class StartupTimer:
+    # Fases da partida em sequência: mark(fase) atribui o tempo desde a marca
+    # anterior; add(fase, s) registra uma fase medida à parte (como a fonte,
+    # carregada no meio do primeiro quadro), descontada da marca seguinte.
+    def __init__(self, start=None):
+        self.start = self.last = time.perf_counter() if start is None else start
+        self.phases = []
+        self.nested = 0.0
+
+    def mark(self, phase):
+        now = time.perf_counter()
+        self.phases.append((phase, now - self.last - self.nested))
+        self.last = now
+        self.nested = 0.0
+
+    def skip(self):
+        # descarta o tempo desde a última marca (e o desconta do total)
+        now = time.perf_counter()
+        self.start += now - self.last
+        self.last = now
+
+    def add(self, phase, seconds):
+        self.phases.append((phase, seconds))
+        self.nested += seconds
+
+    def total(self):
+        return self.last - self.start
+
+    def report(self):
+        lines = [f"{phase:<16}{seconds * 1000:8.1f} ms" for phase, seconds in self.phases]
+        lines.append(f"{'total':<16}{self.total() * 1000:8.1f} ms")
+        return lines
+
+    def write(self, path):
+        with open(path, "w") as f:
+            json.dump({"phases_ms": {phase: seconds * 1000 for phase, seconds in self.phases},
+                       "total_ms": self.total() * 1000}, f, indent=2)
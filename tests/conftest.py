@@ -0,0 +1,6 @@
+import os
+import sys
+
+# os testes importam os módulos da raiz do repositório, sem janela
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
@@ -0,0 +1,18 @@
+import pytest
+
+import headless
+
+# Regime sem alocação (headless.alloc_check): bytes retidos e pico por quadro
+# dentro dos orçamentos e nenhuma pausa do GC, em todas as fases e nos dois
+# modos de desenho.
+FRAMES = 600
+
+
+@pytest.mark.parametrize("render", ["dirty", "full"])
+@pytest.mark.parametrize("level", [1, 2, 3, 4])
+def test_steady_state_allocation(level, render):
+    report = headless.alloc_check(headless.DEFAULT_SCRIPT, FRAMES, level=level, render=render)
+    assert report["retained_per_frame"] <= headless.ALLOC_BUDGET
+    assert report["peak_per_frame"] <= headless.ALLOC_PEAK_BUDGET
+    assert report["ok"]
+    assert sum(report["gc"]["collections"]) == 0, report["gc"]
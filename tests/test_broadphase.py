@@ -0,0 +1,42 @@
+import random
+
+import pygame
+import pytest
+
+import game
+import headless
+from spatial import SpatialGrid
+
+# A grade (game.BROADPHASE) só escolhe quem testar: com ou sem ela, o mesmo
+# roteiro tem de terminar no mesmo estado (replay.state_hash).
+SCRIPTS = [
+    headless.DEFAULT_SCRIPT,
+    "30:right,1:right+jump,40:right,1:right+jump,50:right,20:left,1:left+jump,60:,"
+    "1:right+jump,80:right,30:rewind,1:right+jump,200:right",
+]
+
+
+def final_hash(monkeypatch, broadphase, script, level):
+    monkeypatch.setattr(game, "BROADPHASE", broadphase)
+    return headless.run(script, level=level)["hash"]
+
+
+@pytest.mark.parametrize("script", SCRIPTS)
+@pytest.mark.parametrize("level", [1, 2, 3, 4])
+def test_broadphase_matches_linear_scan(monkeypatch, level, script):
+    assert final_hash(monkeypatch, True, script, level) == final_hash(monkeypatch, False, script, level)
+
+
+def test_scan_yields_every_hit_in_order():
+    # candidatos sem repetição, em ordem crescente, e nenhum retângulo que
+    # contém o ponto fica de fora
+    rng = random.Random(7)
+    rects = [pygame.Rect(rng.randrange(-50, 900), rng.randrange(-50, 600), rng.randrange(0, 300), rng.randrange(0, 120))
+             for _ in range(200)]
+    grid = SpatialGrid()
+    grid.insert_all("platforms", rects)
+    for _ in range(500):
+        x, y = rng.uniform(-60, 950), rng.uniform(-60, 650)
+        found = list(grid.scan("platforms", lambda: (x, y, x, y)))
+        assert found == sorted(set(found))
+        assert {i for i, r in enumerate(rects) if r.collidepoint(x, y)} <= set(found)
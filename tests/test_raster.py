@@ -0,0 +1,61 @@
+import math
+import random
+
+import pygame
+import pytest
+
+import shading
+
+# O raster NumPy tem de pintar exatamente os mesmos pixels, com as mesmas
+# cores, que o raster Python de referência (superfície pequena: o Python é
+# lento). Inclui polígonos degenerados e fora da tela.
+SIZE = (64, 48)
+COLOR = (200, 150, 250)
+
+
+def random_polygon(rng):
+    # convexo: vértices em ângulos crescentes num círculo achatado
+    cx, cy = rng.uniform(-10, SIZE[0] + 10), rng.uniform(-10, SIZE[1] + 10)
+    radius = rng.uniform(2, 30)
+    angles = sorted(rng.uniform(0, 2 * math.pi) for _ in range(rng.randint(3, 7)))
+    return [(cx + radius * math.cos(a), cy + 0.8 * radius * math.sin(a)) for a in angles]
+
+
+DEGENERATE = {
+    "altura zero": [(5.0, 10.0), (30.0, 10.0), (50.0, 10.0)],
+    "uma linha": [(5.2, 9.8), (40.7, 10.6), (20.3, 11.3)],
+    "uma coluna": [(9.8, 3.0), (10.6, 30.0), (11.3, 15.0)],
+    "ponto": [(7.5, 7.5), (7.5, 7.5), (7.5, 7.5)],
+    "fora à esquerda": [(-40.0, 5.0), (-10.0, 5.0), (-20.0, 30.0)],
+    "fora abaixo": [(10.0, 60.0), (40.0, 70.0), (20.0, 90.0)],
+    "cruza a borda": [(-15.5, -10.5), (70.5, 5.5), (30.5, 60.5)],
+    "vértices repetidos": [(5.0, 5.0), (5.0, 5.0), (40.0, 8.0), (20.0, 40.0), (20.0, 40.0)],
+}
+
+
+def rasterize(draw, points, flags=0):
+    surface = pygame.Surface(SIZE, flags, 32)
+    surface.fill((0, 0, 0, 0) if flags else (0, 0, 0))
+    draw(surface, points, COLOR)
+    return pygame.image.tobytes(surface, "RGBA")
+
+
+def assert_same_pixels(points, flags=0):
+    expected = rasterize(shading.draw_polygon_gouraud_python, points, flags)
+    assert rasterize(shading.draw_polygon_gouraud_numpy, points, flags) == expected
+
+
+@pytest.mark.parametrize("name", list(DEGENERATE))
+def test_degenerate_polygons(name):
+    assert_same_pixels(DEGENERATE[name])
+
+
+@pytest.mark.parametrize("seed", range(40))
+def test_random_polygons(seed):
+    assert_same_pixels(random_polygon(random.Random(seed)))
+
+
+def test_random_polygons_with_alpha():
+    rng = random.Random(1234)
+    for _ in range(10):
+        assert_same_pixels(random_polygon(rng), pygame.SRCALPHA)
@@ -0,0 +1,37 @@
+import game
+import headless
+from rewind import PLAYER_FIELDS
+
+DT = 1 / 60
+
+
+def play(state, script):
+    script = headless.parse_script(script)
+    inputs = headless.script_inputs(script)
+    for _ in range(sum(ticks for ticks, _ in script)):
+        game.step(state, next(inputs), DT)
+
+
+def test_push_records_player():
+    state = game.new_state(1)
+    play(state, "30:right,1:right+jump,10:right")
+    history = state["rewind"]
+    recorded = history.player(history.row(0))
+    assert recorded == {field: state["player"][field] for field in PLAYER_FIELDS}
+
+
+def test_holding_rewind_stops_at_oldest_record():
+    # R segurado por mais tempo que o histórico: o tempo só volta, e para no
+    # registro mais antigo em vez de alternar entre ele e um passo novo
+    state = game.new_state(1)
+    play(state, "40:right,1:right+jump,40:right")
+    history = state["rewind"]
+    oldest = history.clock(history.row(history.count - 1))[0]
+    held = next(headless.script_inputs(headless.parse_script("1:rewind")))
+    times = []
+    for _ in range(history.count + 30):
+        game.step(state, held, DT)
+        times.append(state["time"])
+    assert times == sorted(times, reverse=True)
+    assert times[-30:] == [oldest] * 30
+    assert history.count == 1
@@ -0,0 +1,14 @@
+import pytest
+
+import validate
+
+# Com a hitbox do jogo (game.HITBOX_SCALE), toda fase tem de ter uma rota do
+# início até o portal.
+
+
+@pytest.mark.parametrize("level", ["1", "2", "3", "4", validate.LONG_NAME])
+def test_level_has_route(level):
+    report = validate.validate(validate.load_table(level))
+    assert report["reachable"], report["errors"]
+    assert not report["errors"]
+    assert report["route"][-1] == "portal"
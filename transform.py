@@ -0,0 +1,192 @@
+import math
+import numpy as np
+
+# ---------------- MATRIZES ----------------
+# Primitivas 3x3 em listas (usadas pelo caminho de referência e pelos benchmarks)
+def mat_mul(A,B):
+    C = [[0]*3 for _ in range(3)]
+    for i in range(3):
+        for j in range(3):
+            for k in range(3):
+                C[i][j] += A[i][k] * B[k][j]
+    return C
+
+def mat_translate(tx,ty): return [[1,0,tx],[0,1,ty],[0,0,1]]
+def mat_scale(sx,sy): return [[sx,0,0],[0,sy,0],[0,0,1]]
+def mat_rotate(a):
+    radianos=math.radians(a); cosseno=math.cos(radianos); seno=math.sin(radianos)
+    return [[cosseno,-seno,0],[seno,cosseno,0],[0,0,1]]
+def mat_shear(shx): return [[1,shx,0],[0,1,0],[0,0,1]]
+def mat_reflect(dir): return [[dir,0,0],[0,1,0],[0,0,1]]
+def mat_inverse(A):
+    # inversa de uma afim [[a,b,tx],[c,d,ty],[0,0,1]]
+    (a,b,tx),(c,d,ty) = A[0],A[1]
+    det = a*d - b*c
+    return [[d/det,-b/det,(b*ty - d*tx)/det],[-c/det,a/det,(c*tx - a*ty)/det],[0,0,1]]
+
+def apply(matriz, pontos):
+    x, y = pontos
+    nx=matriz[0][0]*x + matriz[0][1]*y + matriz[0][2]
+    ny=matriz[1][0]*x + matriz[1][1]*y + matriz[1][2]
+    return (nx,ny)
+
+
+def build_player_matrix(p):
+    scale = mat_scale(p["scale"], p["scale"])
+    shear = mat_shear(p["shx"])
+    rotacao = mat_rotate(p["angle"])
+    reflexao = mat_reflect(p["direction"])
+    translacao = mat_translate(p["x"], p["y"])
+    return mat_mul(translacao, mat_mul(reflexao, mat_mul(rotacao, mat_mul(shear, scale))))
+
+
+# ---------------- AFINS EM LOTE (NUMPY) ----------------
+# Cada afim é uma matriz 2x3 [[a, b, tx], [c, d, ty]]; um quadro inteiro vira
+# uma pilha (N, 2, 3) aplicada a todos os vértices com um único matmul.
+
+def player_affine(p, out=None):
+    # T · Rf · R · Sh · S em forma fechada
+    s = p["scale"]
+    shx = p["shx"]
+    radianos = math.radians(p["angle"])
+    cosseno = math.cos(radianos); seno = math.sin(radianos)
+    d = p["direction"]
+    if out is None:
+        out = np.empty((2, 3))
+    out[0, 0] = d * cosseno * s
+    out[0, 1] = d * (cosseno * shx - seno) * s
+    out[0, 2] = p["x"]
+    out[1, 0] = seno * s
+    out[1, 1] = (seno * shx + cosseno) * s
+    out[1, 2] = p["y"]
+    return out
+
+def shear_affines(centers, shx, out=None, scale=1.0):
+    # T(centro) · Sh(shx) · S(scale) para N entidades de uma vez; centers tem
+    # forma (N, 2); shx e scale podem ser escalares ou um valor por entidade (N,)
+    centers = np.asarray(centers, dtype=np.float64).reshape(-1, 2)
+    if out is None:
+        out = np.empty((len(centers), 2, 3))
+    out[:, 0, 0] = scale
+    np.multiply(shx, scale, out=out[:, 0, 1])
+    out[:, 1, 0] = 0
+    out[:, 1, 1] = scale
+    out[:, :, 2] = centers
+    return out
+
+def transform_batch(affines, shapes, out=None):
+    # affines (N, 2, 3); shapes (V, 2) compartilhada ou (N, V, 2) -> (N, V, 2)
+    affines = np.asarray(affines, dtype=np.float64)
+    shapes = np.asarray(shapes, dtype=np.float64)
+    if out is None:
+        return shapes @ affines[:, :, :2].transpose(0, 2, 1) + affines[:, None, :, 2]
+    np.matmul(shapes, affines[:, :, :2].transpose(0, 2, 1), out=out)
+    out += affines[:, None, :, 2]
+    return out
+
+def transform_shared(affines, shape, out=None):
+    # Uma forma (V, 2) para N afins (N, 2, 3) -> (N, V, 2), num único produto
+    # de matrizes (N, 6) @ (6, 2V): bem mais rápido que o matmul em lote para
+    # N grande e V pequeno (ex.: partículas). affines precisa ser contíguo.
+    shape = np.asarray(shape, dtype=np.float64)
+    vertices = len(shape)
+    kernel = np.zeros((2, 3, vertices, 2))
+    for i in range(2):
+        kernel[i, :2, :, i] = shape.T
+        kernel[i, 2, :, i] = 1
+    flat = None if out is None else out.reshape(len(affines), 2 * vertices)
+    flat = np.matmul(affines.reshape(len(affines), 6), kernel.reshape(6, 2 * vertices), out=flat)
+    return flat.reshape(len(affines), vertices, 2)
+
+def marked_index(mask, out, scratch, indices):
+    # Índices das linhas marcadas em mask (N,), em ordem: o np.flatnonzero sem
+    # alocar (ele e o np.compress criam o array de índices a cada chamada).
+    # Cada marcada vai para a posição dada pela contagem acumulada da máscara e
+    # as desmarcadas para out[N]. out (N + 1,) e scratch (N,) intp reaproveitados,
+    # indices = np.arange(>= N); mask sai invertida. Devolve out[:M], para
+    # np.take(..., out=, mode="clip").
+    n = len(mask)
+    np.copyto(scratch, mask)
+    np.add.accumulate(scratch, out=scratch)
+    kept = int(scratch[-1]) if n else 0
+    scratch -= 1
+    np.putmask(scratch, np.logical_not(mask, out=mask), n)
+    out[scratch] = indices[:n]
+    return out[:kept]
+
+class FrameBuffers:
+    # Buffers de frame_polygons reaproveitados entre quadros: afins, formas
+    # (constantes, copiadas uma vez) e polígonos de saída. Crescem dobrando
+    # quando aparecem mais inimigos; em regime, nenhum array novo por quadro.
+    # scratch() guarda os demais arrays de trabalho do desenho, pelo nome.
+    def __init__(self, player_shape, enemy_shape, capacity=16):
+        self.player_shape = np.asarray(player_shape, dtype=np.float64)
+        self.enemy_shape = np.asarray(enemy_shape, dtype=np.float64)
+        self.capacity = 0
+        self.reserve(capacity)
+        self.arrays = {}
+        self.indices = np.arange(capacity)
+
+    def scratch(self, name, rows, tail=(), dtype=np.float64):
+        # vista (rows, *tail) de um array guardado entre quadros; refeito (dobrando) só se faltar linha
+        array = self.arrays.get(name)
+        if array is None or len(array) < rows:
+            size = rows if array is None else max(rows, 2 * len(array))
+            array = self.arrays[name] = np.empty((size,) + tail, dtype)
+        return array[:rows]
+
+    def visible(self, name, x, w, left, right):
+        # máscara (N,) das entidades com x + w > left e x < right
+        n = len(x)
+        mask = self.scratch((name, "mask"), n, dtype=bool)
+        edge = self.scratch((name, "edge"), n)
+        np.greater(np.add(x, w, out=edge), left, out=mask)
+        mask &= np.less(x, right, out=self.scratch((name, "test"), n, dtype=bool))
+        return mask
+
+    def compact(self, name, mask, rows):
+        # linhas (N, C) marcadas em mask, em ordem, num buffer (M, C); mask é consumida
+        n = len(mask)
+        if len(self.indices) < n:
+            self.indices = np.arange(2 * n)
+        index = marked_index(mask, self.scratch((name, "index"), n + 1, dtype=np.intp),
+                             self.scratch((name, "count"), n, dtype=np.intp), self.indices)
+        return np.take(rows, index, axis=0, out=self.scratch(name, len(index), rows.shape[1:]), mode="clip")
+
+    def reserve(self, n):
+        if n <= self.capacity:
+            return
+        self.capacity = max(n, 2 * self.capacity)
+        vertices = len(self.player_shape)
+        self.affines = np.empty((self.capacity + 1, 2, 3))
+        self.shapes = np.empty((self.capacity + 1, vertices, 2))
+        self.shapes[0] = self.player_shape
+        self.shapes[1:] = self.enemy_shape
+        self.polys = np.empty_like(self.shapes)
+
+def frame_polygons(player, player_shape, enemy_centers, enemy_shape, enemy_shx, player_matrix=None,
+                   buffers=None):
+    # Transforma jogador e inimigos do quadro numa só chamada; player_matrix
+    # (3x3, ex.: da scene.Scene) substitui a afim calculada do dicionário.
+    # Com `buffers` (FrameBuffers das mesmas formas) o resultado são vistas
+    # dos buffers, válidas até a próxima chamada.
+    # Retorna (polígono do jogador (V, 2), polígonos dos inimigos (N, V, 2)).
+    n = len(enemy_centers)
+    if buffers is None:
+        affines = np.empty((n + 1, 2, 3))
+        shapes = np.empty((n + 1,) + np.shape(player_shape))
+        shapes[0] = player_shape
+        shapes[1:] = enemy_shape
+    else:
+        buffers.reserve(n)
+        affines = buffers.affines[:n + 1]
+        shapes = buffers.shapes[:n + 1]
+    if player_matrix is None:
+        player_affine(player, affines[0])
+    else:
+        affines[0] = player_matrix[:2]
+    if n:
+        shear_affines(enemy_centers, enemy_shx, affines[1:])
+
+    polys = transform_batch(affines, shapes, None if buffers is None else buffers.polys[:n + 1])
+    return polys[0], polys[1:]
@@ -0,0 +1,615 @@
+import os
+import sys
+import json
+import time
+import argparse
+from collections import deque
+
+import numpy as np
+
+import game
+import levels
+from world import ChunkedWorld
+from collision import segments_cross_tops, polygons_overlap, rect_polygons
+
+# Validador de fases sem jogar: monta um grafo de alcance entre o chão, as
+# plataformas e o portal a partir das parábolas do pulo e confere se o portal
+# continua alcançável sem encostar em espinhos.
+#
+# Os saltos usam a forma fechada da integração do step() (a 60 ticks/s):
+#   y(n) = y0 + vy0·n·dt + g·dt²·n(n+1)/2      x(n) = x0 + vx·n·dt
+# com vy0 = JUMP_VY (pulo) ou 0 (sair andando pela borda), e vx constante
+# amostrado em [-RUN_SPEED, RUN_SPEED]. É uma amostragem: um caminho que só
+# existe trocando de direção no ar pode não ser encontrado.
+#
+# Cada nó é um trecho contínuo de uma superfície onde dá para ficar parado
+# (a superfície menos onde a hitbox parada encosta num espinho), dividido
+# também pelas zonas de patrulha dos inimigos. Passar por uma zona de patrulha não
+# bloqueia a rota, mas ela fica marcada: depende de esperar o inimigo passar.
+#
+# Plataformas móveis: a horizontal vira um trecho com o alcance inteiro da
+# patrulha (o jogador pode esperar a plataforma chegar); a vertical é
+# amostrada em PHASES alturas, ligadas entre si enquanto o jogador sobe ou
+# desce em cima dela.
+#
+# Espinhos e inimigos são testados como no jogo: a hitbox (game.HITBOX_SHAPE
+# na pose do jogador) no fim de cada tick, pelo SAT de collision. Portal e
+# pousos continuam pela âncora e pelos pés, como no step().
+DT = 1/60
+X_STEP = 10                # espaçamento dos pontos de partida em cada trecho (px)
+VX_SAMPLES = np.linspace(-game.RUN_SPEED, game.RUN_SPEED, 17)
+PHASES = 16                # alturas amostradas de cada plataforma vertical
+HORIZON = 240              # ticks máximos de um salto (o chão encerra antes)
+PLAYER_FEET = 40           # pés do jogador abaixo da âncora (x, y)
+PLATFORM_HEIGHT = 20       # espessura para o teste do ponto final dos pousos
+TAU_STEP = 6 * DT          # passo dos instantes de partida testados contra as patrulhas
+
+# Fase comprida (várias telas, com chunks) conferida junto com as do jogo:
+# o chão tem de ir até o fim do mundo, não só até a largura da tela
+LONG_LEVEL = {
+    "portal": [2500, 420, 60, 80],
+    "spikes": [[700, 460, 60, 40], [1400, 460, 60, 40], [1460, 460, 60, 40], [2100, 460, 60, 40]],
+    "platforms": [[1000, 340, 150, 20], [1800, 300, 150, 20]],
+    "moving_platforms": [],
+    "vertical_platforms": [],
+    "enemies": [{"rect": [1820, 260, 40, 40], "dir": 1, "min": 1800, "max": 1910}],
+}
+LONG_NAME = "fase longa (embutida)"
+
+
+# ---------------- INTERVALOS ----------------
+def subtract(spans, lo, hi):
+    out = []
+    for a, b in spans:
+        if hi <= a or lo >= b:
+            out.append((a, b))
+            continue
+        if a < lo:
+            out.append((a, lo))
+        if hi < b:
+            out.append((hi, b))
+    return out
+
+
+def safe_spans(lo, hi, y_lo, y_hi, shapes):
+    # trechos de [lo, hi) em que o jogador parado, com a âncora em y ∈ [y_lo, y_hi],
+    # não encosta em nenhum dos polígonos (N, W, 2)
+    spans = [(lo, hi)]
+    for ranges in standing_contact(shapes, y_lo, y_hi):
+        for blocked in ranges:
+            spans = subtract(spans, *blocked)
+    return spans
+
+
+def split_by_zones(span, y, zones):
+    # divide o trecho onde a hitbox parada passa a encostar numa zona de patrulha;
+    # cada pedaço leva os inimigos cujas zonas ela toca em todo o pedaço
+    lo, hi = span
+    cuts = {lo, hi}
+    contact = standing_contact(zone_polygons(zones), y, y)
+    for ranges in contact:
+        cuts.update(c for r in ranges for c in r if lo < c < hi)
+    cuts = sorted(cuts)
+    pieces = []
+    for a, b in zip(cuts, cuts[1:]):
+        covered = frozenset(i for i, ranges in enumerate(contact) if any(c0 <= a and b <= c1 for c0, c1 in ranges))
+        pieces.append(((a, b), covered))
+    return pieces
+
+
+# ---------------- HITBOX ----------------
+# A hitbox do jogo (game.player_polygon) em volta da âncora, em cada pose: parado
+# (ângulo 0, escala 1), no ar depois de pular (gira JUMP_SPIN graus/s, escala
+# JUMP_SCALE) e saindo andando pela borda (on_ground continua True: não gira).
+POSES = {}      # (pulo, direção) -> hitbox local no fim de cada tick do horizonte (HORIZON, V, 2)
+
+
+def hitbox(direction, angle=0.0, scale=1.0):
+    player = dict(game.player_default, x=0.0, y=0.0, direction=direction, angle=angle, scale=scale)
+    return game.player_polygon(player)
+
+
+def jump_poses(jump, direction):
+    poses = POSES.get((jump, direction))
+    if poses is None:
+        n = np.arange(1, HORIZON + 1)
+        if jump:
+            poses = np.array([hitbox(direction, game.JUMP_SPIN * DT * k, game.JUMP_SCALE) for k in n])
+        else:
+            poses = np.repeat(hitbox(direction)[None], HORIZON, axis=0)
+        POSES[jump, direction] = poses
+    return poses
+
+
+def trajectory_hitboxes(X, Y, vx, vy0):
+    # hitbox de cada trajetória no fim de cada tick (K, J, V, 2) e as caixas dela
+    # (lo, hi) (K, J, 2); a direção segue o sinal de vx (parado no ar, fica a da direita)
+    ticks = X.shape[1]
+    body = np.empty(X.shape + (len(game.HITBOX_SHAPE), 2))
+    lo = np.empty(X.shape + (2,))
+    hi = np.empty(X.shape + (2,))
+    for jump in (False, True):
+        for direction in (-1, 1):
+            rows = (vy0 != 0) == jump
+            rows &= (vx < 0) if direction < 0 else (vx >= 0)
+            poses = jump_poses(jump, direction)[:ticks]
+            body[rows] = poses
+            lo[rows] = poses.min(axis=1)
+            hi[rows] = poses.max(axis=1)
+    offset = np.stack((X, Y), axis=-1)
+    body += offset[..., None, :]
+    lo += offset
+    hi += offset
+    return body, lo, hi
+
+
+def near_ticks(sweep, x0, y0, x1, y1, active):
+    # (trajetória, tick) em que a caixa da hitbox cruza a caixa aberta dada (e active
+    # vale): primeiro pela caixa da trajetória inteira, depois pela de cada tick
+    body, lo, hi, reach_lo, reach_hi = sweep
+    rows = np.flatnonzero((reach_lo[:, 0] < x1) & (x0 < reach_hi[:, 0]) &
+                          (reach_lo[:, 1] < y1) & (y0 < reach_hi[:, 1]))
+    lo, hi = lo[rows], hi[rows]
+    near = (active[rows] & (lo[..., 0] < x1) & (x0 < hi[..., 0]) &
+            (lo[..., 1] < y1) & (y0 < hi[..., 1]))
+    k, j = np.nonzero(near)
+    return rows[k], j
+
+
+def first_hit(sweep, poly, active):
+    # primeiro tick (só onde active vale) em que a hitbox de cada trajetória encosta
+    # no polígono convexo poly (W, 2), ou o total de ticks. Caixas primeiro, depois
+    # o mesmo SAT do jogo (encostar na borda não conta) em rodadas de tamanho
+    # dobrado, em ordem de tick: quem já bateu sai das rodadas seguintes.
+    (x0, y0), (x1, y1) = poly.min(axis=0), poly.max(axis=0)
+    k, j = near_ticks(sweep, x0, y0, x1, y1, active)
+    first = np.full(len(active), active.shape[1])
+    # posição de cada tick candidato entre os da sua trajetória (k vem ordenado)
+    start = np.flatnonzero(np.diff(k, prepend=-1))
+    rank = np.arange(len(k)) - np.repeat(start, np.diff(np.append(start, len(k))))
+    size = 1
+    while len(k):
+        now = rank < size
+        tk, tj = k[now], j[now]
+        hit = polygons_overlap(poly, sweep[0][tk, tj])
+        # np.minimum.at: de várias batidas na mesma trajetória, fica a mais cedo
+        np.minimum.at(first, tk[hit], tj[hit])
+        later = ~now & (first[k] == active.shape[1])
+        k, j, rank = k[later], j[later], rank[later] - size
+        size *= 2
+    return first
+
+
+def hitbox_hits_rect(sweep, rect, active):
+    # o mesmo contra um retângulo, sem SAT: a hitbox (convexa) cortada na faixa
+    # vertical dele tem de cruzar o intervalo aberto em x
+    k, j = near_ticks(sweep, rect.left, rect.top, rect.right, rect.bottom, active)
+    lo, hi = band_xrange(sweep[0][k, j], rect.top, rect.bottom)
+    hit = np.zeros(active.shape, dtype=bool)
+    hit[k, j] = (lo < rect.right) & (rect.left < hi)
+    return hit
+
+
+def contact_xrange(poly, body, y_lo, y_hi):
+    # deslocamentos (dx, dy), dy ∈ [y_lo, y_hi], em que body + (dx, dy) encosta em
+    # poly (convexos (..., W, 2) e (..., V, 2)): o interior do fecho de {q - p},
+    # cortado na faixa. Devolve os limites (lo, hi) de dx; lo >= hi sem contato.
+    pts = poly[..., :, None, :] - body[..., None, :, :]
+    x = pts[..., 0].reshape(pts.shape[:-3] + (-1,))
+    y = pts[..., 1].reshape(x.shape)
+    inside = (y_lo <= y) & (y <= y_hi)
+    lo = np.where(inside, x, np.inf).min(axis=-1)
+    hi = np.where(inside, x, -np.inf).max(axis=-1)
+    a, b = np.triu_indices(x.shape[-1], 1)
+    xa, xb, ya, yb = x[..., a], x[..., b], y[..., a], y[..., b]
+    for c in (y_lo, y_hi):
+        cross = (ya - c) * (yb - c) < 0
+        with np.errstate(divide="ignore", invalid="ignore"):
+            xc = xa + (c - ya) / (yb - ya) * (xb - xa)
+        lo = np.minimum(lo, np.where(cross, xc, np.inf).min(axis=-1))
+        hi = np.maximum(hi, np.where(cross, xc, -np.inf).max(axis=-1))
+    touching = (y_lo < y.max(axis=-1)) & (y.min(axis=-1) < y_hi)
+    return np.where(touching, lo, np.inf), np.where(touching, hi, -np.inf)
+
+
+def band_xrange(polys, y_lo, y_hi):
+    # extremos em x dos polígonos convexos (..., V, 2) cortados na faixa
+    # y ∈ [y_lo, y_hi]: vértices dentro dela e arestas cruzando as bordas.
+    # (lo, hi); lo >= hi se o polígono não entra na faixa. Um vértice (e a aresta
+    # que sai dele) por vez: são poucos, e cada passo opera em todos os polígonos.
+    x, y = polys[..., 0], polys[..., 1]
+    lo = np.full(x.shape[:-1], np.inf)
+    hi = np.full(x.shape[:-1], -np.inf)
+    top = np.full(x.shape[:-1], np.inf)
+    bottom = np.full(x.shape[:-1], -np.inf)
+    vertices = x.shape[-1]
+    for v in range(vertices):
+        xa, ya = x[..., v], y[..., v]
+        xb, yb = x[..., (v + 1) % vertices], y[..., (v + 1) % vertices]
+        inside = (y_lo <= ya) & (ya <= y_hi)
+        lo = np.minimum(lo, np.where(inside, xa, np.inf))
+        hi = np.maximum(hi, np.where(inside, xa, -np.inf))
+        for c in (y_lo, y_hi):
+            cross = (ya - c) * (yb - c) < 0
+            with np.errstate(divide="ignore", invalid="ignore"):
+                xc = xa + (c - ya) / (yb - ya) * (xb - xa)
+            lo = np.minimum(lo, np.where(cross, xc, np.inf))
+            hi = np.maximum(hi, np.where(cross, xc, -np.inf))
+        top = np.minimum(top, ya)
+        bottom = np.maximum(bottom, ya)
+    touching = (y_lo < bottom) & (top < y_hi)
+    return np.where(touching, lo, np.inf), np.where(touching, hi, -np.inf)
+
+
+def standing_contact(polys, y_lo, y_hi):
+    # para cada polígono convexo (N, W, 2): intervalos abertos de x da âncora em que a
+    # hitbox parada (nas duas direções), com y ∈ [y_lo, y_hi], encosta nele
+    out = [[] for _ in polys]
+    for direction in (-1, 1):
+        lo, hi = contact_xrange(polys, hitbox(direction), y_lo, y_hi)
+        for i in np.flatnonzero(lo < hi):
+            out[i].append((float(lo[i]), float(hi[i])))
+    return out
+
+
+def zone_polygons(zones):
+    return rect_polygons(*np.array([tuple(z) for z in zones], dtype=np.float64).reshape(-1, 4).T)
+
+
+def spike_triangles(spikes):
+    # os mesmos triângulos que o jogo testa (game.spike_polygons)
+    return game.spike_polygons(np.array([tuple(r) for r in spikes], dtype=np.float64).reshape(-1, 4))
+
+
+# ---------------- GRAFO ----------------
+def patrol_zones(data):
+    # área que cada inimigo varre: x em [min, max] (passa um passo do limite antes de voltar)
+    store = data["enemies"]
+    margin = int(np.ceil(game.ENEMY_SPEED * DT))
+    zones = []
+    for i in range(len(store)):
+        x0 = int(store.min[i]) - margin
+        x1 = int(store.max[i] + store.w[i]) + margin
+        zones.append(game.pygame.Rect(x0, int(store.y[i]), x1 - x0, int(store.h[i])))
+    return zones
+
+
+def build_nodes(data, zones, width):
+    # width: largura do mundo da fase (o chão vai de 0 até ela)
+    spikes = spike_triangles(data["spikes"])
+    surfaces = [("chão", game.GROUND_Y, 0, width, False, False)]
+    surfaces += [(f"plataforma {i}", r.y, r.x, r.right, True, False) for i, r in enumerate(data["platforms"])]
+    moving = data["moving_platforms"]
+    for i in range(len(moving)):
+        # a plataforma fica em [min, max) e leva o jogador junto
+        surfaces.append((f"móvel {i}", int(moving.y[i]), int(moving.min[i]), int(moving.max[i]), True, True))
+    vertical = data["vertical_platforms"]
+    phases = []
+    for i in range(len(vertical)):
+        x, w = int(vertical.x[i]), int(vertical.w[i])
+        tops = np.unique(np.round(np.linspace(vertical.min[i], vertical.max[i], PHASES)).astype(int))
+        for k, top in enumerate(tops):
+            surfaces.append((f"vertical {i} (y={top})", int(top), x, x + w, True, True))
+            phases.append((i, k, len(surfaces) - 1))
+
+    nodes = []
+    by_surface = {}
+    for s, (name, top, lo, hi, walk_off, optional) in enumerate(surfaces):
+        y = top - PLAYER_FEET
+        for span in safe_spans(lo, hi, y, y, spikes):
+            for piece, covered in split_by_zones(span, y, zones):
+                nodes.append({"name": name, "surface": s, "top": top, "span": piece, "enemies": covered,
+                              "walk_off": walk_off, "optional": optional, "segment": span})
+                by_surface.setdefault(s, []).append(len(nodes) - 1)
+    return nodes, by_surface, phases
+
+
+def add_edge(edges, src, dst, enemies):
+    if src == dst:
+        return
+    best = edges[src].get(dst)
+    if best is None or len(enemies) < len(best):
+        edges[src][dst] = enemies
+
+
+def walk_edges(nodes, by_surface, edges):
+    # pedaços vizinhos do mesmo trecho: dá para andar de um para o outro
+    for ids in by_surface.values():
+        for a in ids:
+            for b in ids:
+                na, nb = nodes[a], nodes[b]
+                if na["segment"] == nb["segment"] and (na["span"][1] == nb["span"][0] or nb["span"][1] == na["span"][0]):
+                    add_edge(edges, a, b, nb["enemies"])
+
+
+def ride_edges(nodes, by_surface, phases, spikes, edges):
+    # alturas vizinhas da mesma plataforma vertical: o jogador sobe/desce junto,
+    # desde que alguma coluna do trecho não passe por um espinho no caminho
+    for (i, k, s), (j, l, t) in zip(phases, phases[1:]):
+        if i != j:
+            continue
+        for a in by_surface.get(s, ()):
+            for b in by_surface.get(t, ()):
+                na, nb = nodes[a], nodes[b]
+                lo = max(na["span"][0], nb["span"][0])
+                hi = min(na["span"][1], nb["span"][1])
+                if lo >= hi:
+                    continue
+                y_lo, y_hi = sorted((na["top"] - PLAYER_FEET, nb["top"] - PLAYER_FEET))
+                if safe_spans(lo, hi, y_lo, y_hi, spikes):
+                    add_edge(edges, a, b, nb["enemies"])
+                    add_edge(edges, b, a, na["enemies"])
+
+
+# ---------------- PATRULHAS ----------------
+# Inimigos como onda triangular entre min e max a ENEMY_SPEED: a posição em
+# qualquer instante sai em forma fechada, sem simular.
+def enemy_x(store, i, t):
+    lo, span = store.min[i], store.max[i] - store.min[i]
+    if span <= 0:
+        return np.full(np.shape(t), store.x[i])
+    offset = store.x[i] - lo
+    if store.dir[i] < 0:
+        offset = 2 * span - offset
+    s = np.mod(offset + game.ENEMY_SPEED * t, 2 * span)
+    return lo + np.where(s < span, s, 2 * span - s)
+
+
+def launch_times(store):
+    # instantes de partida amostrados ao longo do maior ciclo de patrulha
+    period = max([2 * (store.max[i] - store.min[i]) / game.ENEMY_SPEED for i in range(len(store))] + [DT])
+    return np.arange(0, period, TAU_STEP)
+
+
+def dodgeable(store, body, zone_hits):
+    # para cada trajetória: existe um instante de partida em que a hitbox não
+    # encosta em nenhum inimigo nos ticks em que cruza a zona dele?
+    taus = launch_times(store)
+    caught = np.zeros((len(body), len(taus)), dtype=bool)
+    ahead = (np.arange(body.shape[1])[:, None] + 1) * DT
+    for i, hits in enumerate(zone_hits):
+        rows, ticks = np.nonzero(hits)
+        if not len(rows):
+            continue
+        # a posição do inimigo só depende do tick e do instante de partida
+        xe = enemy_x(store, i, taus[None, :] + ahead)[ticks]
+        # o inimigo (retângulo em [xe, xe + w)) encosta na hitbox daquele tick se
+        # cruzar o trecho dela dentro da faixa vertical dele
+        lo, hi = band_xrange(body[rows, ticks], store.y[i], store.y[i] + store.h[i])
+        touch = (lo[:, None] < xe + store.w[i]) & (xe < hi[:, None])
+        # np.nonzero devolve as linhas em ordem: junta os ticks de cada trajetória
+        first = np.flatnonzero(np.diff(rows, prepend=-1))
+        caught[rows[first]] |= np.logical_or.reduceat(touch, first, axis=0)
+    return ~caught.all(axis=1)
+
+
+# ---------------- SALTOS ----------------
+def launches(node):
+    # (x0, vx, vy0) de cada trajetória que parte do trecho
+    lo, hi = node["span"]
+    xs = np.unique(np.append(np.arange(lo, hi, X_STEP, dtype=np.float64), hi - 1))
+    x0 = np.repeat(xs, len(VX_SAMPLES))
+    vx = np.tile(VX_SAMPLES, len(xs))
+    vy0 = np.full(len(x0), float(game.JUMP_VY))
+    if node["walk_off"]:
+        left = VX_SAMPLES[VX_SAMPLES < 0]
+        right = VX_SAMPLES[VX_SAMPLES > 0]
+        x0 = np.concatenate((x0, np.full(len(left), lo - 1.0), np.full(len(right), float(hi))))
+        vx = np.concatenate((vx, left, right))
+        vy0 = np.concatenate((vy0, np.zeros(len(left) + len(right))))
+    return x0, vx, vy0
+
+
+def first_tick(mask):
+    # primeiro tick em que a máscara (..., trajetórias, ticks) vale, ou o total de ticks
+    return np.where(mask.any(axis=-1), mask.argmax(axis=-1), mask.shape[-1])
+
+
+def lands_on(segments, vy, top, lo, hi):
+    # pouso no topo [lo, hi) x top: cruzou descendo ou terminou o tick dentro da plataforma
+    xp, yp, xc, yc = segments
+    crossed = segments_cross_tops(xp, yp + PLAYER_FEET, xc, yc + PLAYER_FEET, lo, top, hi - lo)
+    ix = np.trunc(xc)
+    iy = np.trunc(yc + PLAYER_FEET)
+    inside = (lo <= ix) & (ix < hi) & (top <= iy) & (iy < top + PLATFORM_HEIGHT)
+    return (crossed | inside) & (vy >= 0)
+
+
+def jump_edges(nodes, by_surface, data, zones, source, edges, portal_from):
+    node = nodes[source]
+    x0, vx, vy0 = launches(node)
+    y0 = node["top"] - PLAYER_FEET
+
+    # o salto termina no chão, no máximo: corta o horizonte no último pouso possível
+    n = np.arange(HORIZON + 1, dtype=np.float64)
+    fall = vy0[:, None] * n * DT + game.GRAVITY * DT * DT * n * (n + 1) / 2
+    horizon = int(first_tick(y0 + fall[:, 1:] >= game.GROUND_Y - PLAYER_FEET).max()) + 2
+    n = n[:horizon]
+    X = x0[:, None] + vx[:, None] * n * DT
+    Y = y0 + fall[:, :horizon]
+    VY = (vy0[:, None] + game.GRAVITY * DT * n)[:, 1:]
+    segments = (X[:, :-1], Y[:, :-1], X[:, 1:], Y[:, 1:])
+    ticks = segments[0].shape[1]
+    rows = np.arange(len(x0))
+
+    # primeiro pouso obrigatório: chão ou plataforma fixa (empate fica com a plataforma)
+    stop = first_tick(segments[3] >= game.GROUND_Y - PLAYER_FEET)
+    stop_surface = np.zeros(len(x0), dtype=np.int64)
+    platforms = data["platforms"]
+    if platforms:
+        # todas as plataformas de uma vez (P, K); no empate fica a de maior índice
+        top, lo, hi = np.array([(r.y, r.x, r.right) for r in platforms], dtype=np.float64).T[..., None, None]
+        t = first_tick(lands_on(segments, VY, top, lo, hi))[::-1]
+        best = t.argmin(axis=0)
+        t = t[best, rows]
+        better = t <= stop
+        stop = np.where(better, t, stop)
+        stop_surface = np.where(better, len(platforms) - best, stop_surface)
+
+    # hitbox no fim de cada tick, como o step() testa os perigos
+    body, lo, hi = trajectory_hitboxes(segments[2], segments[3], vx, vy0)
+    sweep = (body, lo, hi, lo.min(axis=1), hi.max(axis=1))
+    # (só até o pouso obrigatório, e até a morte mais cedo já achada)
+    death = np.full(len(x0), ticks)
+    tick = np.arange(ticks)
+    for triangle in spike_triangles(data["spikes"]):
+        active = tick <= np.minimum(stop, death - 1)[:, None]
+        death = np.minimum(death, first_hit(sweep, triangle, active))
+
+    # inimigos cruzados antes de o salto terminar; se nenhum instante de partida
+    # escapa deles, a trajetória é descartada como se fosse uma morte
+    end = np.minimum(stop, death)
+    before_end = tick <= end[:, None]
+    zone_hits = [hitbox_hits_rect(sweep, zone, before_end) for zone in zones]
+    crossed = [hits.any(axis=1) for hits in zone_hits]
+    if zones:
+        caught = ~dodgeable(data["enemies"], body, zone_hits)
+        death = np.where(caught, -1, death)
+
+    def enemies_of(k):
+        return node["enemies"] | frozenset(i for i, hit in enumerate(crossed) if hit[k])
+
+    portal = data["portal"]
+    if portal is not None:
+        ix, iy = np.trunc(segments[2]), np.trunc(segments[3])
+        inside = (portal.x <= ix) & (ix < portal.right) & (portal.y <= iy) & (iy < portal.bottom)
+        t = first_tick(inside)
+        for k in np.flatnonzero((t < death) & (t <= stop)):
+            add_edge(portal_from, source, "portal", enemies_of(k))
+
+    land_x = np.trunc(segments[2][rows, np.minimum(stop, ticks - 1)])
+    for k in np.flatnonzero((stop < death) & (stop < ticks)):
+        target = find_node(nodes, by_surface, int(stop_surface[k]), land_x[k])
+        if target is not None:
+            add_edge(edges, source, target, enemies_of(k) | nodes[target]["enemies"])
+
+    # plataformas móveis só contam se o salto passar por elas antes do pouso obrigatório
+    # (e só as que ficam abaixo do ponto mais alto do salto)
+    highest = Y.min() + PLAYER_FEET
+    targets = [target for target, other in enumerate(nodes)
+               if other["optional"] and target != source and other["top"] + PLATFORM_HEIGHT > highest]
+    if not targets:
+        return
+    top = np.array([nodes[target]["top"] for target in targets], dtype=np.float64)[:, None, None]
+    lo, hi = np.array([nodes[target]["span"] for target in targets], dtype=np.float64).T[..., None, None]
+    landed = first_tick(lands_on(segments, VY, top, lo, hi))
+    for target, t in zip(targets, landed):
+        for k in np.flatnonzero((t <= stop) & (t < death) & (t < ticks)):
+            add_edge(edges, source, target, enemies_of(k) | nodes[target]["enemies"])
+
+
+def find_node(nodes, by_surface, surface, x):
+    for i in by_surface.get(surface, ()):
+        lo, hi = nodes[i]["span"]
+        if lo <= x < hi:
+            return i
+    return None     # pousou em cima de um espinho
+
+
+# ---------------- VALIDAÇÃO ----------------
+def route(edges, start, goal_edges, allowed):
+    # busca em largura; devolve a lista de nós até o portal ou None
+    parent = {start: None}
+    queue = deque([start])
+    while queue:
+        current = queue.popleft()
+        enemies = goal_edges.get(current, {}).get("portal")
+        if enemies is not None and allowed(enemies):
+            path = []
+            while current is not None:
+                path.append(current)
+                current = parent[current]
+            return path[::-1]
+        for nxt, enemies in edges[current].items():
+            if nxt not in parent and allowed(enemies):
+                parent[nxt] = current
+                queue.append(nxt)
+    return None
+
+
+def validate(table):
+    # table: tabela compilada da fase (levels.compile_level / levels.cached_table)
+    start_time = time.perf_counter()
+    data = levels.build_entities(table)
+    width = max(ChunkedWorld(table, game.WIDTH, game.ENEMY_SPEED).width, game.WIDTH)
+    zones = patrol_zones(data)
+    nodes, by_surface, phases = build_nodes(data, zones, width)
+    edges = [dict() for _ in nodes]
+    portal_from = {i: {} for i in range(len(nodes))}
+
+    walk_edges(nodes, by_surface, edges)
+    ride_edges(nodes, by_surface, phases, spike_triangles(data["spikes"]), edges)
+    portal = data["portal"]
+    for i, node in enumerate(nodes):
+        lo, hi = node["span"]
+        y = node["top"] - PLAYER_FEET
+        if portal is not None and portal.y <= y < portal.bottom and lo < portal.right and portal.x < hi:
+            add_edge(portal_from, i, "portal", node["enemies"])
+        jump_edges(nodes, by_surface, data, zones, i, edges, portal_from)
+
+    errors, warnings = [], []
+    spawn = game.player_default
+    start = find_node(nodes, by_surface, 0, int(spawn["x"]))
+    path = None
+    if start is None:
+        errors.append("o jogador nasce em cima de um espinho")
+    else:
+        if nodes[start]["enemies"]:
+            warnings.append(f"o jogador nasce na patrulha do(s) inimigo(s) {sorted(nodes[start]['enemies'])}")
+        path = route(edges, start, portal_from, lambda enemies: not enemies)
+        if path is None:
+            path = route(edges, start, portal_from, lambda enemies: True)
+            if path is None:
+                errors.append("portal inalcançável a partir do início")
+            else:
+                crossed = set()
+                for a, b in zip(path, path[1:] + ["portal"]):
+                    crossed |= (portal_from[a]["portal"] if b == "portal" else edges[a][b])
+                warnings.append(f"a única rota cruza a patrulha do(s) inimigo(s) {sorted(crossed)}")
+
+    return {
+        "reachable": path is not None,
+        "route": [nodes[i]["name"] for i in path] + ["portal"] if path else None,
+        "errors": errors,
+        "warnings": warnings,
+        "nodes": len(nodes),
+        "edges": sum(len(e) for e in edges),
+        "elapsed_ms": (time.perf_counter() - start_time) * 1000,
+    }
+
+
+def load_table(source):
+    # número da fase, caminho de um JSON no formato de levels/levelN.json ou LONG_NAME
+    if source == LONG_NAME:
+        return levels.compile_level(LONG_LEVEL)
+    if os.path.exists(source):
+        with open(source) as f:
+            return levels.compile_level(json.load(f))
+    return levels.cached_table(levels.level_path(int(source)))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Confere se o portal de cada fase é alcançável")
+    parser.add_argument("levels", nargs="*",
+                        help="números das fases ou arquivos JSON (padrão: todas, mais a fase longa embutida)")
+    args = parser.parse_args(argv)
+
+    sources = args.levels or [str(level) for level in range(1, game.LAST_LEVEL + 1)] + [LONG_NAME]
+    failed = False
+    for source in sources:
+        report = validate(load_table(source))
+        name = f"fase {source}" if source.isdigit() else source
+        status = "ok" if not report["errors"] else "ERRO"
+        print(f"{name}: {status} ({report['nodes']} trechos, {report['edges']} ligações, {report['elapsed_ms']:.1f} ms)")
+        if report["route"]:
+            print("  rota: " + " -> ".join(report["route"]))
+        for message in report["errors"]:
+            print(f"  erro: {message}")
+        for message in report["warnings"]:
+            print(f"  aviso: {message}")
+        failed |= bool(report["errors"])
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
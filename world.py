@@ -0,0 +1,153 @@
+import math
+import numpy as np
+
+import levels
+from entities import PatrolStore, patrol_enemies, patrol_horizontal, patrol_vertical
+
+# Mundo dividido em faixas verticais (chunks) de CHUNK_WIDTH px. Só os chunks
+# perto da câmera ficam carregados: viram Rects/PatrolStore no estado e são
+# simulados e desenhados normalmente. Os demais ficam só na tabela da fase
+# (o .npy do levels.py, mapeado em memória), então a memória não cresce com
+# o comprimento da fase.
+#
+# Ao descarregar um chunk, a posição e a direção dos que patrulham nele são
+# guardadas; ao recarregar, eles são avançados pelo tempo em que ficaram fora
+# em passos grossos de COARSE_DT (no máximo MAX_CATCH_UP segundos).
+#
+# Fases que cabem na tela ficam com tudo carregado o tempo todo.
+CHUNK_WIDTH = 300
+STREAM_MARGIN = 1          # chunks carregados além de cada borda da tela
+COARSE_DT = 0.1
+MAX_CATCH_UP = 30.0
+CAMERA_LEAD = 0.4          # fração da tela à esquerda do jogador
+
+PATROL_KINDS = ("moving_platforms", "vertical_platforms", "enemies")
+# colunas da tabela: (tipo, x, y, w, h, dir, min, max, speed)
+KIND, X, Y, W, H, DIR, MIN, MAX = range(8)
+
+
+def follow_camera(world_width, screen_width, player_x):
+    # câmera horizontal presa às bordas do mundo
+    if world_width <= screen_width:
+        return 0
+    return int(min(max(player_x - screen_width * CAMERA_LEAD, 0), world_width - screen_width))
+
+
+class ChunkedWorld:
+    def __init__(self, table, screen_width, enemy_speed, chunk_width=CHUNK_WIDTH):
+        self.table = table
+        self.chunk_width = chunk_width
+        self.screen_width = screen_width
+        self.enemy_speed = enemy_speed
+
+        codes = np.asarray(table[:, KIND]).astype(np.int64)
+        x = np.asarray(table[:, X])
+        w = np.asarray(table[:, W])
+        left = x.copy()
+        right = x + w
+        # quem patrulha na horizontal ocupa todo o percurso: plataformas ficam em
+        # [min, max); inimigos têm o x (canto esquerdo) em [min, max]
+        platform = codes == levels.KINDS.index("moving_platforms")
+        enemy = codes == levels.KINDS.index("enemies")
+        left[platform | enemy] = np.minimum(x, table[:, MIN])[platform | enemy]
+        right[platform] = np.maximum(right, table[:, MAX])[platform]
+        right[enemy] = np.maximum(right, table[:, MAX] + w)[enemy]
+
+        self.codes = codes
+        self.width = int(math.ceil(right.max())) if len(right) else 0
+        portal = codes == levels.KINDS.index("portal")
+        self.portal_rows = np.flatnonzero(portal)
+
+        # linhas de cada chunk, na ordem da tabela
+        chunks = np.floor_divide(left, chunk_width).astype(np.int64)
+        order = np.flatnonzero(~portal)
+        order = order[np.argsort(chunks[order], kind="stable")]
+        ids, starts = np.unique(chunks[order], return_index=True)
+        ends = np.append(starts[1:], len(order))
+        self.rows = {int(c): order[s:e] for c, s, e in zip(ids, starts, ends)}
+        self.reach = {int(c): float(right[order[s:e]].max()) for c, s, e in zip(ids, starts, ends)}
+        self.chunk_of = chunks
+        self.ids = ids
+        # maior avanço de um chunk além do seu início (limita a busca por chunks visíveis)
+        self.max_reach = max([self.reach[c] - c * chunk_width for c in self.reach] + [chunk_width])
+
+        self.loaded = None
+        self.loaded_rows = None
+        self.saved = {}            # chunk -> (instante, {tipo: (x, y, dir)})
+        self.generation = 0        # muda a cada troca de chunks carregados
+
+    def wanted(self, camera_x):
+        if self.width <= self.screen_width:
+            return tuple(self.rows)
+        cw = self.chunk_width
+        lo = camera_x - STREAM_MARGIN * cw
+        hi = camera_x + self.screen_width + STREAM_MARGIN * cw
+        first = np.searchsorted(self.ids, math.floor((lo - self.max_reach) / cw))
+        last = np.searchsorted(self.ids, math.floor((hi - 1) / cw), side="right")
+        return tuple(int(c) for c in self.ids[first:last] if self.reach[int(c)] > lo)
+
+    def loaded_of(self, kind):
+        # linhas carregadas de `kind`, na ordem das entidades montadas
+        return self.loaded_rows[self.codes[self.loaded_rows] == levels.KINDS.index(kind)]
+
+    def save(self, state, now):
+        # guarda quem patrulha em cada chunk carregado
+        if self.loaded_rows is None:
+            return
+        saved = {}
+        for kind in PATROL_KINDS:
+            store = state[kind]
+            rows = self.loaded_of(kind)
+            chunks = self.chunk_of[rows]
+            for c in np.unique(chunks):
+                mask = chunks == c
+                saved.setdefault(int(c), {})[kind] = (store.x[mask].copy(), store.y[mask].copy(),
+                                                      store.dir[mask].copy())
+        for c, kinds in saved.items():
+            self.saved[c] = (now, kinds)
+
+    def restore(self, data, rows, now):
+        # devolve a posição guardada e avança pelo tempo que o chunk ficou fora
+        for kind in PATROL_KINDS:
+            store = data[kind]
+            chunks = self.chunk_of[rows[self.codes[rows] == levels.KINDS.index(kind)]]
+            for c in np.unique(chunks):
+                entry = self.saved.get(int(c))
+                if entry is None or kind not in entry[1]:
+                    continue
+                mask = chunks == c
+                x, y, direction = entry[1][kind]
+                part = PatrolStore(x, y, store.w[mask], store.h[mask], direction,
+                                   store.min[mask], store.max[mask], store.speed[mask])
+                catch_up(kind, part, min(now - entry[0], MAX_CATCH_UP), self.enemy_speed)
+                store.x[mask], store.y[mask], store.dir[mask] = part.x, part.y, part.dir
+
+    def update(self, state, camera_x, now):
+        # devolve as entidades dos chunks carregados quando o conjunto muda (senão None)
+        wanted = self.wanted(camera_x)
+        if wanted == self.loaded:
+            return None
+        self.save(state, now)
+        parts = [self.rows[c] for c in wanted] + [self.portal_rows]
+        rows = np.sort(np.concatenate(parts)) if parts else np.zeros(0, dtype=np.int64)
+        data = levels.build_entities(self.table[rows])
+        self.restore(data, rows, now)
+        self.loaded = wanted
+        self.loaded_rows = rows
+        self.generation += 1
+        return data
+
+
+def catch_up(kind, store, elapsed, enemy_speed):
+    # simulação grossa de quem ficou fora da tela
+    if elapsed <= 0:
+        return
+    steps = math.ceil(elapsed / COARSE_DT)
+    dt = elapsed / steps
+    for _ in range(steps):
+        if kind == "enemies":
+            patrol_enemies(store, enemy_speed, dt)
+        elif kind == "moving_platforms":
+            patrol_horizontal(store, dt)
+        else:
+            patrol_vertical(store, dt)